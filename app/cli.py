@@ -0,0 +1,66 @@
+"""Maintenance commands.
+
+    python -m app.cli verify-stock-totals
+    python -m app.cli rebuild-stock-totals
+    python -m app.cli rebuild-sales-rollup
+    python -m app.cli sync-replica
+"""
+
+import argparse
+import sys
+
+from .config import get_settings
+from .database import SessionLocal, copy_sqlite_database
+from .services import sales_rollup, stock_totals
+
+
+def _verify_stock_totals() -> int:
+    with SessionLocal() as db:
+        mismatches = stock_totals.verify(db)
+    for mismatch in mismatches:
+        print(mismatch)
+    print(f"{len(mismatches)} product(s) out of step")
+    return 1 if mismatches else 0
+
+
+def _rebuild_stock_totals() -> int:
+    with SessionLocal() as db:
+        count = stock_totals.rebuild(db)
+    print(f"Rebuilt stock totals for {count} product(s)")
+    return 0
+
+
+def _rebuild_sales_rollup() -> int:
+    with SessionLocal() as db:
+        count = sales_rollup.rebuild(db)
+    print(f"Rebuilt {count} daily product sales row(s)")
+    return 0
+
+
+def _sync_replica() -> int:
+    settings = get_settings()
+    if not settings.replica_database_url:
+        print("REPLICA_DATABASE_URL is not set")
+        return 1
+    copy_sqlite_database(settings.database_url, settings.replica_database_url)
+    print(f"Copied {settings.database_url} to {settings.replica_database_url}")
+    return 0
+
+
+COMMANDS = {
+    "verify-stock-totals": _verify_stock_totals,
+    "rebuild-stock-totals": _rebuild_stock_totals,
+    "rebuild-sales-rollup": _rebuild_sales_rollup,
+    "sync-replica": _sync_replica,
+}
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="SweetStock maintenance commands")
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    args = parser.parse_args(argv)
+    return COMMANDS[args.command]()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,6 @@
 from functools import lru_cache
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -6,7 +8,36 @@ class Settings(BaseSettings):
     app_name: str = "SweetStock Backend"
     database_url: str = "sqlite:///./inventory.db"
     debug: bool = True
+    admin_token: str | None = None
     expiry_alert_days: int = 7
+    auto_migrate: bool = False
+    sqlite_tuning_enabled: bool = False
+    sqlite_journal_mode: Literal["wal", "delete", "truncate", "persist"] = "wal"
+    sqlite_synchronous: Literal["off", "normal", "full", "extra"] = "normal"
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    sqlite_cache_size_kib: int = 64 * 1024
+    sqlite_temp_store: Literal["default", "file", "memory"] = "memory"
+    read_pool_size: int = 8
+    replica_database_url: str | None = None
+    read_your_writes_seconds: int = 10
+    fifo_index_enabled: bool = False
+    sale_group_commit_enabled: bool = False
+    sale_group_commit_max_batch: int = 32
+    sale_group_commit_window_ms: float = 5.0
+    result_cache_enabled: bool = True
+    result_cache_ttl_seconds: float = 30.0
+    result_cache_max_entries: int = 256
+    fast_json_enabled: bool = False
+    idempotency_ttl_seconds: int = 24 * 3600
+    idempotency_max_keys: int = 100_000
+    metrics_enabled: bool = False
+    slow_query_log_enabled: bool = False
+    slow_query_threshold_ms: float = 200.0
+    slow_query_buffer_size: int = 100
+    profiling_enabled: bool = False
+    profile_sample_interval_ms: float = 5.0
+    profile_max_stored: int = 20
 
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
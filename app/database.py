@@ -1,40 +1,103 @@
-from sqlalchemy import create_engine, inspect, text
+import sqlite3
+
+from fastapi import Request
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.orm import sessionmaker, declarative_base, scoped_session
 
-from .config import get_settings
+from .config import Settings, get_settings
+from .utils.slow_queries import SlowQueryLog
 
 settings = get_settings()
 
+
+def _is_sqlite_file(url: str) -> bool:
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database not in (None, "", ":memory:")
+
+
+def sqlite_pragmas(settings: Settings, read_only: bool = False) -> list[str]:
+    """Per-connection PRAGMAs for the configured SQLite profile."""
+    pragmas = [f"PRAGMA busy_timeout = {settings.sqlite_busy_timeout_ms}"]
+    if settings.sqlite_tuning_enabled:
+        pragmas += [
+            f"PRAGMA journal_mode = {settings.sqlite_journal_mode}",
+            f"PRAGMA synchronous = {settings.sqlite_synchronous}",
+            f"PRAGMA mmap_size = {settings.sqlite_mmap_size}",
+            f"PRAGMA cache_size = -{settings.sqlite_cache_size_kib}",
+            f"PRAGMA temp_store = {settings.sqlite_temp_store}",
+        ]
+    if read_only:
+        pragmas.append("PRAGMA query_only = ON")
+    return pragmas
+
+
+def apply_sqlite_pragmas(engine: Engine, pragmas: list[str]) -> None:
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+
 engine = create_engine(
     settings.database_url, echo=settings.debug, future=True, connect_args={"check_same_thread": False}
 )
 
+
+def _read_only_engine(url: str) -> Engine:
+    """A pool for GET traffic; on SQLite files its connections refuse writes."""
+    if not _is_sqlite_file(url):
+        return create_engine(url, echo=settings.debug, future=True, pool_size=settings.read_pool_size)
+    read_only = create_engine(
+        url,
+        echo=settings.debug,
+        future=True,
+        connect_args={"check_same_thread": False},
+        pool_size=settings.read_pool_size,
+    )
+    apply_sqlite_pragmas(read_only, sqlite_pragmas(settings, read_only=True))
+    return read_only
+
+
+if _is_sqlite_file(settings.database_url):
+    apply_sqlite_pragmas(engine, sqlite_pragmas(settings))
+    # A separate pool of query-only connections for GET traffic: under WAL, readers
+    # work from a snapshot and never wait for (or hold up) the writer's commits.
+    read_engine = _read_only_engine(settings.database_url)
+else:
+    read_engine = engine
+
+replica_engine = _read_only_engine(settings.replica_database_url) if settings.replica_database_url else None
+
+# Listens on the Engine class so the primary, read pool and replica all report into one buffer.
+slow_query_log = SlowQueryLog(settings.slow_query_threshold_ms, settings.slow_query_buffer_size)
+if settings.slow_query_log_enabled:
+    slow_query_log.listen(Engine)
+
 SessionLocal = scoped_session(sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True))
+ReadSessionLocal = scoped_session(sessionmaker(bind=read_engine, autoflush=False, autocommit=False, future=True))
+ReplicaSessionLocal = (
+    scoped_session(sessionmaker(bind=replica_engine, autoflush=False, autocommit=False, future=True))
+    if replica_engine is not None
+    else None
+)
 
 Base = declarative_base()
 
+# Set on responses to writes while a replica is configured; either one sends reads to the primary.
+READ_PRIMARY_COOKIE = "read_primary"
+READ_PRIMARY_HEADER = "X-Read-Primary"
+
 
-def ensure_schema_upgrades() -> None:
-    inspector = inspect(engine)
-    with engine.begin() as conn:
-        batch_columns = {column["name"] for column in inspector.get_columns("inventory_batches")}
-        if "unit_size_value" not in batch_columns:
-            conn.execute(text("ALTER TABLE inventory_batches ADD COLUMN unit_size_value NUMERIC DEFAULT 1 NOT NULL"))
-        if "unit_size_unit" not in batch_columns:
-            conn.execute(text("ALTER TABLE inventory_batches ADD COLUMN unit_size_unit VARCHAR(8) DEFAULT 'g' NOT NULL"))
-        if "supplier_id" not in batch_columns:
-            conn.execute(text("ALTER TABLE inventory_batches ADD COLUMN supplier_id INTEGER REFERENCES suppliers(id)"))
-
-        sale_columns = {column["name"] for column in inspector.get_columns("sales")}
-        if "unit_size_value" not in sale_columns:
-            conn.execute(text("ALTER TABLE sales ADD COLUMN unit_size_value NUMERIC DEFAULT 1 NOT NULL"))
-        if "unit_size_unit" not in sale_columns:
-            conn.execute(text("ALTER TABLE sales ADD COLUMN unit_size_unit VARCHAR(8) DEFAULT 'g' NOT NULL"))
-        if "retailer_id" not in sale_columns:
-            conn.execute(text("ALTER TABLE sales ADD COLUMN retailer_id INTEGER REFERENCES retailers(id)"))
-        if "invoice_number" not in sale_columns:
-            conn.execute(text("ALTER TABLE sales ADD COLUMN invoice_number VARCHAR(40)"))
-            conn.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS idx_sales_invoice_number ON sales(invoice_number)"))
+def reads_from_primary(request: Request) -> bool:
+    """True when the caller wrote recently (or asks to) and must see its own writes."""
+    if request.cookies.get(READ_PRIMARY_COOKIE):
+        return True
+    return request.headers.get(READ_PRIMARY_HEADER, "").lower() in ("1", "true")
 
 
 def get_db():
@@ -43,3 +106,36 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_read_db(request: Request):
+    """Session for GET routes: the replica when one is configured, else the primary's read pool.
+
+    Must not write. Callers that wrote within ``read_your_writes_seconds`` (the
+    ``read_primary`` cookie) or send ``X-Read-Primary: 1`` read from the primary.
+    """
+    factory = ReadSessionLocal
+    if ReplicaSessionLocal is not None and not reads_from_primary(request):
+        factory = ReplicaSessionLocal
+    db = factory()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def copy_sqlite_database(source_url: str, target_url: str) -> None:
+    """Copy one SQLite file onto another with the online backup API.
+
+    Readers of the target see either the old or the new copy, never a mix, so
+    this doubles as the sync step for a local two-file replica setup.
+    """
+    if not (_is_sqlite_file(source_url) and _is_sqlite_file(target_url)):
+        raise ValueError("copy_sqlite_database needs two SQLite file URLs")
+    source = sqlite3.connect(make_url(source_url).database)
+    target = sqlite3.connect(make_url(target_url).database, timeout=settings.sqlite_busy_timeout_ms / 1000)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
@@ -1,9 +1,19 @@
-from fastapi import FastAPI
+from uuid import uuid4
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 
 from .config import get_settings
-from .database import Base, engine, ensure_schema_upgrades
-from .routers import products, purchases, retailers, sales, stock, suppliers, reports
+from .database import READ_PRIMARY_COOKIE, engine
+from .migrate import ensure_current
+from .routers import debug, products, purchases, retailers, sales, stock, suppliers, reports
+from .routers.debug import is_admin_request
+from .services import instrumentation
+from .services.idempotency import REPLAYED_HEADER
+from .utils.cache import ResultCache
+from .utils import slow_queries
+from .utils.profiling import PROFILE_HEADER, PROFILE_ID_HEADER, ProfileStore, RequestProfile, current_profile
+from .utils.pagination import NEXT_CURSOR_HEADER
 
 
 def create_app() -> FastAPI:
@@ -19,11 +29,62 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER, "ETag", REPLAYED_HEADER, PROFILE_ID_HEADER],
     )
 
 
-    Base.metadata.create_all(bind=engine)
-    ensure_schema_upgrades()
+    ensure_current(engine, auto_migrate=settings.auto_migrate)
+
+    if settings.replica_database_url:
+
+        @app.middleware("http")
+        async def read_your_writes(request: Request, call_next):
+            # A client that just wrote reads from the primary until the replica has had time to catch up.
+            response = await call_next(request)
+            if request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+                response.set_cookie(
+                    READ_PRIMARY_COOKIE, "1", max_age=settings.read_your_writes_seconds, httponly=True, samesite="lax"
+                )
+            return response
+
+    if settings.slow_query_log_enabled:
+
+        @app.middleware("http")
+        async def track_slow_query_route(request: Request, call_next):
+            # Slow statements look up the route they were issued for through this scope.
+            token = slow_queries.current_scope.set(request.scope)
+            try:
+                return await call_next(request)
+            finally:
+                slow_queries.current_scope.reset(token)
+
+    if settings.profiling_enabled:
+        app.state.profile_store = ProfileStore(settings.profile_max_stored)
+
+        @app.middleware("http")
+        async def profile_request(request: Request, call_next):
+            if request.headers.get(PROFILE_HEADER) != "1" or not is_admin_request(request):
+                return await call_next(request)
+            profile = RequestProfile(
+                uuid4().hex, request.method, request.url.path, settings.profile_sample_interval_ms / 1000
+            )
+            token = current_profile.set(profile)
+            profile.start()
+            response = None
+            try:
+                response = await call_next(request)
+            finally:
+                profile.stop(response.status_code if response is not None else None)
+                current_profile.reset(token)
+                app.state.profile_store.add(profile)
+            response.headers[PROFILE_ID_HEADER] = profile.profile_id
+            return response
+
+    if settings.metrics_enabled:
+        instrumentation.install(app)
+
+    if settings.result_cache_enabled:
+        app.state.result_cache = ResultCache(settings.result_cache_max_entries, settings.result_cache_ttl_seconds)
 
     app.include_router(products.router, prefix="/api/products", tags=["products"])
     app.include_router(purchases.router, prefix="/api/purchases", tags=["purchases"])
@@ -32,6 +93,7 @@ def create_app() -> FastAPI:
     app.include_router(reports.router, prefix="/api/reports", tags=["reports"])
     app.include_router(suppliers.router, prefix="/api/suppliers", tags=["suppliers"])
     app.include_router(retailers.router, prefix="/api/retailers", tags=["retailers"])
+    app.include_router(debug.router, prefix="/api/debug", tags=["debug"])
 
     @app.get("/")
     def root():
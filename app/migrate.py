@@ -0,0 +1,312 @@
+"""Versioned schema migrations.
+
+    python -m app.migrate            # apply pending migrations
+    python -m app.migrate --status   # print current and latest version
+
+``schema_version`` holds a single row with the number of the last applied step.
+A run locks that row with a no-op ``UPDATE`` before re-reading it, so workers
+that boot together queue up behind one another instead of racing, and every
+step plus the version bump commit as one transaction. Steps are append-only:
+never edit or reorder one that has shipped, add a new one instead. Each step
+spells out its DDL rather than reading the current models, so what a step does
+never changes after it ships.
+
+App startup only calls ``ensure_current``, a single-row read.
+"""
+
+import argparse
+import sys
+from datetime import UTC, datetime
+from typing import Callable
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, Table, inspect, select, text, update
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.schema import CreateTable
+from sqlalchemy.exc import DBAPIError, IntegrityError
+
+
+_meta = MetaData()
+schema_version = Table(
+    "schema_version",
+    _meta,
+    Column("id", Integer, primary_key=True),
+    Column("version", Integer, nullable=False),
+    Column("applied_at", DateTime(timezone=True), nullable=True),
+)
+
+
+# Literal DDL, as each step shipped; ``{serial}`` and ``{timestamp}`` are filled in per dialect.
+_DIALECT_TYPES = {
+    "sqlite": {"serial": "INTEGER", "timestamp": "DATETIME"},
+    "postgresql": {"serial": "SERIAL", "timestamp": "TIMESTAMP WITH TIME ZONE"},
+}
+
+
+def _statements(*statements: str, sqlite_only: bool = False) -> Callable[[Connection], None]:
+    def apply(conn: Connection) -> None:
+        if sqlite_only and conn.dialect.name != "sqlite":
+            return
+        types = _DIALECT_TYPES.get(conn.dialect.name, _DIALECT_TYPES["postgresql"])
+        for statement in statements:
+            conn.execute(text(statement.format(**types)))
+
+    return apply
+
+
+_create_tables = _statements(
+    "CREATE TABLE IF NOT EXISTS suppliers (id {serial} NOT NULL, name VARCHAR(120) NOT NULL,"
+    " contact_person VARCHAR(120), phone VARCHAR(30), email VARCHAR(120), gst_number VARCHAR(30), city VARCHAR(80),"
+    " created_at {timestamp} NOT NULL, PRIMARY KEY (id), UNIQUE (name))",
+    "CREATE INDEX IF NOT EXISTS ix_suppliers_id ON suppliers (id)",
+    "CREATE TABLE IF NOT EXISTS retailers (id {serial} NOT NULL, name VARCHAR(120) NOT NULL, channel VARCHAR(80),"
+    " contact_person VARCHAR(120), phone VARCHAR(30), email VARCHAR(120), gst_number VARCHAR(30),"
+    " created_at {timestamp} NOT NULL, PRIMARY KEY (id), UNIQUE (name))",
+    "CREATE INDEX IF NOT EXISTS ix_retailers_id ON retailers (id)",
+    "CREATE TABLE IF NOT EXISTS products (id {serial} NOT NULL, name VARCHAR(120) NOT NULL, category VARCHAR(80),"
+    " brand VARCHAR(80), created_at {timestamp} NOT NULL, PRIMARY KEY (id), UNIQUE (name))",
+    "CREATE INDEX IF NOT EXISTS ix_products_id ON products (id)",
+    "CREATE TABLE IF NOT EXISTS inventory_batches (id {serial} NOT NULL, product_id INTEGER NOT NULL,"
+    " supplier_id INTEGER, batch_code VARCHAR(80) NOT NULL, quantity_initial INTEGER NOT NULL,"
+    " quantity_remaining INTEGER NOT NULL, unit_cost NUMERIC(10, 2) NOT NULL,"
+    " unit_size_value NUMERIC(10, 3) DEFAULT '1.0' NOT NULL, unit_size_unit VARCHAR(8) DEFAULT 'g' NOT NULL,"
+    " expiry_date DATE NOT NULL, supplier_name VARCHAR(120), purchased_at {timestamp} NOT NULL, PRIMARY KEY (id),"
+    " CONSTRAINT uq_product_batch UNIQUE (product_id, batch_code),"
+    " CONSTRAINT ck_batch_quantity_remaining CHECK (quantity_remaining >= 0),"
+    " FOREIGN KEY(product_id) REFERENCES products (id) ON DELETE CASCADE,"
+    " FOREIGN KEY(supplier_id) REFERENCES suppliers (id) ON DELETE SET NULL)",
+    "CREATE INDEX IF NOT EXISTS ix_inventory_batches_id ON inventory_batches (id)",
+    "CREATE TABLE IF NOT EXISTS sales (id {serial} NOT NULL, product_id INTEGER NOT NULL, retailer_id INTEGER,"
+    " quantity INTEGER NOT NULL, selling_price NUMERIC(10, 2) NOT NULL, sale_date {timestamp} NOT NULL,"
+    " unit_size_value NUMERIC(10, 3) DEFAULT '1.0' NOT NULL, unit_size_unit VARCHAR(8) DEFAULT 'g' NOT NULL,"
+    " customer_name VARCHAR(120), invoice_number VARCHAR(40), PRIMARY KEY (id),"
+    " FOREIGN KEY(product_id) REFERENCES products (id) ON DELETE CASCADE,"
+    " FOREIGN KEY(retailer_id) REFERENCES retailers (id) ON DELETE SET NULL, UNIQUE (invoice_number))",
+    "CREATE INDEX IF NOT EXISTS ix_sales_id ON sales (id)",
+    "CREATE TABLE IF NOT EXISTS sale_allocations (id {serial} NOT NULL, sale_id INTEGER NOT NULL,"
+    " batch_id INTEGER NOT NULL, quantity INTEGER NOT NULL, unit_cost NUMERIC(10, 2) NOT NULL, PRIMARY KEY (id),"
+    " FOREIGN KEY(sale_id) REFERENCES sales (id) ON DELETE CASCADE,"
+    " FOREIGN KEY(batch_id) REFERENCES inventory_batches (id) ON DELETE CASCADE)",
+    "CREATE INDEX IF NOT EXISTS ix_sale_allocations_id ON sale_allocations (id)",
+    "CREATE TABLE IF NOT EXISTS product_stock (product_id INTEGER NOT NULL, units_on_hand INTEGER NOT NULL,"
+    " open_batches INTEGER NOT NULL, earliest_expiry DATE, stock_value NUMERIC(14, 2) NOT NULL,"
+    " PRIMARY KEY (product_id), FOREIGN KEY(product_id) REFERENCES products (id) ON DELETE CASCADE)",
+    "CREATE TABLE IF NOT EXISTS daily_product_sales (product_id INTEGER NOT NULL, day DATE NOT NULL,"
+    " quantity BIGINT NOT NULL, revenue_paise BIGINT NOT NULL, cogs_paise BIGINT NOT NULL,"
+    " PRIMARY KEY (product_id, day), FOREIGN KEY(product_id) REFERENCES products (id) ON DELETE CASCADE)",
+    "CREATE TABLE IF NOT EXISTS data_versions (name VARCHAR(40) NOT NULL, version BIGINT NOT NULL,"
+    " PRIMARY KEY (name))",
+)
+
+
+def _legacy_columns(conn: Connection) -> None:
+    """Columns added to pre-release databases before migrations existed."""
+    inspector = inspect(conn)
+    batch_columns = {column["name"] for column in inspector.get_columns("inventory_batches")}
+    if "unit_size_value" not in batch_columns:
+        conn.execute(text("ALTER TABLE inventory_batches ADD COLUMN unit_size_value NUMERIC DEFAULT 1 NOT NULL"))
+    if "unit_size_unit" not in batch_columns:
+        conn.execute(text("ALTER TABLE inventory_batches ADD COLUMN unit_size_unit VARCHAR(8) DEFAULT 'g' NOT NULL"))
+    if "supplier_id" not in batch_columns:
+        conn.execute(text("ALTER TABLE inventory_batches ADD COLUMN supplier_id INTEGER REFERENCES suppliers(id)"))
+
+    sale_columns = {column["name"] for column in inspector.get_columns("sales")}
+    if "unit_size_value" not in sale_columns:
+        conn.execute(text("ALTER TABLE sales ADD COLUMN unit_size_value NUMERIC DEFAULT 1 NOT NULL"))
+    if "unit_size_unit" not in sale_columns:
+        conn.execute(text("ALTER TABLE sales ADD COLUMN unit_size_unit VARCHAR(8) DEFAULT 'g' NOT NULL"))
+    if "retailer_id" not in sale_columns:
+        conn.execute(text("ALTER TABLE sales ADD COLUMN retailer_id INTEGER REFERENCES retailers(id)"))
+    if "invoice_number" not in sale_columns:
+        conn.execute(text("ALTER TABLE sales ADD COLUMN invoice_number VARCHAR(40)"))
+        conn.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS idx_sales_invoice_number ON sales(invoice_number)"))
+
+
+_pagination_fifo_report_indexes = _statements(
+    "CREATE INDEX IF NOT EXISTS ix_batches_expiry_code_id ON inventory_batches (expiry_date, batch_code, id)",
+    "CREATE INDEX IF NOT EXISTS ix_batches_product_expiry_code_id"
+    " ON inventory_batches (product_id, expiry_date, batch_code, id)",
+    "CREATE INDEX IF NOT EXISTS ix_batches_supplier_expiry_code_id"
+    " ON inventory_batches (supplier_id, expiry_date, batch_code, id)",
+    "CREATE INDEX IF NOT EXISTS ix_batches_open_fifo ON inventory_batches (product_id, expiry_date, purchased_at)"
+    " WHERE quantity_remaining > 0",
+    "CREATE INDEX IF NOT EXISTS ix_batches_open_expiry ON inventory_batches (expiry_date)"
+    " WHERE quantity_remaining > 0",
+    "CREATE INDEX IF NOT EXISTS ix_sales_date_id ON sales (sale_date, id)",
+    "CREATE INDEX IF NOT EXISTS ix_sales_product_date_id ON sales (product_id, sale_date, id)",
+    "CREATE INDEX IF NOT EXISTS ix_sales_retailer_date_id ON sales (retailer_id, sale_date, id)",
+    "CREATE INDEX IF NOT EXISTS ix_sale_allocations_sale_id ON sale_allocations (sale_id)",
+    "CREATE INDEX IF NOT EXISTS ix_sale_allocations_batch_id ON sale_allocations (batch_id)",
+    "CREATE INDEX IF NOT EXISTS ix_daily_product_sales_day ON daily_product_sales (day, product_id)",
+)
+
+
+# Seeds the derived tables for databases that predate them. Both are created by step 1 in the same run, so no
+# reader can have cached them and data_versions needs no bump. Money is summed in whole paise, as the app does.
+_backfill_derived_tables = _statements(
+    "INSERT INTO product_stock (product_id, units_on_hand, open_batches, earliest_expiry, stock_value)"
+    " SELECT p.id, COALESCE(SUM(b.quantity_remaining), 0), COUNT(b.id), MIN(b.expiry_date),"
+    " COALESCE(SUM(b.quantity_remaining * b.unit_cost), 0)"
+    " FROM products p LEFT OUTER JOIN inventory_batches b ON b.product_id = p.id AND b.quantity_remaining > 0"
+    " WHERE NOT EXISTS (SELECT 1 FROM product_stock) AND EXISTS (SELECT 1 FROM inventory_batches)"
+    " GROUP BY p.id",
+    "INSERT INTO daily_product_sales (product_id, day, quantity, revenue_paise, cogs_paise)"
+    " SELECT product_id, day, SUM(quantity), SUM(revenue_paise), SUM(cogs_paise) FROM ("
+    " SELECT s.product_id AS product_id, date(s.sale_date) AS day, s.quantity AS quantity,"
+    " s.quantity * CAST(ROUND(s.selling_price * 100) AS INTEGER) AS revenue_paise, 0 AS cogs_paise FROM sales s"
+    " UNION ALL"
+    " SELECT s.product_id, date(s.sale_date), 0, 0, a.quantity * CAST(ROUND(a.unit_cost * 100) AS INTEGER)"
+    " FROM sale_allocations a JOIN sales s ON s.id = a.sale_id"
+    " ) AS ledger"
+    " WHERE NOT EXISTS (SELECT 1 FROM daily_product_sales)"
+    " GROUP BY product_id, day",
+)
+
+
+_purchase_export_index = _statements(
+    "CREATE INDEX IF NOT EXISTS ix_batches_purchased_at_id ON inventory_batches (purchased_at, id)",
+)
+
+# Also run by ``Base.metadata.create_all`` (see app.models.search), so fresh databases get the same indexes.
+create_search_indexes = _statements(
+    "CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5("
+    "name, brand, category, content='products', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN"
+    " INSERT INTO products_fts(rowid, name, brand, category) VALUES (new.id, new.name, new.brand, new.category); END",
+    "CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN"
+    " INSERT INTO products_fts(products_fts, rowid, name, brand, category)"
+    " VALUES ('delete', old.id, old.name, old.brand, old.category); END",
+    "CREATE TRIGGER IF NOT EXISTS products_fts_au AFTER UPDATE ON products BEGIN"
+    " INSERT INTO products_fts(products_fts, rowid, name, brand, category)"
+    " VALUES ('delete', old.id, old.name, old.brand, old.category);"
+    " INSERT INTO products_fts(rowid, name, brand, category) VALUES (new.id, new.name, new.brand, new.category); END",
+    "INSERT INTO products_fts(products_fts) VALUES ('rebuild')",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS suppliers_fts USING fts5("
+    "name, city, content='suppliers', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS suppliers_fts_ai AFTER INSERT ON suppliers BEGIN"
+    " INSERT INTO suppliers_fts(rowid, name, city) VALUES (new.id, new.name, new.city); END",
+    "CREATE TRIGGER IF NOT EXISTS suppliers_fts_ad AFTER DELETE ON suppliers BEGIN"
+    " INSERT INTO suppliers_fts(suppliers_fts, rowid, name, city) VALUES ('delete', old.id, old.name, old.city); END",
+    "CREATE TRIGGER IF NOT EXISTS suppliers_fts_au AFTER UPDATE ON suppliers BEGIN"
+    " INSERT INTO suppliers_fts(suppliers_fts, rowid, name, city) VALUES ('delete', old.id, old.name, old.city);"
+    " INSERT INTO suppliers_fts(rowid, name, city) VALUES (new.id, new.name, new.city); END",
+    "INSERT INTO suppliers_fts(suppliers_fts) VALUES ('rebuild')",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS retailers_fts USING fts5("
+    "name, channel, content='retailers', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS retailers_fts_ai AFTER INSERT ON retailers BEGIN"
+    " INSERT INTO retailers_fts(rowid, name, channel) VALUES (new.id, new.name, new.channel); END",
+    "CREATE TRIGGER IF NOT EXISTS retailers_fts_ad AFTER DELETE ON retailers BEGIN"
+    " INSERT INTO retailers_fts(retailers_fts, rowid, name, channel)"
+    " VALUES ('delete', old.id, old.name, old.channel); END",
+    "CREATE TRIGGER IF NOT EXISTS retailers_fts_au AFTER UPDATE ON retailers BEGIN"
+    " INSERT INTO retailers_fts(retailers_fts, rowid, name, channel) VALUES ('delete', old.id, old.name, old.channel);"
+    " INSERT INTO retailers_fts(rowid, name, channel) VALUES (new.id, new.name, new.channel); END",
+    "INSERT INTO retailers_fts(retailers_fts) VALUES ('rebuild')",
+    sqlite_only=True,
+)
+
+_idempotency_keys = _statements(
+    "CREATE TABLE IF NOT EXISTS idempotency_keys (scope VARCHAR(40) NOT NULL, \"key\" VARCHAR(200) NOT NULL,"
+    " request_hash VARCHAR(64) NOT NULL, resource_id INTEGER NOT NULL, created_at {timestamp} NOT NULL,"
+    " PRIMARY KEY (scope, \"key\"))",
+    "CREATE INDEX IF NOT EXISTS ix_idempotency_keys_created_at ON idempotency_keys (created_at)",
+)
+
+
+
+def _idempotency_responses(conn: Connection) -> None:
+    """Store each key's first response so replays return it verbatim."""
+    columns = {column["name"] for column in inspect(conn).get_columns("idempotency_keys")}
+    if "response_status" not in columns:
+        conn.execute(text("ALTER TABLE idempotency_keys ADD COLUMN response_status INTEGER"))
+    if "response_body" not in columns:
+        conn.execute(text("ALTER TABLE idempotency_keys ADD COLUMN response_body TEXT"))
+
+
+MIGRATIONS: list[tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "create tables", _create_tables),
+    (2, "legacy unit size, supplier, retailer and invoice columns", _legacy_columns),
+    (3, "pagination, FIFO and report indexes", _pagination_fifo_report_indexes),
+    (4, "backfill product_stock and daily_product_sales", _backfill_derived_tables),
+    (5, "purchase export index", _purchase_export_index),
+    (6, "FTS5 typeahead search indexes", create_search_indexes),
+    (7, "idempotency_keys table", _idempotency_keys),
+    (8, "idempotency_keys response columns", _idempotency_responses),
+]
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+class SchemaOutOfDate(RuntimeError):
+    pass
+
+
+def current_version(engine: Engine) -> int:
+    """The applied version, or 0 for a database that has never been migrated."""
+    try:
+        with engine.connect() as conn:
+            return conn.execute(select(schema_version.c.version).where(schema_version.c.id == 1)).scalar() or 0
+    except DBAPIError:
+        # No schema_version table yet.
+        return 0
+
+
+def migrate(engine: Engine) -> list[str]:
+    """Apply pending steps; returns the names of the steps this call applied."""
+    try:
+        with engine.begin() as conn:
+            conn.execute(CreateTable(schema_version, if_not_exists=True))
+            if conn.execute(select(schema_version.c.id).where(schema_version.c.id == 1)).first() is None:
+                conn.execute(schema_version.insert().values(id=1, version=0))
+    except IntegrityError:
+        pass  # another worker seeded the row first
+
+    applied: list[str] = []
+    with engine.begin() as conn:
+        # Take the row's write lock first; concurrent runs wait here and then see our version.
+        conn.execute(update(schema_version).where(schema_version.c.id == 1).values(version=schema_version.c.version))
+        version = conn.execute(select(schema_version.c.version).where(schema_version.c.id == 1)).scalar_one()
+        for step, name, apply in MIGRATIONS:
+            if step <= version:
+                continue
+            apply(conn)
+            applied.append(name)
+        if applied:
+            conn.execute(
+                update(schema_version)
+                .where(schema_version.c.id == 1)
+                .values(version=LATEST_VERSION, applied_at=datetime.now(UTC))
+            )
+    return applied
+
+
+def ensure_current(engine: Engine, auto_migrate: bool) -> None:
+    """Startup check: one row read when the schema is current."""
+    version = current_version(engine)
+    if version >= LATEST_VERSION:
+        return
+    if not auto_migrate:
+        raise SchemaOutOfDate(
+            f"Database schema is at version {version}, the app needs {LATEST_VERSION}; run `python -m app.migrate`"
+        )
+    migrate(engine)
+
+
+def main(argv: list[str] | None = None) -> int:
+    from .database import engine
+
+    parser = argparse.ArgumentParser(prog="python -m app.migrate", description="Apply SweetStock schema migrations")
+    parser.add_argument("--status", action="store_true", help="print the current and latest version and exit")
+    args = parser.parse_args(argv)
+
+    if args.status:
+        version = current_version(engine)
+        print(f"schema version {version} (latest {LATEST_VERSION})")
+        return 0 if version >= LATEST_VERSION else 1
+    applied = migrate(engine)
+    for name in applied:
+        print(f"applied: {name}")
+    print(f"schema version {current_version(engine)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
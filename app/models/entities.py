@@ -2,7 +2,21 @@ from datetime import UTC, datetime
 
 from decimal import Decimal
 
-from sqlalchemy import Column, Date, DateTime, ForeignKey, Integer, Numeric, String, UniqueConstraint
+from sqlalchemy import (
+    BigInteger,
+    CheckConstraint,
+    Column,
+    Date,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    Numeric,
+    String,
+    Text,
+    UniqueConstraint,
+    text,
+)
 from sqlalchemy.orm import relationship
 
 from ..database import Base
@@ -49,11 +63,37 @@ class Product(Base):
 
     batches = relationship("InventoryBatch", back_populates="product", cascade="all, delete-orphan")
     sales = relationship("Sale", back_populates="product", cascade="all, delete-orphan")
+    stock_totals = relationship("ProductStock", uselist=False, cascade="all, delete-orphan")
+    daily_sales = relationship("DailyProductSales", cascade="all, delete-orphan")
 
 
 class InventoryBatch(Base):
     __tablename__ = "inventory_batches"
-    __table_args__ = (UniqueConstraint("product_id", "batch_code", name="uq_product_batch"),)
+    __table_args__ = (
+        UniqueConstraint("product_id", "batch_code", name="uq_product_batch"),
+        CheckConstraint("quantity_remaining >= 0", name="ck_batch_quantity_remaining"),
+        # Keyset pagination of GET /api/purchases/, unfiltered and by product/supplier.
+        Index("ix_batches_expiry_code_id", "expiry_date", "batch_code", "id"),
+        Index("ix_batches_product_expiry_code_id", "product_id", "expiry_date", "batch_code", "id"),
+        Index("ix_batches_supplier_expiry_code_id", "supplier_id", "expiry_date", "batch_code", "id"),
+        # FIFO lookups and expiry alerts only ever want batches that still hold stock.
+        Index(
+            "ix_batches_open_fifo",
+            "product_id",
+            "expiry_date",
+            "purchased_at",
+            sqlite_where=text("quantity_remaining > 0"),
+            postgresql_where=text("quantity_remaining > 0"),
+        ),
+        Index(
+            "ix_batches_open_expiry",
+            "expiry_date",
+            sqlite_where=text("quantity_remaining > 0"),
+            postgresql_where=text("quantity_remaining > 0"),
+        ),
+        # Date-range purchase exports, oldest first.
+        Index("ix_batches_purchased_at_id", "purchased_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), nullable=False)
@@ -80,6 +120,12 @@ class InventoryBatch(Base):
 
 class Sale(Base):
     __tablename__ = "sales"
+    __table_args__ = (
+        # Keyset pagination of GET /api/sales/, unfiltered and by product/retailer.
+        Index("ix_sales_date_id", "sale_date", "id"),
+        Index("ix_sales_product_date_id", "product_id", "sale_date", "id"),
+        Index("ix_sales_retailer_date_id", "retailer_id", "sale_date", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), nullable=False)
@@ -104,6 +150,10 @@ class Sale(Base):
 
 class SaleAllocation(Base):
     __tablename__ = "sale_allocations"
+    __table_args__ = (
+        Index("ix_sale_allocations_sale_id", "sale_id"),
+        Index("ix_sale_allocations_batch_id", "batch_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     sale_id = Column(Integer, ForeignKey("sales.id", ondelete="CASCADE"), nullable=False)
@@ -113,3 +163,58 @@ class SaleAllocation(Base):
 
     sale = relationship("Sale", back_populates="allocations")
     batch = relationship("InventoryBatch", back_populates="allocations")
+
+
+class ProductStock(Base):
+    """Running stock totals per product, maintained in the same transaction as every stock change."""
+
+    __tablename__ = "product_stock"
+
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), primary_key=True)
+    units_on_hand = Column(Integer, nullable=False, default=0)
+    open_batches = Column(Integer, nullable=False, default=0)
+    earliest_expiry = Column(Date, nullable=True)
+    stock_value = Column(Numeric(14, 2), nullable=False, default=Decimal("0"))
+
+
+class DailyProductSales(Base):
+    """Per product and UTC calendar day sales rollup; money is kept in integer paise."""
+
+    __tablename__ = "daily_product_sales"
+    # Date-window reports; the primary key already serves per-product lookups.
+    __table_args__ = (Index("ix_daily_product_sales_day", "day", "product_id"),)
+
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    quantity = Column(BigInteger, nullable=False, default=0)
+    revenue_paise = Column(BigInteger, nullable=False, default=0)
+    cogs_paise = Column(BigInteger, nullable=False, default=0)
+
+
+class DataVersion(Base):
+    """Change counter per table, bumped inside every write transaction that touches it."""
+
+    __tablename__ = "data_versions"
+
+    name = Column(String(40), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+
+
+class IdempotencyKey(Base):
+    """A completed POST, keyed by the client's ``Idempotency-Key``; written in the same transaction."""
+
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (Index("ix_idempotency_keys_created_at", "created_at"),)
+
+    scope = Column(String(40), primary_key=True)
+    key = Column(String(200), primary_key=True)
+    request_hash = Column(String(64), nullable=False)
+    resource_id = Column(Integer, nullable=False)
+    # The response the first request got; NULL for keys recorded before migration 8.
+    response_status = Column(Integer, nullable=True)
+    response_body = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(UTC), nullable=False)
+
+
+# Registers the FTS5 search indexes to be created with the tables above.
+from . import search  # noqa: E402,F401
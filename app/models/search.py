@@ -0,0 +1,39 @@
+"""FTS5 trigram indexes behind the typeahead search routes (SQLite only).
+
+Each index is an external-content FTS5 table over its master-data table, kept
+in step by ``AFTER INSERT/UPDATE/DELETE`` triggers (created by migration step
+6, ``app.migrate.create_search_indexes``), so every write path (single
+creates, bulk upserts, deletes and cascades) updates it in the same transaction.
+The trigram tokenizer matches any substring of three or more characters.
+"""
+
+from dataclasses import dataclass
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection
+
+from ..database import Base
+from ..migrate import create_search_indexes
+
+
+@dataclass(frozen=True)
+class SearchIndex:
+    table: str
+    columns: tuple[str, ...]
+
+    @property
+    def name(self) -> str:
+        return f"{self.table}_fts"
+
+
+PRODUCTS = SearchIndex("products", ("name", "brand", "category"))
+SUPPLIERS = SearchIndex("suppliers", ("name", "city"))
+RETAILERS = SearchIndex("retailers", ("name", "channel"))
+SEARCH_INDEXES = (PRODUCTS, SUPPLIERS, RETAILERS)
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _create_with_tables(target, connection: Connection, **kw) -> None:
+    # Fresh databases (and the test suite's create_all) get the indexes along with the tables; the DDL itself
+    # lives only in the migration step that shipped it.
+    create_search_indexes(connection)
@@ -0,0 +1,75 @@
+import secrets
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from ..config import get_settings
+from ..database import slow_query_log
+from ..services.result_cache import get_result_cache
+from ..utils.cache import ResultCache
+from ..utils.profiling import ProfileFormat, ProfileStore
+
+ADMIN_TOKEN_HEADER = "X-Admin-Token"
+
+
+def is_admin_request(request: Request) -> bool:
+    """With ``ADMIN_TOKEN`` set, the request must carry it; otherwise only debug mode qualifies."""
+    settings = get_settings()
+    if settings.admin_token:
+        supplied = request.headers.get(ADMIN_TOKEN_HEADER, "")
+        return secrets.compare_digest(supplied.encode(), settings.admin_token.encode())
+    return settings.debug
+
+
+def require_admin(request: Request) -> None:
+    if not is_admin_request(request):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+def require_slow_query_log() -> None:
+    if not get_settings().slow_query_log_enabled:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Slow-query log is disabled")
+
+
+@router.get("/cache")
+def cache_stats(cache: ResultCache | None = Depends(get_result_cache)):
+    return {"enabled": cache is not None, **(cache.stats() if cache is not None else {})}
+
+
+@router.get("/slow-queries", dependencies=[Depends(require_slow_query_log)])
+def slow_queries():
+    return {"enabled": True, **slow_query_log.stats(), "queries": slow_query_log.entries()}
+
+
+@router.delete(
+    "/slow-queries",
+    status_code=status.HTTP_204_NO_CONTENT,
+    dependencies=[Depends(require_slow_query_log)],
+)
+def clear_slow_queries():
+    slow_query_log.clear()
+
+
+def get_profile_store(request: Request) -> ProfileStore | None:
+    return getattr(request.app.state, "profile_store", None)
+
+
+@router.get("/profiles")
+def list_profiles(store: ProfileStore | None = Depends(get_profile_store)):
+    return {"enabled": store is not None, "profiles": store.summaries() if store is not None else []}
+
+
+@router.get("/profiles/{profile_id}")
+def get_profile(
+    profile_id: str, format: ProfileFormat = "collapsed", store: ProfileStore | None = Depends(get_profile_store)
+):
+    profile = store.get(profile_id) if store is not None else None
+    if profile is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    if format == "speedscope":
+        headers = {"Content-Disposition": f'attachment; filename="{profile_id}.speedscope.json"'}
+        return JSONResponse(profile.speedscope(), headers=headers)
+    return PlainTextResponse(profile.collapsed())
@@ -1,11 +1,17 @@
 from typing import List
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
-from ..database import get_db
+from ..database import get_db, get_read_db
+from ..schemas.bulk import UpsertResult
 from ..schemas.product import ProductCreate, ProductRead
-from ..services import product_service
+from ..services import data_version, product_service
+from ..services.conditional_get import etag_for
+from ..services.search_service import MAX_SEARCH_RESULTS
+from ..utils.bulk_input import MAX_BULK_UPSERT_LINES, bulk_openapi_body, read_bulk_lines
+from ..utils.pagination import PageParams, page_params, set_next_cursor
 
 router = APIRouter()
 
@@ -15,6 +21,23 @@ def create_product(payload: ProductCreate, db: Session = Depends(get_db)):
     return product_service.create_product(db, payload)
 
 
-@router.get("/", response_model=List[ProductRead])
-def list_products(db: Session = Depends(get_db)):
-    return product_service.list_products(db)
+@router.post("/bulk", response_model=UpsertResult, openapi_extra=bulk_openapi_body(ProductCreate))
+async def upsert_products(request: Request, db: Session = Depends(get_db)):
+    """Create or update products by name; every field of a matched record is overwritten."""
+    lines = await read_bulk_lines(request, ProductCreate, max_lines=MAX_BULK_UPSERT_LINES)
+    return await run_in_threadpool(product_service.upsert_products, db, lines)
+
+
+@router.get("/", response_model=List[ProductRead], dependencies=[Depends(etag_for(data_version.PRODUCTS))])
+def list_products(response: Response, page: PageParams = Depends(page_params), db: Session = Depends(get_read_db)):
+    return set_next_cursor(response, product_service.list_products(db, page))
+
+
+@router.get("/search", response_model=List[ProductRead], dependencies=[Depends(etag_for(data_version.PRODUCTS))])
+def search_products(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=MAX_SEARCH_RESULTS),
+    db: Session = Depends(get_read_db),
+):
+    """Typeahead: prefix matches on the name first, then substring matches on any indexed field."""
+    return product_service.search_products(db, q, limit)
@@ -1,20 +1,77 @@
-from typing import List
+from datetime import date
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
-from ..database import get_db
-from ..schemas.purchase import PurchaseCreate, PurchaseRead
-from ..services import purchase_service
+from ..database import get_db, get_read_db
+from ..schemas.purchase import PurchaseBulkResult, PurchaseCreate, PurchaseRead
+from ..services import data_version, purchase_service
+from ..services.conditional_get import etag_for
+from ..services.idempotency import idempotency_key
+from ..utils.bulk_input import MAX_BULK_PURCHASE_LINES, bulk_openapi_body, read_bulk_lines
+from ..utils.export import ExportFormat, export_response
+from ..utils.pagination import PageParams, page_params, set_next_cursor
 
 router = APIRouter()
 
 
 @router.post("/", response_model=PurchaseRead, status_code=status.HTTP_201_CREATED)
-def create_purchase(payload: PurchaseCreate, db: Session = Depends(get_db)):
-    return purchase_service.create_purchase(db, payload)
+def create_purchase(
+    payload: PurchaseCreate,
+    key: str | None = Depends(idempotency_key),
+    db: Session = Depends(get_db),
+):
+    replayed = purchase_service.find_idempotent_purchase(db, key, payload)
+    if replayed is not None:
+        return replayed
+    return purchase_service.create_purchase(db, payload, key)
 
 
-@router.get("/", response_model=List[PurchaseRead])
-def list_purchases(db: Session = Depends(get_db)):
-    return purchase_service.list_batches(db)
+@router.post(
+    "/bulk",
+    response_model=PurchaseBulkResult,
+    status_code=status.HTTP_201_CREATED,
+    openapi_extra=bulk_openapi_body(PurchaseCreate),
+)
+async def create_purchases_bulk(
+    request: Request,
+    response: Response,
+    dry_run: bool = Query(False, description="Validate every line and report totals without saving"),
+    db: Session = Depends(get_db),
+):
+    lines = await read_bulk_lines(request, PurchaseCreate, max_lines=MAX_BULK_PURCHASE_LINES)
+    if dry_run:
+        response.status_code = status.HTTP_200_OK
+    return await run_in_threadpool(purchase_service.create_purchases_bulk, db, lines, dry_run)
+
+
+@router.get(
+    "/",
+    response_model=List[PurchaseRead],
+    dependencies=[Depends(etag_for(data_version.BATCHES, data_version.PRODUCTS, data_version.SUPPLIERS))],
+)
+def list_purchases(
+    response: Response,
+    page: PageParams = Depends(page_params),
+    product_id: Optional[int] = None,
+    supplier_id: Optional[int] = None,
+    expires_from: Optional[date] = Query(None, description="Earliest expiry date, inclusive"),
+    expires_to: Optional[date] = Query(None, description="Latest expiry date, inclusive"),
+    in_stock: Optional[bool] = Query(None, description="true: batches with units left; false: drained batches"),
+    db: Session = Depends(get_read_db),
+):
+    batches = purchase_service.list_batches(db, page, product_id, supplier_id, expires_from, expires_to, in_stock)
+    return set_next_cursor(response, batches)
+
+
+@router.get("/export")
+def export_purchases(
+    date_from: Optional[date] = Query(None, description="First purchase day (UTC), inclusive"),
+    date_to: Optional[date] = Query(None, description="Last purchase day (UTC), inclusive"),
+    format: ExportFormat = Query("csv"),
+    db: Session = Depends(get_read_db),
+):
+    """Purchased batches, oldest first, streamed as CSV or NDJSON."""
+    return export_response(db, purchase_service.batches_export_statement(date_from, date_to), format, "purchases")
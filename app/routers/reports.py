@@ -1,25 +1,51 @@
-from typing import List
+from typing import List, Optional
 
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 
-from ..database import get_db
+from ..database import get_read_db
 from ..schemas.report import ProfitReport, SlowProduct, TopProduct
-from ..services import report_service
+from ..services import data_version, report_service
+from ..services.conditional_get import etag_for
+from ..services.result_cache import cached, get_result_cache
+from ..utils.cache import ResultCache
 
-router = APIRouter()
+REPORT_TABLES = (data_version.SALES, data_version.PRODUCTS)
+
+router = APIRouter(dependencies=[Depends(etag_for(*REPORT_TABLES))])
 
 
 @router.get("/top-selling", response_model=List[TopProduct])
-def top_selling(limit: int = Query(5, ge=1, le=50), db: Session = Depends(get_db)):
-    return report_service.get_top_selling_products(db, limit)
+def top_selling(
+    limit: int = Query(5, ge=1, le=50),
+    days: Optional[int] = Query(None, ge=1, le=3660, description="Only count the last N days (default: all time)"),
+    db: Session = Depends(get_read_db),
+    cache: Optional[ResultCache] = Depends(get_result_cache),
+):
+    return cached(cache, db, REPORT_TABLES, report_service.get_top_selling_products, limit, days)
 
 
 @router.get("/slow-moving", response_model=List[SlowProduct])
-def slow_moving(limit: int = Query(5, ge=1, le=50), db: Session = Depends(get_db)):
-    return report_service.get_slow_moving_products(db, limit)
-
-
-@router.get("/monthly-profit", response_model=ProfitReport)
-def monthly_profit(db: Session = Depends(get_db)):
-    return report_service.get_monthly_profit_report(db)
+def slow_moving(
+    limit: int = Query(5, ge=1, le=50),
+    days: int = Query(30, ge=1, le=3660, description="Look-back window in days"),
+    db: Session = Depends(get_read_db),
+    cache: Optional[ResultCache] = Depends(get_result_cache),
+):
+    return cached(cache, db, REPORT_TABLES, report_service.get_slow_moving_products, limit, days)
+
+
+MONTH_PATTERN = r"^\d{4}-(0[1-9]|1[0-2])$"
+
+
+@router.get("/monthly-profit", response_model=ProfitReport, response_model_exclude_none=True)
+def monthly_profit(
+    from_month: Optional[str] = Query(None, alias="from", pattern=MONTH_PATTERN, description="First month, YYYY-MM"),
+    to_month: Optional[str] = Query(None, alias="to", pattern=MONTH_PATTERN, description="Last month, YYYY-MM"),
+    by_product: bool = Query(False, description="Break each month down per product"),
+    db: Session = Depends(get_read_db),
+    cache: Optional[ResultCache] = Depends(get_result_cache),
+):
+    return cached(
+        cache, db, REPORT_TABLES, report_service.get_monthly_profit_report, from_month, to_month, by_product
+    )
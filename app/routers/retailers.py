@@ -1,11 +1,17 @@
 from typing import List
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
-from ..database import get_db
+from ..database import get_db, get_read_db
+from ..schemas.bulk import UpsertResult
 from ..schemas.retailer import RetailerCreate, RetailerRead
-from ..services import retailer_service
+from ..services import data_version, retailer_service
+from ..services.conditional_get import etag_for
+from ..services.search_service import MAX_SEARCH_RESULTS
+from ..utils.bulk_input import MAX_BULK_UPSERT_LINES, bulk_openapi_body, read_bulk_lines
+from ..utils.pagination import PageParams, page_params, set_next_cursor
 
 router = APIRouter()
 
@@ -15,11 +21,28 @@ def create_retailer(payload: RetailerCreate, db: Session = Depends(get_db)):
     return retailer_service.create_retailer(db, payload)
 
 
-@router.get("/", response_model=List[RetailerRead])
-def list_retailers(db: Session = Depends(get_db)):
-    return retailer_service.list_retailers(db)
+@router.post("/bulk", response_model=UpsertResult, openapi_extra=bulk_openapi_body(RetailerCreate))
+async def upsert_retailers(request: Request, db: Session = Depends(get_db)):
+    """Create or update retailers by name; every field of a matched record is overwritten."""
+    lines = await read_bulk_lines(request, RetailerCreate, max_lines=MAX_BULK_UPSERT_LINES)
+    return await run_in_threadpool(retailer_service.upsert_retailers, db, lines)
+
+
+@router.get("/", response_model=List[RetailerRead], dependencies=[Depends(etag_for(data_version.RETAILERS))])
+def list_retailers(response: Response, page: PageParams = Depends(page_params), db: Session = Depends(get_read_db)):
+    return set_next_cursor(response, retailer_service.list_retailers(db, page))
 
 
 @router.delete("/{retailer_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_retailer(retailer_id: int, db: Session = Depends(get_db)):
     retailer_service.delete_retailer(db, retailer_id)
+
+
+@router.get("/search", response_model=List[RetailerRead], dependencies=[Depends(etag_for(data_version.RETAILERS))])
+def search_retailers(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=MAX_SEARCH_RESULTS),
+    db: Session = Depends(get_read_db),
+):
+    """Typeahead: prefix matches on the name first, then substring matches on any indexed field."""
+    return retailer_service.search_retailers(db, q, limit)
@@ -1,20 +1,75 @@
-from typing import List
+from datetime import date
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
-from ..database import get_db
+from ..config import get_settings
+from ..database import get_db, get_read_db
 from ..schemas.sale import SaleCreate, SaleRead
-from ..services import sales_service
+from ..services import data_version, sales_service
+from ..services.conditional_get import etag_for
+from ..services.idempotency import idempotency_key
+from ..utils.bulk_input import bulk_openapi_body, read_bulk_lines
+from ..utils.export import ExportFormat, export_response
+from ..utils.fast_json import FastJSONResponse
+from ..utils.pagination import PageParams, page_params, set_next_cursor
 
 router = APIRouter()
 
 
 @router.post("/", response_model=SaleRead, status_code=status.HTTP_201_CREATED)
-def create_sale(payload: SaleCreate, db: Session = Depends(get_db)):
-    return sales_service.create_sale(db, payload)
+def create_sale(
+    payload: SaleCreate,
+    key: str | None = Depends(idempotency_key),
+    db: Session = Depends(get_db),
+):
+    replayed = sales_service.find_idempotent_sale(db, key, payload)
+    if replayed is not None:
+        return replayed
+    return sales_service.create_sale(db, payload, key)
 
 
-@router.get("/", response_model=List[SaleRead])
-def list_sales(db: Session = Depends(get_db)):
-    return sales_service.list_sales(db)
+@router.post(
+    "/bulk",
+    response_model=List[SaleRead],
+    status_code=status.HTTP_201_CREATED,
+    openapi_extra=bulk_openapi_body(SaleCreate),
+)
+async def create_sales_bulk(request: Request, db: Session = Depends(get_db)):
+    lines = await read_bulk_lines(request, SaleCreate)
+    return await run_in_threadpool(sales_service.create_sales_bulk, db, lines)
+
+
+@router.get(
+    "/",
+    response_model=List[SaleRead],
+    dependencies=[Depends(etag_for(data_version.SALES, data_version.RETAILERS))],
+)
+def list_sales(
+    response: Response,
+    page: PageParams = Depends(page_params),
+    date_from: Optional[date] = Query(None, description="First sale day (UTC), inclusive"),
+    date_to: Optional[date] = Query(None, description="Last sale day (UTC), inclusive"),
+    product_id: Optional[int] = None,
+    retailer_id: Optional[int] = None,
+    invoice_number: Optional[str] = Query(None, max_length=40),
+    db: Session = Depends(get_read_db),
+):
+    filters = (date_from, date_to, product_id, retailer_id, invoice_number)
+    if get_settings().fast_json_enabled:
+        sales = set_next_cursor(response, sales_service.list_sales_fast(db, page, *filters))
+        return FastJSONResponse(sales, headers=dict(response.headers))
+    return set_next_cursor(response, sales_service.list_sales(db, page, *filters))
+
+
+@router.get("/export")
+def export_sales(
+    date_from: Optional[date] = Query(None, description="First sale day (UTC), inclusive"),
+    date_to: Optional[date] = Query(None, description="Last sale day (UTC), inclusive"),
+    format: ExportFormat = Query("csv"),
+    db: Session = Depends(get_read_db),
+):
+    """The sales ledger, one row per FIFO allocation with its COGS, streamed as CSV or NDJSON."""
+    return export_response(db, sales_service.sales_ledger_statement(date_from, date_to), format, "sales-ledger")
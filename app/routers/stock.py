@@ -1,20 +1,33 @@
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
 from sqlalchemy.orm import Session
 
-from ..database import get_db
+from ..config import get_settings
+from ..database import get_read_db
 from ..schemas.stock import ExpiryAlert, StockOverview
-from ..services import stock_service
+from ..services import data_version, stock_service
+from ..services.conditional_get import etag_for
+from ..services.result_cache import cached, get_result_cache
+from ..utils.cache import ResultCache
+from ..utils.fast_json import FastJSONResponse
 
 router = APIRouter()
 
+OVERVIEW_TABLES = (data_version.BATCHES, data_version.PRODUCTS, data_version.SUPPLIERS)
+EXPIRY_TABLES = (data_version.BATCHES, data_version.PRODUCTS)
 
-@router.get("/", response_model=StockOverview)
-def stock_overview(db: Session = Depends(get_db)):
-    return stock_service.get_stock_overview(db)
 
+@router.get("/", response_model=StockOverview, dependencies=[Depends(etag_for(*OVERVIEW_TABLES))])
+def stock_overview(
+    response: Response, db: Session = Depends(get_read_db), cache: Optional[ResultCache] = Depends(get_result_cache)
+):
+    if get_settings().fast_json_enabled:
+        overview = cached(cache, db, OVERVIEW_TABLES, stock_service.get_stock_overview_fast)
+        return FastJSONResponse(overview, headers=dict(response.headers))
+    return cached(cache, db, OVERVIEW_TABLES, stock_service.get_stock_overview)
 
-@router.get("/expiring", response_model=List[ExpiryAlert])
-def expiring_batches(db: Session = Depends(get_db)):
-    return stock_service.get_expiry_alerts(db)
+
+@router.get("/expiring", response_model=List[ExpiryAlert], dependencies=[Depends(etag_for(*EXPIRY_TABLES))])
+def expiring_batches(db: Session = Depends(get_read_db), cache: Optional[ResultCache] = Depends(get_result_cache)):
+    return cached(cache, db, EXPIRY_TABLES, stock_service.get_expiry_alerts)
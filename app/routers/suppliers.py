@@ -1,11 +1,17 @@
 from typing import List
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
-from ..database import get_db
+from ..database import get_db, get_read_db
+from ..schemas.bulk import UpsertResult
 from ..schemas.supplier import SupplierCreate, SupplierRead
-from ..services import supplier_service
+from ..services import data_version, supplier_service
+from ..services.conditional_get import etag_for
+from ..services.search_service import MAX_SEARCH_RESULTS
+from ..utils.bulk_input import MAX_BULK_UPSERT_LINES, bulk_openapi_body, read_bulk_lines
+from ..utils.pagination import PageParams, page_params, set_next_cursor
 
 router = APIRouter()
 
@@ -15,11 +21,28 @@ def create_supplier(payload: SupplierCreate, db: Session = Depends(get_db)):
     return supplier_service.create_supplier(db, payload)
 
 
-@router.get("/", response_model=List[SupplierRead])
-def list_suppliers(db: Session = Depends(get_db)):
-    return supplier_service.list_suppliers(db)
+@router.post("/bulk", response_model=UpsertResult, openapi_extra=bulk_openapi_body(SupplierCreate))
+async def upsert_suppliers(request: Request, db: Session = Depends(get_db)):
+    """Create or update suppliers by name; every field of a matched record is overwritten."""
+    lines = await read_bulk_lines(request, SupplierCreate, max_lines=MAX_BULK_UPSERT_LINES)
+    return await run_in_threadpool(supplier_service.upsert_suppliers, db, lines)
+
+
+@router.get("/", response_model=List[SupplierRead], dependencies=[Depends(etag_for(data_version.SUPPLIERS))])
+def list_suppliers(response: Response, page: PageParams = Depends(page_params), db: Session = Depends(get_read_db)):
+    return set_next_cursor(response, supplier_service.list_suppliers(db, page))
 
 
 @router.delete("/{supplier_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_supplier(supplier_id: int, db: Session = Depends(get_db)):
     supplier_service.delete_supplier(db, supplier_id)
+
+
+@router.get("/search", response_model=List[SupplierRead], dependencies=[Depends(etag_for(data_version.SUPPLIERS))])
+def search_suppliers(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=MAX_SEARCH_RESULTS),
+    db: Session = Depends(get_read_db),
+):
+    """Typeahead: prefix matches on the name first, then substring matches on any indexed field."""
+    return supplier_service.search_suppliers(db, q, limit)
@@ -0,0 +1,7 @@
+from pydantic import BaseModel
+
+
+class UpsertResult(BaseModel):
+    created: int
+    updated: int
+    unchanged: int
@@ -35,3 +35,10 @@ class PurchaseRead(BaseModel):
     supplier: SupplierRead | None = None
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class PurchaseBulkResult(BaseModel):
+    dry_run: bool
+    batches: int
+    units: int
+    batch_ids: list[int]
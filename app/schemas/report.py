@@ -1,5 +1,5 @@
 from decimal import Decimal
-from typing import List
+from typing import List, Optional
 
 from pydantic import BaseModel
 
@@ -14,7 +14,15 @@ class TopProduct(BaseModel):
 class SlowProduct(BaseModel):
     product_id: int
     product_name: str
-    sold_last_30_days: int
+    sold_in_window: int  # units sold in the route's ``days`` look-back window
+
+
+class ProductProfitLine(BaseModel):
+    product_id: int
+    product_name: str
+    revenue: Decimal
+    cogs: Decimal
+    profit: Decimal
 
 
 class ProfitLine(BaseModel):
@@ -22,6 +30,7 @@ class ProfitLine(BaseModel):
     revenue: Decimal
     cogs: Decimal
     profit: Decimal
+    products: Optional[List[ProductProfitLine]] = None
 
 
 class ProfitReport(BaseModel):
@@ -0,0 +1,43 @@
+"""ETag / ``If-None-Match`` support for GET routes, driven by ``data_versions``.
+
+A route declares the tables its response is built from; the tag is a hash of
+their change counters (plus today's date, which windows and expiry countdowns
+depend on), so checking it costs one primary-key read and a match answers
+``304 Not Modified`` before the route body, and its query, ever runs.
+"""
+
+import hashlib
+from datetime import UTC, datetime
+
+from fastapi import Depends, HTTPException, Request, Response, status
+from sqlalchemy.orm import Session
+
+from ..database import get_read_db
+from . import data_version
+
+
+def _matches(header: str | None, tag: str) -> bool:
+    if not header:
+        return False
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    return "*" in candidates or any(candidate.removeprefix("W/") == tag.removeprefix("W/") for candidate in candidates)
+
+
+def compute_etag(db: Session, tables: tuple[str, ...]) -> str:
+    versions = data_version.current(db, tables)
+    digest = hashlib.sha1(repr((tables, versions, datetime.now(UTC).date())).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def etag_for(*tables: str):
+    """Dependency for a GET route whose response only changes when ``tables`` do."""
+
+    def check(request: Request, response: Response, db: Session = Depends(get_read_db)) -> str:
+        tag = compute_etag(db, tables)
+        headers = {"ETag": tag, "Cache-Control": "no-cache"}
+        if _matches(request.headers.get("if-none-match"), tag):
+            raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        response.headers.update(headers)
+        return tag
+
+    return check
@@ -0,0 +1,48 @@
+"""Per-table change counters stored in ``data_versions``.
+
+Write services call ``bump`` inside their transaction, so a counter moves if
+and only if the change commits, and every worker process sees the same value.
+Readers compare ``current`` against what they saw before to decide whether a
+cached result is still valid.
+"""
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+from ..models.entities import DataVersion
+from ..utils.sql import dialect_insert
+
+PRODUCTS = "products"
+BATCHES = "inventory_batches"
+SALES = "sales"
+SUPPLIERS = "suppliers"
+RETAILERS = "retailers"
+
+
+def _increment(db: Session, names: tuple[str, ...]) -> int:
+    return db.execute(
+        update(DataVersion)
+        .where(DataVersion.name.in_(names))
+        .values(version=DataVersion.version + 1)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+
+def bump(db: Session, *names: str) -> None:
+    if _increment(db, names) == len(names):
+        return
+    upsert = dialect_insert(db)
+    if upsert is not None:
+        rows = [{"name": name, "version": 0} for name in names]
+        db.execute(upsert(DataVersion).values(rows).on_conflict_do_nothing())
+    else:
+        existing = set(db.scalars(select(DataVersion.name).where(DataVersion.name.in_(names))))
+        missing = [{"name": name, "version": 0} for name in names if name not in existing]
+        if missing:
+            db.execute(insert(DataVersion), missing)
+    _increment(db, names)
+
+
+def current(db: Session, names: tuple[str, ...]) -> tuple[int, ...]:
+    versions = dict(db.execute(select(DataVersion.name, DataVersion.version).where(DataVersion.name.in_(names))).all())
+    return tuple(versions.get(name, 0) for name in names)
@@ -0,0 +1,233 @@
+"""Optional in-process FIFO index of open inventory batches.
+
+The database stays the source of truth. Per product, the index keeps the open
+batches in FIFO order with their remaining quantities so a sale only loads the
+batches it is about to consume instead of sorting the whole open-batch list.
+
+Changes reach the index only through committed transactions: ``after_flush``
+(and ``record_change`` for Core-level updates) stages the new state of every
+touched ``InventoryBatch`` on the session, and ``after_commit`` applies it. A
+rolled-back transaction never touches the index. Products that are not indexed
+yet are built from the database on demand.
+
+The index is per process, so other workers' writes never reach it. Every plan is
+therefore checked against the database before it is used: the loaded batches
+must still hold the remaining quantities the index expects, and a count over the
+open-batch FIFO index must find no other open batch at or ahead of the last one
+planned (a batch with an earlier expiry inserted elsewhere fails this). A plan
+that fails either check rebuilds the product; if the rebuilt plan fails too, the
+sale falls back to reading every open batch from the database.
+"""
+
+import bisect
+import threading
+import weakref
+from datetime import UTC, date, datetime
+
+from sqlalchemy import event, func, select, tuple_
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from ..config import get_settings
+from ..models.entities import InventoryBatch
+
+_PENDING_KEY = "fifo_index_pending"
+
+FifoKey = tuple[date, datetime, int]
+
+
+def _fifo_key(expiry_date: date, purchased_at: datetime, batch_id: int) -> FifoKey:
+    # SQLite hands back naive datetimes while freshly flushed objects still carry
+    # their UTC tzinfo; compare both as naive UTC.
+    if purchased_at.tzinfo is not None:
+        purchased_at = purchased_at.replace(tzinfo=None)
+    return (expiry_date, purchased_at, batch_id)
+
+
+class _ProductQueue:
+    __slots__ = ("order", "remaining")
+
+    def __init__(self) -> None:
+        self.order: list[FifoKey] = []
+        self.remaining: dict[int, int] = {}
+
+    def put(self, key: FifoKey, quantity_remaining: int) -> None:
+        batch_id = key[2]
+        if batch_id in self.remaining:
+            if quantity_remaining > 0:
+                self.remaining[batch_id] = quantity_remaining
+                return
+            position = bisect.bisect_left(self.order, key)
+            if position < len(self.order) and self.order[position] == key:
+                del self.order[position]
+            else:
+                self.order = [entry for entry in self.order if entry[2] != batch_id]
+            del self.remaining[batch_id]
+        elif quantity_remaining > 0:
+            bisect.insort(self.order, key)
+            self.remaining[batch_id] = quantity_remaining
+
+    def prefix(self, quantity: int) -> tuple[list[int], int]:
+        """Batch ids, oldest first, whose stock covers ``quantity`` (or all of them)."""
+        ids: list[int] = []
+        covered = 0
+        for _, _, batch_id in self.order:
+            if covered >= quantity:
+                break
+            ids.append(batch_id)
+            covered += self.remaining[batch_id]
+        return ids, covered
+
+
+class FifoIndex:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._queues: dict[int, _ProductQueue] = {}
+
+    def invalidate(self, product_id: int | None = None) -> None:
+        with self._lock:
+            if product_id is None:
+                self._queues.clear()
+            else:
+                self._queues.pop(product_id, None)
+
+    def _rebuild(self, db: Session, product_id: int) -> _ProductQueue:
+        rows = (
+            db.query(
+                InventoryBatch.id,
+                InventoryBatch.expiry_date,
+                InventoryBatch.purchased_at,
+                InventoryBatch.quantity_remaining,
+            )
+            .filter(InventoryBatch.product_id == product_id, InventoryBatch.quantity_remaining > 0)
+            .all()
+        )
+        queue = _ProductQueue()
+        queue.order = sorted(_fifo_key(row.expiry_date, row.purchased_at, row.id) for row in rows)
+        queue.remaining = {row.id: row.quantity_remaining for row in rows}
+        with self._lock:
+            self._queues[product_id] = queue
+        return queue
+
+    def _plan(self, db: Session, product_id: int, quantity: int) -> tuple[list[int], int, dict[int, int]]:
+        with self._lock:
+            queue = self._queues.get(product_id)
+            if queue is not None:
+                ids, covered = queue.prefix(quantity)
+                return ids, covered, {batch_id: queue.remaining[batch_id] for batch_id in ids}
+        queue = self._rebuild(db, product_id)
+        ids, covered = queue.prefix(quantity)
+        return ids, covered, {batch_id: queue.remaining[batch_id] for batch_id in ids}
+
+    @staticmethod
+    def _is_fifo_prefix(db: Session, product_id: int, batches: list[InventoryBatch]) -> bool:
+        """True when no open batch outside ``batches`` sorts at or before the last of them."""
+        if not batches:
+            return True
+        last = batches[-1]
+        purchased_at = last.purchased_at if last.purchased_at.tzinfo else last.purchased_at.replace(tzinfo=UTC)
+        ahead = db.scalar(
+            select(func.count())
+            .select_from(InventoryBatch)
+            .where(
+                InventoryBatch.product_id == product_id,
+                InventoryBatch.quantity_remaining > 0,
+                tuple_(InventoryBatch.expiry_date, InventoryBatch.purchased_at, InventoryBatch.id)
+                <= tuple_(last.expiry_date, purchased_at, last.id),
+            )
+        )
+        return ahead == len(batches)
+
+    def batches_for(self, db: Session, product_id: int, quantity: int) -> list[InventoryBatch]:
+        """Load the FIFO-ordered batches needed to cover ``quantity``.
+
+        Returns every open batch when stock is short, so the caller's availability
+        check still sees the true total.
+        """
+        for attempt in range(2):
+            ids, covered, expected = self._plan(db, product_id, quantity)
+            loaded = {}
+            if ids:
+                loaded = {batch.id: batch for batch in db.query(InventoryBatch).filter(InventoryBatch.id.in_(ids))}
+            batches = [loaded[batch_id] for batch_id in ids if batch_id in loaded]
+            consistent = (
+                len(batches) == len(ids)
+                and all(batch.quantity_remaining == expected[batch.id] for batch in batches)
+                and self._is_fifo_prefix(db, product_id, batches)
+            )
+            if consistent and (covered >= quantity or attempt == 1):
+                return batches
+            # Out of step with the database (or short, which may mean another process
+            # bought stock): rebuild this product from the source of truth once.
+            self.invalidate(product_id)
+        # Still inconsistent, so other writers are busy with this product: use the database directly.
+        return (
+            db.query(InventoryBatch)
+            .filter(InventoryBatch.product_id == product_id, InventoryBatch.quantity_remaining > 0)
+            .order_by(InventoryBatch.expiry_date, InventoryBatch.purchased_at, InventoryBatch.id)
+            .all()
+        )
+
+    def apply(self, changes: dict[int, tuple[int, FifoKey, int]]) -> None:
+        with self._lock:
+            for product_id, key, quantity_remaining in changes.values():
+                queue = self._queues.get(product_id)
+                if queue is not None:
+                    queue.put(key, quantity_remaining)
+
+    def size(self, product_id: int) -> int | None:
+        with self._lock:
+            queue = self._queues.get(product_id)
+            return None if queue is None else len(queue.order)
+
+
+_indexes: "weakref.WeakKeyDictionary[Engine, FifoIndex]" = weakref.WeakKeyDictionary()
+_indexes_lock = threading.Lock()
+
+
+def is_enabled() -> bool:
+    return get_settings().fifo_index_enabled
+
+
+def get_fifo_index(db: Session) -> FifoIndex:
+    engine = db.get_bind()
+    with _indexes_lock:
+        index = _indexes.get(engine)
+        if index is None:
+            index = _indexes[engine] = FifoIndex()
+        return index
+
+
+def record_change(session: Session, batch: InventoryBatch, quantity_remaining: int | None = None) -> None:
+    """Stage a batch's new remaining quantity; it reaches the index when the session commits."""
+    if not is_enabled():
+        return
+    if quantity_remaining is None:
+        quantity_remaining = batch.quantity_remaining
+    key = _fifo_key(batch.expiry_date, batch.purchased_at, batch.id)
+    session.info.setdefault(_PENDING_KEY, {})[batch.id] = (batch.product_id, key, quantity_remaining)
+
+
+@event.listens_for(Session, "after_flush")
+def _record_batch_changes(session: Session, flush_context) -> None:
+    if not is_enabled():
+        return
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, InventoryBatch):
+            record_change(session, obj)
+    for obj in session.deleted:
+        if isinstance(obj, InventoryBatch):
+            record_change(session, obj, 0)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_batch_changes(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        get_fifo_index(session).apply(pending)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_batch_changes(session: Session, transaction) -> None:
+    if transaction.parent is None:
+        session.info.pop(_PENDING_KEY, None)
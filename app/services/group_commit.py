@@ -0,0 +1,157 @@
+"""Group commit: many small writes, one transaction.
+
+A ``GroupCommitWriter`` owns a single background thread and session. Callers
+``submit`` a payload and block on the result; the writer drains the queue,
+runs up to ``max_batch`` payloads (or whatever arrives within ``window_ms`` of
+the first) through the work function in order, and commits them together, so
+a burst of requests pays for one commit/fsync instead of one each.
+
+If a payload fails, the group is rolled back, that caller gets the exception
+and the rest of the group is replayed. Exceptions listed in ``retry_on`` replay
+the whole group instead (e.g. a concurrent writer in another process won a row).
+A failure in the commit itself cannot be pinned on one payload, so the group is
+then replayed one payload per transaction and only the culprit fails.
+
+Writers are kept per engine and hold it only weakly; when the engine is garbage
+collected its writers' threads stop.
+"""
+
+import queue
+import threading
+import time
+import weakref
+from concurrent.futures import Future
+from typing import Any, Callable
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+_STOP = object()
+
+
+class GroupCommitWriter:
+    def __init__(
+        self,
+        engine: Engine,
+        work: Callable[[Session, Any], Any],
+        max_batch: int,
+        window_ms: float,
+        retry_on: tuple[type[Exception], ...] = (),
+        max_attempts: int = 5,
+    ) -> None:
+        self._engine = weakref.ref(engine)
+        self._session_factory = sessionmaker(autoflush=False, autocommit=False, future=True)
+        self._work = work
+        self._max_batch = max(1, max_batch)
+        self._window = max(0.0, window_ms) / 1000
+        self._retry_on = retry_on
+        self._max_attempts = max_attempts
+        self._queue: queue.Queue = queue.Queue()
+        self.groups_committed = 0
+        self.items_committed = 0
+        self._thread = threading.Thread(target=self._run, name="group-commit-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, payload: Any) -> Any:
+        future: Future = Future()
+        self._queue.put((payload, future))
+        return future.result()
+
+    def close(self, wait: bool = True) -> None:
+        self._queue.put(_STOP)
+        if wait:
+            self._thread.join()
+
+    def _collect(self, first) -> list:
+        group = [first]
+        deadline = time.monotonic() + self._window
+        while len(group) < self._max_batch:
+            timeout = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                self._queue.put(_STOP)
+                break
+            group.append(item)
+        return group
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+            group = self._collect(first)
+            try:
+                self._commit_group(group)
+            except Exception as exc:  # never let the writer thread die
+                for _, future in group:
+                    if not future.done():
+                        future.set_exception(exc)
+
+    def _commit_group(self, group: list) -> None:
+        engine = self._engine()
+        if engine is None:
+            raise RuntimeError("The engine behind this group-commit writer is gone")
+        attempts = 0
+        with self._session_factory(bind=engine) as db:
+            while group:
+                results = []
+                failed_at = None
+                for position, (payload, future) in enumerate(group):
+                    try:
+                        results.append(self._work(db, payload))
+                    except Exception as exc:
+                        failed_at = (position, exc)
+                        break
+
+                if failed_at is None:
+                    try:
+                        db.commit()
+                    except Exception:
+                        db.rollback()
+                        if len(group) == 1:
+                            raise
+                        self._commit_one_by_one(group)
+                        return
+                    for (_, future), result in zip(group, results):
+                        future.set_result(result)
+                    self.groups_committed += 1
+                    self.items_committed += len(group)
+                    return
+
+                db.rollback()
+                position, exc = failed_at
+                if isinstance(exc, self._retry_on):
+                    attempts += 1
+                    if attempts < self._max_attempts:
+                        continue
+                group[position][1].set_exception(exc)
+                group = group[:position] + group[position + 1 :]
+                # The payloads left over get their own full set of retries.
+                attempts = 0
+
+    def _commit_one_by_one(self, group: list) -> None:
+        for item in group:
+            try:
+                self._commit_group([item])
+            except Exception as exc:
+                item[1].set_exception(exc)
+
+
+_writers: "weakref.WeakKeyDictionary[Engine, dict[str, GroupCommitWriter]]" = weakref.WeakKeyDictionary()
+_writers_lock = threading.Lock()
+
+
+def get_writer(db: Session, name: str, factory: Callable[[Engine], GroupCommitWriter]) -> GroupCommitWriter:
+    """Return the process-wide writer ``name`` for the session's engine, starting it on first use."""
+    engine = db.get_bind()
+    with _writers_lock:
+        writers = _writers.setdefault(engine, {})
+        writer = writers.get(name)
+        if writer is None:
+            writer = writers[name] = factory(engine)
+            # Don't join here: the engine may be collected on the writer's own thread.
+            weakref.finalize(engine, writer.close, False)
+        return writer
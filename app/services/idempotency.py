@@ -0,0 +1,149 @@
+"""``Idempotency-Key`` support for the sale and purchase POSTs.
+
+The key row is written in the same transaction as the sale or batch it
+produced, together with the response body that request returned, so a retry
+either replays that exact response or finds nothing and runs the request
+again; it can never see stock drained without a record, or the reverse. A
+replay never touches FIFO allocation, and reflects the resource as it was
+created rather than as it is now. Reusing a key with a different body is
+rejected with 422.
+
+Keys live for ``idempotency_ttl_seconds``; the table is pruned every
+``PRUNE_EVERY`` recorded keys and also capped at ``idempotency_max_keys`` rows.
+An expired key found by a retry is deleted in a transaction of its own, so the
+retry's own rollbacks cannot bring it back.
+"""
+
+import hashlib
+import itertools
+from datetime import UTC, datetime, timedelta
+
+from fastapi import Header, HTTPException, Response, status
+from pydantic import BaseModel
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+from ..config import get_settings
+from ..models.entities import IdempotencyKey
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+PRUNE_EVERY = 500
+
+_recorded = itertools.count(1)
+
+
+def idempotency_key(
+    key: str | None = Header(None, alias=IDEMPOTENCY_HEADER, min_length=1, max_length=200),
+) -> str | None:
+    return key
+
+
+def _fingerprint(payload: BaseModel) -> str:
+    return hashlib.sha256(payload.model_dump_json().encode()).hexdigest()
+
+
+def _cutoff() -> datetime:
+    return datetime.now(UTC) - timedelta(seconds=get_settings().idempotency_ttl_seconds)
+
+
+def _created_at(row: IdempotencyKey) -> datetime:
+    created_at = row.created_at
+    return created_at if created_at.tzinfo is not None else created_at.replace(tzinfo=UTC)
+
+
+def _forget(db: Session, row: IdempotencyKey) -> None:
+    with db.get_bind().begin() as conn:
+        conn.execute(
+            delete(IdempotencyKey).where(
+                IdempotencyKey.scope == row.scope,
+                IdempotencyKey.key == row.key,
+                IdempotencyKey.created_at < _cutoff(),
+            )
+        )
+    db.expunge(row)
+
+
+def replay(
+    db: Session, scope: str, key: str | None, payload: BaseModel, model: type, schema: type[BaseModel]
+) -> Response | None:
+    """The response an earlier request with this key got, if the key is still on file.
+
+    Call before the request writes anything: an expired key is deleted and committed on the spot.
+    """
+    if key is None:
+        return None
+    row = db.get(IdempotencyKey, (scope, key))
+    if row is None:
+        return None
+    if _created_at(row) < _cutoff():
+        _forget(db, row)
+        return None
+    if row.request_hash != _fingerprint(payload):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"{IDEMPOTENCY_HEADER} was already used for a different request",
+        )
+    status_code, body = row.response_status, row.response_body
+    if body is None:
+        # Recorded before responses were stored: the resource as it is now is the best answer left.
+        resource = db.get(model, row.resource_id)
+        if resource is None:
+            raise HTTPException(
+                status_code=status.HTTP_410_GONE,
+                detail=f"The resource created with this {IDEMPOTENCY_HEADER} no longer exists",
+            )
+        status_code, body = status.HTTP_201_CREATED, schema.model_validate(resource).model_dump_json()
+    return Response(body, status_code=status_code, media_type="application/json", headers={REPLAYED_HEADER: "true"})
+
+
+def record(
+    db: Session,
+    scope: str,
+    key: str | None,
+    payload: BaseModel,
+    resource,
+    schema: type[BaseModel],
+    status_code: int = status.HTTP_201_CREATED,
+) -> None:
+    """Stage the key with the response it produced; the caller's commit makes both durable together.
+
+    ``resource`` must be flushed. It is re-read first, so the stored body matches what the caller returns
+    once it commits.
+    """
+    if key is None:
+        return
+    db.refresh(resource)
+    db.add(
+        IdempotencyKey(
+            scope=scope,
+            key=key,
+            request_hash=_fingerprint(payload),
+            resource_id=resource.id,
+            response_status=status_code,
+            response_body=schema.model_validate(resource).model_dump_json(),
+        )
+    )
+    if next(_recorded) % PRUNE_EVERY == 0:
+        prune(db)
+
+
+def in_conflict(db: Session, scope: str, key: str | None) -> HTTPException | None:
+    """The error to report if a concurrent request has claimed the key since ``replay`` looked it up."""
+    if key is None or db.get(IdempotencyKey, (scope, key)) is None:
+        return None
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=f"A request with this {IDEMPOTENCY_HEADER} was processed concurrently, please retry",
+    )
+
+
+def prune(db: Session) -> int:
+    """Drop expired keys and, past ``idempotency_max_keys``, the oldest ones; does not commit."""
+    deleted = db.execute(delete(IdempotencyKey).where(IdempotencyKey.created_at < _cutoff())).rowcount
+    overflow = db.scalar(select(func.count()).select_from(IdempotencyKey)) - get_settings().idempotency_max_keys
+    if overflow > 0:
+        oldest = select(IdempotencyKey.created_at).order_by(IdempotencyKey.created_at).offset(overflow).limit(1)
+        statement = delete(IdempotencyKey).where(IdempotencyKey.created_at < oldest.scalar_subquery())
+        deleted += db.execute(statement).rowcount
+    return deleted
@@ -0,0 +1,130 @@
+"""Request, SQL and domain metrics behind ``GET /metrics``.
+
+Nothing here runs unless ``METRICS_ENABLED`` is set: ``install`` adds the HTTP
+middleware, the engine hooks and the ``/metrics`` route, and until then the
+domain hooks return after one flag check. SQL statements are attributed to
+the request that issued them through a context variable, so per-request query
+counts and time come out per route. Domain counters are staged on the session
+and only counted when its transaction commits, so retried or rolled-back
+allocations never inflate them.
+"""
+
+import time
+from contextvars import ContextVar
+
+from fastapi import FastAPI, Request, Response
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from ..utils import statement_timing
+from ..utils.metrics import CONTENT_TYPE, Counter, Gauge, Histogram, Registry
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100, 250, 1000)
+UNMATCHED_ROUTE = "<unmatched>"
+
+registry = Registry()
+http_requests = registry.register(
+    Counter("http_requests_total", "HTTP requests by route and status.", ("method", "route", "status"))
+)
+http_latency = registry.register(
+    Histogram("http_request_duration_seconds", "Request latency.", ("method", "route"), LATENCY_BUCKETS)
+)
+http_in_flight = registry.register(Gauge("http_requests_in_flight", "Requests being served."))
+request_queries = registry.register(
+    Histogram("http_request_db_queries", "SQL statements per request.", ("method", "route"), QUERY_BUCKETS)
+)
+request_query_seconds = registry.register(
+    Histogram("http_request_db_seconds", "Time spent in SQL per request.", ("method", "route"), LATENCY_BUCKETS)
+)
+db_queries = registry.register(Counter("db_queries_total", "SQL statements executed."))
+db_query_seconds = registry.register(Counter("db_query_seconds_total", "Time spent executing SQL."))
+sales_allocated = registry.register(Counter("sales_allocated_total", "Sales committed with a FIFO allocation."))
+batches_per_sale = registry.register(
+    Histogram("sale_batches_consumed", "Batches drawn on by one sale.", (), (1, 2, 3, 5, 10, 20))
+)
+purchase_rows = registry.register(Counter("purchase_rows_inserted_total", "Inventory batches received."))
+
+_enabled = False
+_request_sql: ContextVar[list | None] = ContextVar("request_sql", default=None)
+_PENDING_KEY = "metrics_pending"
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def _observe_statement(conn, statement, parameters, context, executemany, elapsed: float) -> None:
+    db_queries.inc()
+    db_query_seconds.inc(amount=elapsed)
+    totals = _request_sql.get()
+    if totals is not None:
+        totals[0] += 1
+        totals[1] += elapsed
+
+
+def _stage(db: Session, metric, value: float = 1) -> None:
+    db.info.setdefault(_PENDING_KEY, []).append((metric, value))
+
+
+def record_sale(db: Session, batches_consumed: int) -> None:
+    if not _enabled:
+        return
+    _stage(db, sales_allocated)
+    _stage(db, batches_per_sale, batches_consumed)
+
+
+def record_purchases(db: Session, rows: int) -> None:
+    if not _enabled:
+        return
+    _stage(db, purchase_rows, rows)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_staged(session: Session) -> None:
+    for metric, value in session.info.pop(_PENDING_KEY, ()):
+        if isinstance(metric, Histogram):
+            metric.observe(value)
+        else:
+            metric.inc(amount=value)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_staged(session: Session, transaction) -> None:
+    if transaction.parent is None:
+        session.info.pop(_PENDING_KEY, None)
+
+
+def install(app: FastAPI) -> None:
+    """Turn instrumentation on for ``app``: middleware, engine hooks and ``GET /metrics``."""
+    global _enabled
+    if not _enabled:
+        statement_timing.subscribe(Engine, _observe_statement)
+        _enabled = True
+
+    @app.middleware("http")
+    async def record_request(request: Request, call_next):
+        totals = [0, 0.0]
+        token = _request_sql.set(totals)
+        http_in_flight.inc()
+        started = time.perf_counter()
+        status_code = 500
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+            return response
+        finally:
+            elapsed = time.perf_counter() - started
+            http_in_flight.dec()
+            _request_sql.reset(token)
+            route = request.scope.get("route")
+            path = getattr(route, "path", UNMATCHED_ROUTE)
+            http_requests.inc(request.method, path, str(status_code))
+            http_latency.observe(elapsed, request.method, path)
+            request_queries.observe(totals[0], request.method, path)
+            request_query_seconds.observe(totals[1], request.method, path)
+
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        return Response(registry.render(), media_type=CONTENT_TYPE)
@@ -0,0 +1,61 @@
+"""Bulk upsert of name-keyed master data (products, suppliers, retailers).
+
+Existing rows are read by name in chunks to sort the incoming records into
+created / updated / unchanged; only the first two are written, with the
+backend's ``INSERT ... ON CONFLICT (name) DO UPDATE`` in batches, so a record
+created concurrently between the read and the write is still updated rather
+than rejected. Backends without ``ON CONFLICT`` get a plain executemany insert
+and update instead. Every column in the payload is written: a blank optional
+field clears the stored value.
+"""
+
+from pydantic import BaseModel
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+from ..utils.sql import dialect_insert
+from . import data_version
+
+UPSERT_CHUNK = 500
+
+
+def upsert_by_name(db: Session, model, lines: list[BaseModel], table: str) -> dict:
+    # A name listed twice takes its last record.
+    incoming = {line.name: line.model_dump() for line in lines}
+    fields = list(next(iter(incoming.values())))
+    columns = [getattr(model, field) for field in fields]
+
+    names = list(incoming)
+    stored: dict[str, dict] = {}
+    for start in range(0, len(names), UPSERT_CHUNK):
+        rows = db.execute(select(model.id, *columns).where(model.name.in_(names[start : start + UPSERT_CHUNK])))
+        stored.update({row.name: dict(row._mapping) for row in rows})
+
+    created = [values for name, values in incoming.items() if name not in stored]
+    changed = [
+        values
+        for name, values in incoming.items()
+        if name in stored and any(stored[name][field] != values[field] for field in fields)
+    ]
+    unchanged = len(incoming) - len(created) - len(changed)
+    result = {"created": len(created), "updated": len(changed), "unchanged": unchanged}
+    if not created and not changed:
+        return result
+
+    upsert = dialect_insert(db)
+    if upsert is not None:
+        statement = upsert(model)
+        statement = statement.on_conflict_do_update(
+            index_elements=[model.name], set_={field: statement.excluded[field] for field in fields if field != "name"}
+        )
+        pending = created + changed
+        for start in range(0, len(pending), UPSERT_CHUNK):
+            db.execute(statement, pending[start : start + UPSERT_CHUNK])
+    else:
+        if created:
+            db.execute(insert(model), created)
+        if changed:
+            db.execute(update(model), [{"id": stored[values["name"]]["id"], **values} for values in changed])
+    data_version.bump(db, table)
+    db.commit()
+    return result
@@ -1,8 +1,11 @@
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 
+from ..models import search as search_indexes
 from ..models.entities import Product
 from ..schemas.product import ProductCreate
+from ..utils.pagination import Page, PageParams, paginate
+from . import data_version, master_data, search_service
 
 
 def create_product(db: Session, payload: ProductCreate) -> Product:
@@ -12,13 +15,23 @@ def create_product(db: Session, payload: ProductCreate) -> Product:
 
     product = Product(name=payload.name, category=payload.category, brand=payload.brand)
     db.add(product)
+    data_version.bump(db, data_version.PRODUCTS)
     db.commit()
     db.refresh(product)
     return product
 
 
-def list_products(db: Session) -> list[Product]:
-    return db.query(Product).order_by(Product.name).all()
+def upsert_products(db: Session, lines: list[ProductCreate]) -> dict:
+    """Create or update products matched on ``name``; returns created/updated/unchanged counts."""
+    return master_data.upsert_by_name(db, Product, lines, data_version.PRODUCTS)
+
+
+def search_products(db: Session, q: str, limit: int = 10) -> list[Product]:
+    return search_service.search(db, Product, search_indexes.PRODUCTS, q, limit)
+
+
+def list_products(db: Session, page: PageParams = PageParams()) -> Page[Product]:
+    return paginate(db.query(Product), ((Product.name, False), (Product.id, False)), page)
 
 
 def get_product_or_404(db: Session, product_id: int) -> Product:
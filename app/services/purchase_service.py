@@ -1,13 +1,28 @@
-from fastapi import HTTPException, status
+from datetime import UTC, date, datetime, time, timedelta
+from typing import Optional
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import Select, insert, select, tuple_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session, joinedload
 
-from ..models.entities import InventoryBatch
-from ..schemas.purchase import PurchaseCreate
+from ..models.entities import InventoryBatch, Product, Supplier
+from ..schemas.purchase import PurchaseCreate, PurchaseRead
+from ..utils.pagination import Page, PageParams, paginate
+from . import data_version, fifo_index, idempotency, instrumentation, stock_totals
 from .product_service import get_product_or_404
 from .supplier_service import get_supplier_or_404
 
 
-def create_purchase(db: Session, payload: PurchaseCreate) -> InventoryBatch:
+IDEMPOTENCY_SCOPE = "purchases"
+
+
+def find_idempotent_purchase(db: Session, idempotency_key: str | None, payload: PurchaseCreate) -> Response | None:
+    """The response an earlier ``create_purchase`` call with this key returned, if any."""
+    return idempotency.replay(db, IDEMPOTENCY_SCOPE, idempotency_key, payload, InventoryBatch, PurchaseRead)
+
+
+def create_purchase(db: Session, payload: PurchaseCreate, idempotency_key: str | None = None) -> InventoryBatch:
     product = get_product_or_404(db, payload.product_id)
 
     existing = (
@@ -40,16 +55,182 @@ def create_purchase(db: Session, payload: PurchaseCreate) -> InventoryBatch:
     )
 
     db.add(batch)
-    db.commit()
+    db.flush()
+    stock_totals.apply_purchase(db, product.id, batch.quantity_initial, batch.unit_cost, batch.expiry_date)
+    instrumentation.record_purchases(db, 1)
+    data_version.bump(db, data_version.BATCHES)
+    idempotency.record(db, IDEMPOTENCY_SCOPE, idempotency_key, payload, batch, PurchaseRead)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        conflict = idempotency.in_conflict(db, IDEMPOTENCY_SCOPE, idempotency_key)
+        if conflict is not None:
+            raise conflict
+        raise
     db.refresh(batch)
     return batch
 
 
-def list_batches(db: Session) -> list[InventoryBatch]:
-    return (
-        db.query(InventoryBatch)
-        .options(joinedload(InventoryBatch.product), joinedload(InventoryBatch.supplier))
-        .join(InventoryBatch.product)
-        .order_by(InventoryBatch.expiry_date, InventoryBatch.batch_code)
-        .all()
+_LOOKUP_CHUNK = 500
+
+
+def _existing_batch_keys(db: Session, keys: set[tuple[int, str]]) -> set[tuple[int, str]]:
+    pairs = list(keys)
+    taken: set[tuple[int, str]] = set()
+    for start in range(0, len(pairs), _LOOKUP_CHUNK):
+        rows = db.execute(
+            select(InventoryBatch.product_id, InventoryBatch.batch_code).where(
+                tuple_(InventoryBatch.product_id, InventoryBatch.batch_code).in_(pairs[start : start + _LOOKUP_CHUNK])
+            )
+        )
+        taken.update((row.product_id, row.batch_code) for row in rows)
+    return taken
+
+
+def _build_purchase_rows(db: Session, lines: list[PurchaseCreate]) -> list[dict]:
+    product_ids = {line.product_id for line in lines}
+    supplier_ids = {line.supplier_id for line in lines if line.supplier_id is not None}
+    known_products = set(db.scalars(select(Product.id).where(Product.id.in_(product_ids))))
+    suppliers = (
+        dict(db.execute(select(Supplier.id, Supplier.name).where(Supplier.id.in_(supplier_ids))).all())
+        if supplier_ids
+        else {}
     )
+    taken = _existing_batch_keys(db, {(line.product_id, line.batch_code) for line in lines})
+
+    errors: list[dict] = []
+    seen: set[tuple[int, str]] = set()
+    rows: list[dict] = []
+    for index, line in enumerate(lines, start=1):
+        if line.product_id not in known_products:
+            errors.append({"line": index, "status_code": status.HTTP_404_NOT_FOUND, "detail": "Product not found"})
+            continue
+        if line.supplier_id is not None and line.supplier_id not in suppliers:
+            errors.append({"line": index, "status_code": status.HTTP_404_NOT_FOUND, "detail": "Supplier not found"})
+            continue
+        key = (line.product_id, line.batch_code)
+        if key in taken or key in seen:
+            errors.append(
+                {"line": index, "status_code": status.HTTP_409_CONFLICT, "detail": "Batch already exists for product"}
+            )
+            continue
+        seen.add(key)
+
+        supplier_name = (line.supplier_name or "").strip() or None
+        if line.supplier_id is not None and not supplier_name:
+            supplier_name = suppliers[line.supplier_id]
+        rows.append(
+            {
+                "product_id": line.product_id,
+                "batch_code": line.batch_code,
+                "quantity_initial": line.quantity,
+                "quantity_remaining": line.quantity,
+                "unit_cost": line.unit_cost,
+                "unit_size_value": line.unit_size_value,
+                "unit_size_unit": line.unit_size_unit,
+                "expiry_date": line.expiry_date,
+                "supplier_id": line.supplier_id,
+                "supplier_name": supplier_name,
+            }
+        )
+
+    if errors:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=errors)
+    return rows
+
+
+def create_purchases_bulk(db: Session, lines: list[PurchaseCreate], dry_run: bool = False) -> dict:
+    """Receive a whole goods-receipt note in one transaction.
+
+    Products, suppliers and duplicate batch codes are checked with set-based
+    queries up front; any failing line rejects the lot with a per-line error list.
+    The batches then go in as one executemany. ``dry_run`` stops after the checks.
+    A batch (or a product or supplier deletion) committed concurrently between the
+    checks and the insert is reported the same way, by running the checks again.
+    """
+    rows = _build_purchase_rows(db, lines)
+    units = sum(row["quantity_initial"] for row in rows)
+    if dry_run:
+        db.rollback()
+        return {"dry_run": True, "batches": len(rows), "units": units, "batch_ids": []}
+
+    try:
+        created = db.execute(
+            insert(InventoryBatch).returning(
+                InventoryBatch.id,
+                InventoryBatch.product_id,
+                InventoryBatch.quantity_initial,
+                InventoryBatch.quantity_remaining,
+                InventoryBatch.unit_cost,
+                InventoryBatch.expiry_date,
+                InventoryBatch.purchased_at,
+                sort_by_parameter_order=True,
+            ),
+            rows,
+        ).all()
+        stock_totals.apply_purchases(db, created)
+        instrumentation.record_purchases(db, len(created))
+        for batch in created:
+            # Core inserts bypass the flush hook that normally stages new batches for the FIFO index.
+            fifo_index.record_change(db, batch)
+        data_version.bump(db, data_version.BATCHES)
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        _build_purchase_rows(db, lines)  # raises the per-line errors for whatever changed underneath us
+        raise
+    return {"dry_run": False, "batches": len(created), "units": units, "batch_ids": [batch.id for batch in created]}
+
+
+BATCH_ORDER = ((InventoryBatch.expiry_date, False), (InventoryBatch.batch_code, False), (InventoryBatch.id, False))
+
+
+def list_batches(
+    db: Session,
+    page: PageParams = PageParams(),
+    product_id: Optional[int] = None,
+    supplier_id: Optional[int] = None,
+    expires_from: Optional[date] = None,
+    expires_to: Optional[date] = None,
+    in_stock: Optional[bool] = None,
+) -> Page[InventoryBatch]:
+    """Batches by expiry; ``expires_from``/``expires_to`` are inclusive."""
+    query = db.query(InventoryBatch).options(joinedload(InventoryBatch.product), joinedload(InventoryBatch.supplier))
+    if product_id is not None:
+        query = query.filter(InventoryBatch.product_id == product_id)
+    if supplier_id is not None:
+        query = query.filter(InventoryBatch.supplier_id == supplier_id)
+    if expires_from is not None:
+        query = query.filter(InventoryBatch.expiry_date >= expires_from)
+    if expires_to is not None:
+        query = query.filter(InventoryBatch.expiry_date <= expires_to)
+    if in_stock is not None:
+        remaining = InventoryBatch.quantity_remaining
+        query = query.filter(remaining > 0 if in_stock else remaining == 0)
+    return paginate(query, BATCH_ORDER, page)
+
+
+def batches_export_statement(date_from: Optional[date] = None, date_to: Optional[date] = None) -> Select:
+    """Batches purchased between the inclusive UTC days, oldest first, for exports."""
+    statement = select(
+        InventoryBatch.id.label("batch_id"),
+        InventoryBatch.purchased_at,
+        InventoryBatch.batch_code,
+        InventoryBatch.product_id,
+        Product.name.label("product_name"),
+        InventoryBatch.supplier_id,
+        InventoryBatch.supplier_name,
+        InventoryBatch.quantity_initial,
+        InventoryBatch.quantity_remaining,
+        InventoryBatch.unit_cost,
+        InventoryBatch.unit_size_value,
+        InventoryBatch.unit_size_unit,
+        InventoryBatch.expiry_date,
+    ).join(Product, Product.id == InventoryBatch.product_id)
+    if date_from is not None:
+        statement = statement.where(InventoryBatch.purchased_at >= datetime.combine(date_from, time.min, tzinfo=UTC))
+    if date_to is not None:
+        end = datetime.combine(date_to + timedelta(days=1), time.min, tzinfo=UTC)
+        statement = statement.where(InventoryBatch.purchased_at < end)
+    return statement.order_by(InventoryBatch.purchased_at, InventoryBatch.id)
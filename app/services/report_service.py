@@ -1,26 +1,32 @@
 from collections import defaultdict
-from datetime import UTC, datetime, timedelta
-from decimal import Decimal
-from typing import List
+from datetime import UTC, date, datetime, timedelta
+from typing import List, Optional
 
 from sqlalchemy import func
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session
 
-from ..models.entities import Product, Sale
-from ..schemas.report import ProfitLine, ProfitReport, SlowProduct, TopProduct
+from ..models.entities import DailyProductSales, Product
+from ..schemas.report import ProductProfitLine, ProfitLine, ProfitReport, SlowProduct, TopProduct
+from ..utils.sql import from_paise, month_key
 
 
-def get_top_selling_products(db: Session, limit: int = 5) -> List[TopProduct]:
+def _window_start(days: int) -> date:
+    """First day of a window of ``days`` calendar days ending today (UTC)."""
+    return datetime.now(UTC).date() - timedelta(days=days - 1)
+
+
+def get_top_selling_products(db: Session, limit: int = 5, days: Optional[int] = None) -> List[TopProduct]:
+    query = db.query(
+        DailyProductSales.product_id,
+        Product.name.label("product_name"),
+        func.sum(DailyProductSales.quantity).label("total_quantity"),
+        func.sum(DailyProductSales.revenue_paise).label("total_revenue"),
+    ).join(Product, Product.id == DailyProductSales.product_id)
+    if days is not None:
+        query = query.filter(DailyProductSales.day >= _window_start(days))
     rows = (
-        db.query(
-            Sale.product_id,
-            Product.name.label("product_name"),
-            func.sum(Sale.quantity).label("total_quantity"),
-            func.sum(Sale.quantity * Sale.selling_price).label("total_revenue"),
-        )
-        .join(Product, Product.id == Sale.product_id)
-        .group_by(Sale.product_id, Product.name)
-        .order_by(func.sum(Sale.quantity).desc())
+        query.group_by(DailyProductSales.product_id, Product.name)
+        .order_by(func.sum(DailyProductSales.quantity).desc())
         .limit(limit)
         .all()
     )
@@ -30,23 +36,26 @@ def get_top_selling_products(db: Session, limit: int = 5) -> List[TopProduct]:
             product_id=row.product_id,
             product_name=row.product_name,
             total_quantity=int(row.total_quantity or 0),
-            total_revenue=row.total_revenue or Decimal("0"),
+            total_revenue=from_paise(row.total_revenue),
         )
         for row in rows
     ]
 
 
-def get_slow_moving_products(db: Session, limit: int = 5) -> List[SlowProduct]:
-    cutoff = datetime.now(UTC) - timedelta(days=30)
+def get_slow_moving_products(db: Session, limit: int = 5, days: int = 30) -> List[SlowProduct]:
+    sold = func.coalesce(func.sum(DailyProductSales.quantity), 0)
     rows = (
         db.query(
             Product.id.label("product_id"),
             Product.name.label("product_name"),
-            func.coalesce(func.sum(Sale.quantity), 0).label("sold_last_30"),
+            sold.label("sold_in_window"),
+        )
+        .outerjoin(
+            DailyProductSales,
+            (DailyProductSales.product_id == Product.id) & (DailyProductSales.day >= _window_start(days)),
         )
-        .outerjoin(Sale, (Sale.product_id == Product.id) & (Sale.sale_date >= cutoff))
         .group_by(Product.id, Product.name)
-        .order_by(func.coalesce(func.sum(Sale.quantity), 0).asc(), Product.name)
+        .order_by(sold.asc(), Product.name)
         .limit(limit)
         .all()
     )
@@ -55,31 +64,85 @@ def get_slow_moving_products(db: Session, limit: int = 5) -> List[SlowProduct]:
         SlowProduct(
             product_id=row.product_id,
             product_name=row.product_name,
-            sold_last_30_days=int(row.sold_last_30 or 0),
+            sold_in_window=int(row.sold_in_window or 0),
         )
         for row in rows
     ]
 
 
-def get_monthly_profit_report(db: Session) -> ProfitReport:
-    month_totals: dict[str, dict[str, Decimal]] = defaultdict(lambda: {"revenue": Decimal("0"), "cogs": Decimal("0")})
+def _parse_month(month: str) -> date:
+    return date.fromisoformat(f"{month}-01")
+
+
+def _next_month_start(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def get_monthly_profit_report(
+    db: Session,
+    from_month: Optional[str] = None,
+    to_month: Optional[str] = None,
+    by_product: bool = False,
+) -> ProfitReport:
+    """Revenue, COGS and profit per calendar month, summed from the daily sales rollup.
 
-    sales = db.query(Sale).options(joinedload(Sale.allocations)).all()
-    for sale in sales:
-        month_key = sale.sale_date.strftime("%Y-%m")
-        revenue = Decimal(sale.quantity) * Decimal(sale.selling_price)
-        cogs = sum(Decimal(a.quantity) * Decimal(a.unit_cost) for a in sale.allocations)
-        month_totals[month_key]["revenue"] += revenue
-        month_totals[month_key]["cogs"] += cogs
+    ``from_month``/``to_month`` are inclusive ``YYYY-MM`` bounds. With ``by_product``
+    each month also lists its per-product figures.
+    """
+    filters = []
+    if from_month:
+        filters.append(DailyProductSales.day >= _parse_month(from_month))
+    if to_month:
+        filters.append(DailyProductSales.day < _next_month_start(_parse_month(to_month)))
 
-    month_lines = [
-        ProfitLine(
-            month=month,
-            revenue=totals["revenue"],
-            cogs=totals["cogs"],
-            profit=totals["revenue"] - totals["cogs"],
+    month = month_key(db, DailyProductSales.day).label("month")
+    rows = (
+        db.query(
+            month,
+            DailyProductSales.product_id,
+            func.sum(DailyProductSales.revenue_paise).label("revenue"),
+            func.sum(DailyProductSales.cogs_paise).label("cogs"),
+        )
+        .filter(*filters)
+        .group_by(month, DailyProductSales.product_id)
+        .order_by(month, DailyProductSales.product_id)
+        .all()
+    )
+
+    product_names: dict[int, str] = {}
+    if by_product and rows:
+        product_ids = {row.product_id for row in rows}
+        product_names = dict(db.query(Product.id, Product.name).filter(Product.id.in_(product_ids)).all())
+
+    month_totals: dict[str, dict[str, int]] = defaultdict(lambda: {"revenue": 0, "cogs": 0})
+    month_products: dict[str, list[ProductProfitLine]] = defaultdict(list)
+    for row in rows:
+        totals = month_totals[row.month]
+        totals["revenue"] += int(row.revenue or 0)
+        totals["cogs"] += int(row.cogs or 0)
+        if by_product:
+            revenue, cogs = from_paise(row.revenue), from_paise(row.cogs)
+            month_products[row.month].append(
+                ProductProfitLine(
+                    product_id=row.product_id,
+                    product_name=product_names.get(row.product_id, ""),
+                    revenue=revenue,
+                    cogs=cogs,
+                    profit=revenue - cogs,
+                )
+            )
+
+    month_lines = []
+    for month_label, totals in sorted(month_totals.items()):
+        revenue, cogs = from_paise(totals["revenue"]), from_paise(totals["cogs"])
+        month_lines.append(
+            ProfitLine(
+                month=month_label,
+                revenue=revenue,
+                cogs=cogs,
+                profit=revenue - cogs,
+                products=month_products[month_label] if by_product else None,
+            )
         )
-        for month, totals in sorted(month_totals.items())
-    ]
 
     return ProfitReport(months=month_lines)
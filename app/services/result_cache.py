@@ -0,0 +1,26 @@
+"""Read-through result cache for the report and stock services.
+
+Keys combine the service function, its arguments, today's date and the
+``data_versions`` counters of the tables it reads, so an entry is only served
+while none of those tables has changed; TTL and LRU bound staleness and memory.
+"""
+
+from datetime import UTC, datetime
+from typing import Any, Callable
+
+from fastapi import Request
+from sqlalchemy.orm import Session
+
+from ..utils.cache import ResultCache
+from . import data_version
+
+
+def get_result_cache(request: Request) -> ResultCache | None:
+    return getattr(request.app.state, "result_cache", None)
+
+
+def cached(cache: ResultCache | None, db: Session, tables: tuple[str, ...], fn: Callable[..., Any], *args) -> Any:
+    if cache is None:
+        return fn(db, *args)
+    key = (fn.__module__, fn.__qualname__, args, datetime.now(UTC).date(), data_version.current(db, tables))
+    return cache.get_or_compute(key, lambda: fn(db, *args))
@@ -1,8 +1,11 @@
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 
+from ..models import search as search_indexes
 from ..models.entities import Retailer
 from ..schemas.retailer import RetailerCreate
+from ..utils.pagination import Page, PageParams, paginate
+from . import data_version, master_data, search_service
 
 
 def create_retailer(db: Session, payload: RetailerCreate) -> Retailer:
@@ -12,13 +15,23 @@ def create_retailer(db: Session, payload: RetailerCreate) -> Retailer:
 
     retailer = Retailer(**payload.model_dump())
     db.add(retailer)
+    data_version.bump(db, data_version.RETAILERS)
     db.commit()
     db.refresh(retailer)
     return retailer
 
 
-def list_retailers(db: Session) -> list[Retailer]:
-    return db.query(Retailer).order_by(Retailer.name).all()
+def upsert_retailers(db: Session, lines: list[RetailerCreate]) -> dict:
+    """Create or update retailers matched on ``name``; returns created/updated/unchanged counts."""
+    return master_data.upsert_by_name(db, Retailer, lines, data_version.RETAILERS)
+
+
+def search_retailers(db: Session, q: str, limit: int = 10) -> list[Retailer]:
+    return search_service.search(db, Retailer, search_indexes.RETAILERS, q, limit)
+
+
+def list_retailers(db: Session, page: PageParams = PageParams()) -> Page[Retailer]:
+    return paginate(db.query(Retailer), ((Retailer.name, False), (Retailer.id, False)), page)
 
 
 def get_retailer_or_404(db: Session, retailer_id: int) -> Retailer:
@@ -31,4 +44,5 @@ def get_retailer_or_404(db: Session, retailer_id: int) -> Retailer:
 def delete_retailer(db: Session, retailer_id: int) -> None:
     retailer = get_retailer_or_404(db, retailer_id)
     db.delete(retailer)
+    data_version.bump(db, data_version.RETAILERS, data_version.SALES)
     db.commit()
@@ -0,0 +1,105 @@
+"""``daily_product_sales`` rollup: one row per product per UTC day.
+
+Sale allocation adds each sale to its row in the same transaction with an
+atomic upsert, so the reports read days x products rows instead of every sale.
+``rebuild`` recomputes the table from ``sales`` and ``sale_allocations``.
+"""
+
+from datetime import date
+
+from sqlalchemy import delete, func, insert, literal, select, union_all, update
+from sqlalchemy.orm import Session
+
+from ..models.entities import DailyProductSales, Sale, SaleAllocation
+from ..utils.sql import day_key, dialect_insert, in_paise
+from . import data_version
+
+
+def record_sale(db: Session, product_id: int, day: date, quantity: int, revenue_paise: int, cogs_paise: int) -> None:
+    values = {
+        "product_id": product_id,
+        "day": day,
+        "quantity": quantity,
+        "revenue_paise": revenue_paise,
+        "cogs_paise": cogs_paise,
+    }
+    upsert = dialect_insert(db)
+    if upsert is not None:
+        statement = upsert(DailyProductSales).values(**values)
+        db.execute(
+            statement.on_conflict_do_update(
+                index_elements=[DailyProductSales.product_id, DailyProductSales.day],
+                set_={
+                    "quantity": DailyProductSales.quantity + statement.excluded.quantity,
+                    "revenue_paise": DailyProductSales.revenue_paise + statement.excluded.revenue_paise,
+                    "cogs_paise": DailyProductSales.cogs_paise + statement.excluded.cogs_paise,
+                },
+            )
+        )
+        return
+
+    updated = db.execute(
+        update(DailyProductSales)
+        .where(DailyProductSales.product_id == product_id, DailyProductSales.day == day)
+        .values(
+            quantity=DailyProductSales.quantity + quantity,
+            revenue_paise=DailyProductSales.revenue_paise + revenue_paise,
+            cogs_paise=DailyProductSales.cogs_paise + cogs_paise,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if not updated.rowcount:
+        db.execute(insert(DailyProductSales).values(**values))
+
+
+def _rollup_query(db: Session):
+    day = day_key(db, Sale.sale_date)
+    sale_rows = select(
+        Sale.product_id.label("product_id"),
+        day.label("day"),
+        Sale.quantity.label("quantity"),
+        (Sale.quantity * in_paise(Sale.selling_price)).label("revenue_paise"),
+        literal(0).label("cogs_paise"),
+    )
+    allocation_rows = select(
+        Sale.product_id.label("product_id"),
+        day.label("day"),
+        literal(0).label("quantity"),
+        literal(0).label("revenue_paise"),
+        (SaleAllocation.quantity * in_paise(SaleAllocation.unit_cost)).label("cogs_paise"),
+    ).join(Sale, Sale.id == SaleAllocation.sale_id)
+    combined = union_all(sale_rows, allocation_rows).subquery()
+    return select(
+        combined.c.product_id,
+        combined.c.day,
+        func.sum(combined.c.quantity).label("quantity"),
+        func.sum(combined.c.revenue_paise).label("revenue_paise"),
+        func.sum(combined.c.cogs_paise).label("cogs_paise"),
+    ).group_by(combined.c.product_id, combined.c.day)
+
+
+def rebuild(db: Session) -> int:
+    """Recompute the rollup from the sales ledger; returns the number of rows."""
+    db.execute(delete(DailyProductSales))
+    rows = [
+        {
+            "product_id": row.product_id,
+            "day": date.fromisoformat(row.day) if isinstance(row.day, str) else row.day,
+            "quantity": row.quantity,
+            "revenue_paise": row.revenue_paise,
+            "cogs_paise": row.cogs_paise,
+        }
+        for row in db.execute(_rollup_query(db))
+    ]
+    if rows:
+        db.execute(insert(DailyProductSales), rows)
+    # Reports are cached under the sales counter.
+    data_version.bump(db, data_version.SALES)
+    db.commit()
+    return len(rows)
+
+
+def backfill_if_empty(db: Session) -> None:
+    """Build the rollup for databases that predate it."""
+    if db.query(DailyProductSales.product_id).first() is None and db.query(Sale.id).first() is not None:
+        rebuild(db)
@@ -1,10 +1,21 @@
+from collections import defaultdict
+from datetime import UTC, date, datetime, time, timedelta
 from decimal import Decimal
+from typing import Optional
 
-from fastapi import HTTPException, status
-from sqlalchemy.orm import Session, joinedload
+from fastapi import HTTPException, Response, status
+from sqlalchemy import Numeric, Select, select, type_coerce, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload, selectinload, subqueryload
+from sqlalchemy.orm.attributes import set_committed_value
 
-from ..models.entities import InventoryBatch, Sale, SaleAllocation
-from ..schemas.sale import SaleCreate
+from ..config import get_settings
+from ..models.entities import InventoryBatch, Product, Retailer, Sale, SaleAllocation
+from ..schemas.retailer import RetailerRead
+from ..schemas.sale import SaleAllocationRead, SaleCreate, SaleRead
+from ..utils.pagination import Page, PageParams, paginate
+from ..utils.sql import to_paise
+from . import data_version, fifo_index, group_commit, idempotency, instrumentation, sales_rollup, stock_totals
 from .product_service import get_product_or_404
 from .retailer_service import get_retailer_or_404
 
@@ -18,7 +29,98 @@ def _get_fifo_batches(db: Session, product_id: int) -> list[InventoryBatch]:
     )
 
 
-def create_sale(db: Session, payload: SaleCreate) -> Sale:
+def _get_fifo_batches_for_products(db: Session, product_ids: set[int]) -> dict[int, list[InventoryBatch]]:
+    batches = (
+        db.query(InventoryBatch)
+        .filter(InventoryBatch.product_id.in_(product_ids), InventoryBatch.quantity_remaining > 0)
+        .order_by(InventoryBatch.product_id, InventoryBatch.expiry_date, InventoryBatch.purchased_at)
+        .all()
+    )
+    by_product: dict[int, list[InventoryBatch]] = defaultdict(list)
+    for batch in batches:
+        by_product[batch.product_id].append(batch)
+    return by_product
+
+
+ALLOCATION_ATTEMPTS = 5
+IDEMPOTENCY_SCOPE = "sales"
+
+
+class AllocationConflict(Exception):
+    """A batch lost stock to a concurrent sale between the FIFO read and the decrement."""
+
+
+def _consume(db: Session, batch: InventoryBatch, take: int) -> None:
+    # Conditional decrement: the row only changes if it still holds enough stock,
+    # so two writers racing on the same batch can never push it below zero.
+    statement = (
+        update(InventoryBatch)
+        .where(InventoryBatch.id == batch.id, InventoryBatch.quantity_remaining >= take)
+        .values(quantity_remaining=InventoryBatch.quantity_remaining - take)
+        .execution_options(synchronize_session=False)
+    )
+    if db.get_bind().dialect.update_returning:
+        remaining = db.execute(statement.returning(InventoryBatch.quantity_remaining)).scalar_one_or_none()
+        if remaining is None:
+            raise AllocationConflict(batch.id)
+        set_committed_value(batch, "quantity_remaining", remaining)
+    else:
+        if db.execute(statement).rowcount != 1:
+            raise AllocationConflict(batch.id)
+        db.refresh(batch, ["quantity_remaining"])
+    fifo_index.record_change(db, batch)
+
+
+def _allocate(db: Session, sale: Sale, batches: list[InventoryBatch], quantity: int) -> None:
+    qty_remaining = quantity
+    cost = Decimal("0")
+    drained = 0
+    consumed = 0
+    for batch in batches:
+        if qty_remaining <= 0:
+            break
+        if batch.quantity_remaining <= 0:
+            continue
+        take = min(qty_remaining, batch.quantity_remaining)
+        _consume(db, batch, take)
+        allocation = SaleAllocation(sale=sale, batch=batch, quantity=take, unit_cost=batch.unit_cost)
+        db.add(allocation)
+        qty_remaining -= take
+        cost += take * Decimal(batch.unit_cost)
+        drained += batch.quantity_remaining == 0
+        consumed += 1
+    if qty_remaining > 0:
+        # The stock check passed on numbers that no longer hold; start over.
+        raise AllocationConflict(sale.product_id)
+    stock_totals.apply_allocation(db, sale.product_id, quantity, cost, drained)
+    instrumentation.record_sale(db, consumed)
+
+    if sale.sale_date is None:
+        sale.sale_date = datetime.now(UTC)
+    sales_rollup.record_sale(
+        db,
+        sale.product_id,
+        sale.sale_date.date(),
+        quantity,
+        quantity * to_paise(sale.selling_price),
+        to_paise(cost),
+    )
+    data_version.bump(db, data_version.SALES, data_version.BATCHES)
+
+
+def _with_allocation_retries(db: Session, attempt):
+    """Run ``attempt`` and commit, starting over whenever a concurrent sale wins a batch."""
+    for _ in range(ALLOCATION_ATTEMPTS):
+        try:
+            result = attempt()
+            db.commit()
+            return result
+        except AllocationConflict:
+            db.rollback()
+    raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Stock changed during allocation, please retry")
+
+
+def _build_sale(db: Session, payload: SaleCreate, idempotency_key: str | None = None) -> Sale:
     product = get_product_or_404(db, payload.product_id)
     retailer_id = None
     customer_name = (payload.customer_name or "").strip() or None
@@ -33,7 +135,12 @@ def create_sale(db: Session, payload: SaleCreate) -> Sale:
         existing_invoice = db.query(Sale).filter(Sale.invoice_number == invoice_number).first()
         if existing_invoice:
             raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Invoice already exists")
-    batches = _get_fifo_batches(db, product.id)
+    if stock_totals.units_on_hand(db, product.id) < payload.quantity:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Insufficient stock for sale")
+    if fifo_index.is_enabled():
+        batches = fifo_index.get_fifo_index(db).batches_for(db, product.id, payload.quantity)
+    else:
+        batches = _get_fifo_batches(db, product.id)
 
     total_available = sum(batch.quantity_remaining for batch in batches)
     if total_available < payload.quantity:
@@ -50,26 +157,284 @@ def create_sale(db: Session, payload: SaleCreate) -> Sale:
         invoice_number=invoice_number,
     )
     db.add(sale)
+    _allocate(db, sale, batches, payload.quantity)
+    if idempotency_key is not None:
+        db.flush()
+        idempotency.record(db, IDEMPOTENCY_SCOPE, idempotency_key, payload, sale, SaleRead)
+    return sale
 
-    qty_remaining = payload.quantity
-    for batch in batches:
-        if qty_remaining <= 0:
-            break
-        take = min(qty_remaining, batch.quantity_remaining)
-        batch.quantity_remaining -= take
-        allocation = SaleAllocation(sale=sale, batch=batch, quantity=take, unit_cost=batch.unit_cost)
-        db.add(allocation)
-        qty_remaining -= take
 
-    db.commit()
+def _write_grouped_sale(db: Session, request: tuple[SaleCreate, str | None]) -> int:
+    payload, idempotency_key = request
+    # The request's own session already replayed (or dropped) the key; a row now means a concurrent request won.
+    conflict = idempotency.in_conflict(db, IDEMPOTENCY_SCOPE, idempotency_key)
+    if conflict is not None:
+        raise conflict
+    sale = _build_sale(db, payload, idempotency_key)
+    # Flush so later sales in the same group see this one (invoice numbers, stock).
+    db.flush()
+    return sale.id
+
+
+def _sale_writer(engine) -> group_commit.GroupCommitWriter:
+    settings = get_settings()
+    return group_commit.GroupCommitWriter(
+        engine,
+        _write_grouped_sale,
+        max_batch=settings.sale_group_commit_max_batch,
+        window_ms=settings.sale_group_commit_window_ms,
+        retry_on=(AllocationConflict,),
+        max_attempts=ALLOCATION_ATTEMPTS,
+    )
+
+
+def find_idempotent_sale(db: Session, idempotency_key: str | None, payload: SaleCreate) -> Response | None:
+    """The response an earlier ``create_sale`` call with this key returned, if any."""
+    return idempotency.replay(db, IDEMPOTENCY_SCOPE, idempotency_key, payload, Sale, SaleRead)
+
+
+def create_sale(db: Session, payload: SaleCreate, idempotency_key: str | None = None) -> Sale:
+    try:
+        if get_settings().sale_group_commit_enabled:
+            try:
+                writer = group_commit.get_writer(db, "sales", _sale_writer)
+                sale_id = writer.submit((payload, idempotency_key))
+            except AllocationConflict:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT, detail="Stock changed during allocation, please retry"
+                )
+            return db.get(Sale, sale_id)
+
+        sale = _with_allocation_retries(db, lambda: _build_sale(db, payload, idempotency_key))
+    except IntegrityError:
+        db.rollback()
+        conflict = idempotency.in_conflict(db, IDEMPOTENCY_SCOPE, idempotency_key)
+        if conflict is not None:
+            raise conflict
+        raise
     db.refresh(sale)
     return sale
 
 
-def list_sales(db: Session) -> list[Sale]:
-    return (
+def _build_sales_bulk(db: Session, lines: list[SaleCreate]) -> list[int]:
+    product_ids = {line.product_id for line in lines}
+    retailer_ids = {line.retailer_id for line in lines if line.retailer_id is not None}
+    invoice_numbers = [(line.invoice_number or "").strip() or None for line in lines]
+
+    products = {product.id: product for product in db.query(Product).filter(Product.id.in_(product_ids))}
+    retailers = (
+        {retailer.id: retailer for retailer in db.query(Retailer).filter(Retailer.id.in_(retailer_ids))}
+        if retailer_ids
+        else {}
+    )
+    wanted_invoices = {number for number in invoice_numbers if number}
+    taken_invoices = (
+        {
+            row.invoice_number
+            for row in db.query(Sale.invoice_number).filter(Sale.invoice_number.in_(wanted_invoices))
+        }
+        if wanted_invoices
+        else set()
+    )
+    batches_by_product = _get_fifo_batches_for_products(db, set(products))
+    available = {
+        product_id: sum(batch.quantity_remaining for batch in batches)
+        for product_id, batches in batches_by_product.items()
+    }
+
+    errors: list[dict] = []
+    seen_invoices: set[str] = set()
+    sales: list[Sale] = []
+    for index, (line, invoice_number) in enumerate(zip(lines, invoice_numbers), start=1):
+        if line.product_id not in products:
+            errors.append({"line": index, "status_code": status.HTTP_404_NOT_FOUND, "detail": "Product not found"})
+            continue
+
+        retailer = None
+        if line.retailer_id is not None:
+            retailer = retailers.get(line.retailer_id)
+            if retailer is None:
+                errors.append(
+                    {"line": index, "status_code": status.HTTP_404_NOT_FOUND, "detail": "Retailer not found"}
+                )
+                continue
+
+        if invoice_number:
+            if invoice_number in taken_invoices or invoice_number in seen_invoices:
+                errors.append(
+                    {"line": index, "status_code": status.HTTP_409_CONFLICT, "detail": "Invoice already exists"}
+                )
+                continue
+            seen_invoices.add(invoice_number)
+
+        if available.get(line.product_id, 0) < line.quantity:
+            errors.append(
+                {"line": index, "status_code": status.HTTP_400_BAD_REQUEST, "detail": "Insufficient stock for sale"}
+            )
+            continue
+        available[line.product_id] -= line.quantity
+
+        customer_name = (line.customer_name or "").strip() or None
+        if retailer is not None and not customer_name:
+            customer_name = retailer.name
+
+        sale = Sale(
+            product_id=line.product_id,
+            quantity=line.quantity,
+            selling_price=Decimal(line.selling_price),
+            customer_name=customer_name,
+            unit_size_value=line.unit_size_value,
+            unit_size_unit=line.unit_size_unit,
+            retailer_id=retailer.id if retailer is not None else None,
+            invoice_number=invoice_number,
+        )
+        db.add(sale)
+        _allocate(db, sale, batches_by_product[line.product_id], line.quantity)
+        sales.append(sale)
+
+    if errors:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=errors)
+
+    db.flush()
+    return [sale.id for sale in sales]
+
+
+def create_sales_bulk(db: Session, lines: list[SaleCreate]) -> list[Sale]:
+    """Allocate every line of an invoice against one FIFO snapshot and commit once.
+
+    Lines are validated up front and allocated in order, so a later line of the same
+    product only sees the stock left behind by the earlier ones. Any failing line
+    rejects the whole invoice with a per-line error list.
+    """
+    sale_ids = _with_allocation_retries(db, lambda: _build_sales_bulk(db, lines))
+    created = (
         db.query(Sale)
-        .options(joinedload(Sale.allocations), joinedload(Sale.retailer))
-        .order_by(Sale.sale_date.desc())
+        .options(selectinload(Sale.allocations), joinedload(Sale.retailer))
+        .filter(Sale.id.in_(sale_ids))
         .all()
     )
+    order = {sale_id: position for position, sale_id in enumerate(sale_ids)}
+    return sorted(created, key=lambda sale: order[sale.id])
+
+
+SALE_ORDER = ((Sale.sale_date, True), (Sale.id, True))
+
+
+def _sale_filters(
+    date_from: Optional[date],
+    date_to: Optional[date],
+    product_id: Optional[int],
+    retailer_id: Optional[int],
+    invoice_number: Optional[str],
+) -> list:
+    filters = []
+    if date_from is not None:
+        filters.append(Sale.sale_date >= datetime.combine(date_from, time.min, tzinfo=UTC))
+    if date_to is not None:
+        filters.append(Sale.sale_date < datetime.combine(date_to + timedelta(days=1), time.min, tzinfo=UTC))
+    if product_id is not None:
+        filters.append(Sale.product_id == product_id)
+    if retailer_id is not None:
+        filters.append(Sale.retailer_id == retailer_id)
+    if invoice_number is not None:
+        filters.append(Sale.invoice_number == invoice_number)
+    return filters
+
+
+def list_sales(
+    db: Session,
+    page: PageParams = PageParams(),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    product_id: Optional[int] = None,
+    retailer_id: Optional[int] = None,
+    invoice_number: Optional[str] = None,
+) -> Page[Sale]:
+    """Newest sales first; ``date_from``/``date_to`` are inclusive UTC calendar days."""
+    # subqueryload fetches every allocation of the page in one statement; selectinload
+    # would issue one per 500 sales, so an unpaginated list grew with the ledger.
+    query = (
+        db.query(Sale)
+        .options(subqueryload(Sale.allocations), joinedload(Sale.retailer))
+        .filter(*_sale_filters(date_from, date_to, product_id, retailer_id, invoice_number))
+    )
+    return paginate(query, SALE_ORDER, page)
+
+
+SALE_FIELDS = tuple(field for field in SaleRead.model_fields if field not in ("retailer", "allocations"))
+RETAILER_FIELDS = tuple(RetailerRead.model_fields)
+ALLOCATION_FIELDS = tuple(SaleAllocationRead.model_fields)
+_ALLOCATION_CHUNK = 500
+
+
+def list_sales_fast(
+    db: Session,
+    page: PageParams = PageParams(),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    product_id: Optional[int] = None,
+    retailer_id: Optional[int] = None,
+    invoice_number: Optional[str] = None,
+) -> Page[dict]:
+    """``list_sales`` as plain dicts from column selects, for ``FastJSONResponse``."""
+    columns = [getattr(Sale, field) for field in SALE_FIELDS]
+    retailer_columns = [getattr(Retailer, field).label(f"retailer__{field}") for field in RETAILER_FIELDS]
+    query = (
+        db.query(*columns, *retailer_columns)
+        .outerjoin(Retailer, Retailer.id == Sale.retailer_id)
+        .filter(*_sale_filters(date_from, date_to, product_id, retailer_id, invoice_number))
+    )
+    rows = paginate(query, SALE_ORDER, page)
+
+    split = len(SALE_FIELDS)
+    sales = []
+    for row in rows.items:
+        sale = dict(zip(SALE_FIELDS, row[:split]))
+        sale["retailer"] = dict(zip(RETAILER_FIELDS, row[split:])) if row.retailer__id is not None else None
+        sale["allocations"] = []
+        sales.append(sale)
+
+    by_id = {sale["id"]: sale for sale in sales}
+    sale_ids = list(by_id)
+    allocation_columns = [getattr(SaleAllocation, field) for field in ALLOCATION_FIELDS]
+    for start in range(0, len(sale_ids), _ALLOCATION_CHUNK):
+        allocations = db.execute(
+            select(SaleAllocation.sale_id, *allocation_columns)
+            .where(SaleAllocation.sale_id.in_(sale_ids[start : start + _ALLOCATION_CHUNK]))
+            .order_by(SaleAllocation.id)
+        )
+        for sale_id, *values in allocations:
+            by_id[sale_id]["allocations"].append(dict(zip(ALLOCATION_FIELDS, values)))
+    return Page(sales, rows.next_cursor)
+
+
+def sales_ledger_statement(date_from: Optional[date] = None, date_to: Optional[date] = None) -> Select:
+    """One row per FIFO allocation with its sale, batch and COGS, oldest first, for exports."""
+    return (
+        select(
+            Sale.id.label("sale_id"),
+            Sale.sale_date,
+            Sale.invoice_number,
+            Sale.product_id,
+            Product.name.label("product_name"),
+            Sale.retailer_id,
+            Retailer.name.label("retailer_name"),
+            Sale.customer_name,
+            Sale.quantity.label("sale_quantity"),
+            Sale.selling_price,
+            Sale.unit_size_value,
+            Sale.unit_size_unit,
+            SaleAllocation.batch_id,
+            InventoryBatch.batch_code,
+            SaleAllocation.quantity.label("allocated_quantity"),
+            SaleAllocation.unit_cost,
+            type_coerce(SaleAllocation.quantity * SaleAllocation.unit_cost, Numeric(14, 2)).label("cogs"),
+        )
+        .join(Product, Product.id == Sale.product_id)
+        .outerjoin(Retailer, Retailer.id == Sale.retailer_id)
+        .outerjoin(SaleAllocation, SaleAllocation.sale_id == Sale.id)
+        .outerjoin(InventoryBatch, InventoryBatch.id == SaleAllocation.batch_id)
+        .where(*_sale_filters(date_from, date_to, None, None, None))
+        .order_by(Sale.sale_date, Sale.id, SaleAllocation.id)
+    )
@@ -0,0 +1,49 @@
+"""Ranked typeahead search over name-keyed master data.
+
+On SQLite, queries of three or more characters go through the FTS5 trigram
+index (``app.models.search``): rows whose name starts with the query rank
+first, then by bm25 with ``name`` weighted above the other columns. Shorter
+queries, which trigrams cannot match, fall back to a name-prefix scan of the
+unique name index, and other backends to ``ILIKE`` substring filters.
+"""
+
+from sqlalchemy import column, func, literal_column, or_, select, table
+from sqlalchemy.orm import Session
+
+from ..models.search import SearchIndex
+
+MAX_SEARCH_RESULTS = 50
+_TRIGRAM = 3
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def search(db: Session, model, index: SearchIndex, q: str, limit: int = 10) -> list:
+    q = q.strip()
+    if not q:
+        return []
+    limit = min(limit, MAX_SEARCH_RESULTS)
+    prefix = model.name.like(f"{_escape_like(q)}%", escape="\\")
+
+    if len(q) < _TRIGRAM:
+        statement = select(model).where(prefix).order_by(model.name)
+    elif db.get_bind().dialect.name == "sqlite":
+        fts = table(index.name, column("rowid"))
+        match = literal_column(index.name)
+        phrase = '"' + q.replace('"', '""') + '"'
+        statement = (
+            select(model)
+            .join(fts, fts.c.rowid == model.id)
+            .where(match.op("MATCH")(phrase))
+            .order_by(prefix.desc(), func.bm25(match, 10.0), model.name)
+        )
+    else:
+        pattern = f"%{_escape_like(q)}%"
+        statement = (
+            select(model)
+            .where(or_(*(getattr(model, name).ilike(pattern, escape="\\") for name in index.columns)))
+            .order_by(prefix.desc(), model.name)
+        )
+    return list(db.scalars(statement.limit(limit)))
@@ -1,14 +1,17 @@
 from datetime import UTC, datetime, timedelta
 
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
 from ..config import get_settings
-from ..models.entities import InventoryBatch, Product, Supplier
+from ..models.entities import InventoryBatch, Product, ProductStock, Supplier
 from ..schemas.stock import ExpiryAlert, StockBatch, StockOverview
 
 
 settings = get_settings()
 
+STOCK_BATCH_FIELDS = tuple(StockBatch.model_fields)
+
 
 def get_stock_overview(db: Session) -> StockOverview:
     batches = (
@@ -40,16 +43,55 @@ def get_stock_overview(db: Session) -> StockOverview:
             )
         )
 
-    total_units = sum(batch.quantity_remaining for batch, _, _ in batches)
-
+    total_products, total_units = _stock_totals(db)
     return StockOverview(
-        total_products=db.query(Product).count(),
+        total_products=total_products,
         total_batches=len(batch_models),
         total_units=total_units,
         batches=batch_models,
     )
 
 
+def _stock_totals(db: Session) -> tuple[int, int]:
+    return (
+        db.query(func.count(Product.id), func.coalesce(func.sum(ProductStock.units_on_hand), 0))
+        .outerjoin(ProductStock, ProductStock.product_id == Product.id)
+        .one()
+    )
+
+
+def get_stock_overview_fast(db: Session) -> dict:
+    """``get_stock_overview`` as plain dicts from a column select, for ``FastJSONResponse``."""
+    rows = db.execute(
+        select(
+            InventoryBatch.id,
+            Product.id,
+            Product.name,
+            InventoryBatch.batch_code,
+            InventoryBatch.quantity_remaining,
+            InventoryBatch.expiry_date,
+            InventoryBatch.unit_cost,
+            InventoryBatch.unit_size_value,
+            InventoryBatch.unit_size_unit,
+            func.coalesce(Supplier.id, InventoryBatch.supplier_id),
+            func.coalesce(func.nullif(InventoryBatch.supplier_name, ""), Supplier.name),
+            InventoryBatch.purchased_at,
+        )
+        .join(Product, InventoryBatch.product_id == Product.id)
+        .outerjoin(Supplier, InventoryBatch.supplier_id == Supplier.id)
+        .order_by(Product.name, InventoryBatch.batch_code)
+    )
+    batches = [dict(zip(STOCK_BATCH_FIELDS, row)) for row in rows]
+
+    total_products, total_units = _stock_totals(db)
+    return {
+        "total_products": total_products,
+        "total_batches": len(batches),
+        "total_units": total_units,
+        "batches": batches,
+    }
+
+
 def get_expiry_alerts(db: Session) -> list[ExpiryAlert]:
     today = datetime.now(UTC).date()
     deadline = today + timedelta(days=settings.expiry_alert_days)
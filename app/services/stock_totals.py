@@ -0,0 +1,182 @@
+"""Denormalised per-product stock totals (``product_stock``).
+
+Every write that changes batch stock applies its delta here inside the same
+transaction, using atomic ``UPDATE ... SET x = x + :delta`` statements so
+concurrent workers cannot lose updates. A product without a row yet is rebuilt
+from ``inventory_batches`` as seen by the current transaction, which already
+includes the caller's own change, so no delta is applied on top of a rebuild.
+"""
+
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import and_, case, delete, func, insert, literal, select, update
+from sqlalchemy.orm import Session
+
+from ..models.entities import InventoryBatch, Product, ProductStock
+from ..utils.sql import dialect_insert
+from . import data_version
+
+_open = InventoryBatch.quantity_remaining > 0
+
+
+def _totals_query(product_id: int | None = None):
+    statement = (
+        select(
+            Product.id.label("product_id"),
+            func.coalesce(func.sum(InventoryBatch.quantity_remaining), 0).label("units_on_hand"),
+            func.count(InventoryBatch.id).label("open_batches"),
+            func.min(InventoryBatch.expiry_date).label("earliest_expiry"),
+            func.coalesce(func.sum(InventoryBatch.quantity_remaining * InventoryBatch.unit_cost), 0).label(
+                "stock_value"
+            ),
+        )
+        .select_from(Product)
+        .outerjoin(InventoryBatch, and_(InventoryBatch.product_id == Product.id, _open))
+        .group_by(Product.id)
+    )
+    if product_id is not None:
+        statement = statement.where(Product.id == product_id)
+    return statement
+
+
+def _insert_if_missing(db: Session, values: dict) -> bool:
+    upsert = dialect_insert(db)
+    if upsert is not None:
+        statement = upsert(ProductStock).values(**values).on_conflict_do_nothing()
+        return db.execute(statement).rowcount == 1
+    if db.get(ProductStock, values["product_id"]) is not None:
+        return False
+    db.execute(insert(ProductStock).values(**values))
+    return True
+
+
+def _rebuild_product(db: Session, product_id: int) -> bool:
+    row = db.execute(_totals_query(product_id)).one_or_none()
+    if row is None:
+        return True
+    return _insert_if_missing(db, dict(row._mapping))
+
+
+def _apply(db: Session, product_id: int, values: dict) -> None:
+    statement = (
+        update(ProductStock)
+        .where(ProductStock.product_id == product_id)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    if db.execute(statement).rowcount:
+        return
+    if not _rebuild_product(db, product_id):
+        # Another transaction created the row between our UPDATE and INSERT.
+        db.execute(statement)
+
+
+def apply_purchase(db: Session, product_id: int, quantity: int, unit_cost: Decimal, expiry_date: date) -> None:
+    """Record a new batch; the batch must already be flushed."""
+    _apply(
+        db,
+        product_id,
+        {
+            "units_on_hand": ProductStock.units_on_hand + quantity,
+            "open_batches": ProductStock.open_batches + 1,
+            "stock_value": ProductStock.stock_value + quantity * unit_cost,
+            "earliest_expiry": case(
+                (ProductStock.earliest_expiry.is_(None), literal(expiry_date)),
+                (ProductStock.earliest_expiry > expiry_date, literal(expiry_date)),
+                else_=ProductStock.earliest_expiry,
+            ),
+        },
+    )
+
+
+def apply_purchases(db: Session, batches: list) -> None:
+    """Record many new batches with one statement per product; rows need the batch columns."""
+    by_product: dict[int, list] = {}
+    for batch in batches:
+        by_product.setdefault(batch.product_id, []).append(batch)
+    for product_id, rows in by_product.items():
+        earliest = min(row.expiry_date for row in rows)
+        _apply(
+            db,
+            product_id,
+            {
+                "units_on_hand": ProductStock.units_on_hand + sum(row.quantity_initial for row in rows),
+                "open_batches": ProductStock.open_batches + len(rows),
+                "stock_value": ProductStock.stock_value
+                + sum(row.quantity_initial * Decimal(row.unit_cost) for row in rows),
+                "earliest_expiry": case(
+                    (ProductStock.earliest_expiry.is_(None), literal(earliest)),
+                    (ProductStock.earliest_expiry > earliest, literal(earliest)),
+                    else_=ProductStock.earliest_expiry,
+                ),
+            },
+        )
+
+
+def apply_allocation(db: Session, product_id: int, units: int, value: Decimal, drained_batches: int) -> None:
+    """Record stock taken by a sale; the batch decrements must already be executed."""
+    values = {
+        "units_on_hand": ProductStock.units_on_hand - units,
+        "stock_value": ProductStock.stock_value - value,
+    }
+    if drained_batches:
+        values["open_batches"] = ProductStock.open_batches - drained_batches
+        values["earliest_expiry"] = (
+            select(func.min(InventoryBatch.expiry_date))
+            .where(InventoryBatch.product_id == product_id, _open)
+            .scalar_subquery()
+        )
+    _apply(db, product_id, values)
+
+
+def units_on_hand(db: Session, product_id: int) -> int:
+    units = db.execute(
+        select(ProductStock.units_on_hand).where(ProductStock.product_id == product_id)
+    ).scalar_one_or_none()
+    if units is None:
+        units = db.execute(_totals_query(product_id)).one_or_none()
+        return units.units_on_hand if units is not None else 0
+    return units
+
+
+def rebuild(db: Session) -> int:
+    """Recompute every row from ``inventory_batches``; returns the number of products."""
+    db.execute(delete(ProductStock))
+    rows = [dict(row._mapping) for row in db.execute(_totals_query())]
+    if rows:
+        db.execute(insert(ProductStock), rows)
+    # Stock reads are cached under the batches counter; repaired totals must not be served stale.
+    data_version.bump(db, data_version.BATCHES)
+    db.commit()
+    return len(rows)
+
+
+def verify(db: Session) -> list[dict]:
+    """Compare stored totals with a fresh recomputation; returns the products that differ."""
+    stored = {row.product_id: row for row in db.query(ProductStock)}
+    mismatches = []
+    for expected in db.execute(_totals_query()):
+        actual = stored.get(expected.product_id)
+        if actual is None:
+            if expected.units_on_hand or expected.open_batches:
+                mismatches.append({"product_id": expected.product_id, "missing": True})
+            continue
+        fields = {
+            field: {"stored": getattr(actual, field), "expected": getattr(expected, field)}
+            for field in ("units_on_hand", "open_batches", "earliest_expiry")
+            if getattr(actual, field) != getattr(expected, field)
+        }
+        if Decimal(actual.stock_value).quantize(Decimal("0.01")) != Decimal(expected.stock_value).quantize(
+            Decimal("0.01")
+        ):
+            fields["stock_value"] = {"stored": actual.stock_value, "expected": expected.stock_value}
+        if fields:
+            mismatches.append({"product_id": expected.product_id, **fields})
+    return mismatches
+
+
+def backfill_if_empty(db: Session) -> None:
+    """Seed the table for databases that predate it."""
+    if db.query(ProductStock.product_id).first() is None and db.query(InventoryBatch.id).first() is not None:
+        rebuild(db)
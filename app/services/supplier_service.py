@@ -1,8 +1,11 @@
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 
+from ..models import search as search_indexes
 from ..models.entities import Supplier
 from ..schemas.supplier import SupplierCreate
+from ..utils.pagination import Page, PageParams, paginate
+from . import data_version, master_data, search_service
 
 
 def create_supplier(db: Session, payload: SupplierCreate) -> Supplier:
@@ -12,13 +15,23 @@ def create_supplier(db: Session, payload: SupplierCreate) -> Supplier:
 
     supplier = Supplier(**payload.model_dump())
     db.add(supplier)
+    data_version.bump(db, data_version.SUPPLIERS)
     db.commit()
     db.refresh(supplier)
     return supplier
 
 
-def list_suppliers(db: Session) -> list[Supplier]:
-    return db.query(Supplier).order_by(Supplier.name).all()
+def upsert_suppliers(db: Session, lines: list[SupplierCreate]) -> dict:
+    """Create or update suppliers matched on ``name``; returns created/updated/unchanged counts."""
+    return master_data.upsert_by_name(db, Supplier, lines, data_version.SUPPLIERS)
+
+
+def search_suppliers(db: Session, q: str, limit: int = 10) -> list[Supplier]:
+    return search_service.search(db, Supplier, search_indexes.SUPPLIERS, q, limit)
+
+
+def list_suppliers(db: Session, page: PageParams = PageParams()) -> Page[Supplier]:
+    return paginate(db.query(Supplier), ((Supplier.name, False), (Supplier.id, False)), page)
 
 
 def get_supplier_or_404(db: Session, supplier_id: int) -> Supplier:
@@ -31,4 +44,5 @@ def get_supplier_or_404(db: Session, supplier_id: int) -> Supplier:
 def delete_supplier(db: Session, supplier_id: int) -> None:
     supplier = get_supplier_or_404(db, supplier_id)
     db.delete(supplier)
+    data_version.bump(db, data_version.SUPPLIERS, data_version.BATCHES)
     db.commit()
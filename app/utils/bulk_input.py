@@ -0,0 +1,121 @@
+import csv
+import io
+import json
+from typing import TypeVar
+
+from fastapi import HTTPException, Request, status
+from pydantic import BaseModel, ValidationError
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+NDJSON_MEDIA_TYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl"}
+CSV_MEDIA_TYPES = {"text/csv", "application/csv"}
+MAX_BULK_LINES = 5000
+MAX_BULK_UPSERT_LINES = 100_000
+# A goods-receipt note can list a whole truck; rows are cheap compared with sale lines.
+MAX_BULK_PURCHASE_LINES = 50_000
+
+
+def _too_many_lines(max_lines: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=f"At most {max_lines} lines per request"
+    )
+
+
+def _validate_lines(model: type[ModelT], items: list[tuple[int, object]]) -> list[ModelT]:
+    lines: list[ModelT] = []
+    errors: list[dict] = []
+    for line_number, item in items:
+        try:
+            lines.append(model.model_validate(item))
+        except ValidationError as exc:
+            errors.append({"line": line_number, "detail": exc.errors(include_url=False, include_context=False)})
+    if errors:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=errors)
+    if not lines:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="No lines supplied")
+    return lines
+
+
+async def _iter_ndjson(request: Request):
+    buffer = b""
+    line_number = 0
+    async for chunk in request.stream():
+        buffer += chunk
+        *complete, buffer = buffer.split(b"\n")
+        for raw in complete:
+            line_number += 1
+            if raw.strip():
+                yield line_number, raw
+    if buffer.strip():
+        yield line_number + 1, buffer
+
+
+def _csv_rows(body: bytes, max_lines: int) -> list[tuple[int, dict]]:
+    try:
+        text = body.decode("utf-8-sig")
+    except UnicodeDecodeError as exc:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="CSV must be UTF-8") from exc
+    reader = csv.DictReader(io.StringIO(text))
+    rows: list[tuple[int, dict]] = []
+    for row in reader:
+        if not any(row.values()):
+            continue
+        if len(rows) == max_lines:
+            raise _too_many_lines(max_lines)
+        # Empty cells are left out so the model's defaults apply; line numbers count the header.
+        values = {key.strip(): value for key, value in row.items() if key and value not in (None, "")}
+        rows.append((reader.line_num, values))
+    return rows
+
+
+async def read_bulk_lines(request: Request, model: type[ModelT], max_lines: int = MAX_BULK_LINES) -> list[ModelT]:
+    """Parse a bulk body into validated models.
+
+    Accepts a JSON array, a newline-delimited JSON stream (one object per line) or
+    a CSV file with a header row, chosen by the request ``Content-Type``. Line
+    numbers in errors are 1-based lines of the body. Lines are counted as they are
+    read, so an oversized body gets its 413 before any line is validated.
+    """
+    media_type = request.headers.get("content-type", "application/json").split(";")[0].strip().lower()
+
+    items: list[tuple[int, object]] = []
+    if media_type in NDJSON_MEDIA_TYPES:
+        async for line_number, raw in _iter_ndjson(request):
+            if len(items) == max_lines:
+                raise _too_many_lines(max_lines)
+            try:
+                items.append((line_number, json.loads(raw)))
+            except json.JSONDecodeError as exc:
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail=[{"line": line_number, "detail": f"Invalid JSON: {exc.msg}"}],
+                ) from exc
+        return _validate_lines(model, items)
+    if media_type in CSV_MEDIA_TYPES:
+        return _validate_lines(model, _csv_rows(await request.body(), max_lines))
+
+    try:
+        body = json.loads(await request.body() or b"null")
+    except json.JSONDecodeError as exc:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Invalid JSON body") from exc
+    if not isinstance(body, list):
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Expected a JSON array of lines")
+    if len(body) > max_lines:
+        raise _too_many_lines(max_lines)
+    return _validate_lines(model, list(enumerate(body, start=1)))
+
+
+def bulk_openapi_body(model: type[BaseModel]) -> dict:
+    """OpenAPI ``requestBody`` for routes that read their body through ``read_bulk_lines``."""
+    item_schema = {"$ref": f"#/components/schemas/{model.__name__}"}
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": {"type": "array", "items": item_schema}},
+                "application/x-ndjson": {"schema": item_schema},
+                "text/csv": {"schema": {"type": "string", "description": "Header row of field names, then lines"}},
+            },
+        }
+    }
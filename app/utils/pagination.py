@@ -0,0 +1,114 @@
+"""Keyset (seek) pagination for list endpoints.
+
+A page is requested with ``limit`` and an optional ``cursor``; the cursor is an
+opaque token holding the sort key of the last row served, and the next page is
+read with a ``WHERE (sort key) > cursor`` predicate instead of an ``OFFSET``,
+so every page costs the same index seek however deep the client has scrolled.
+Routes always serve bounded pages; only internal callers can ask for every row,
+by passing ``PageParams(limit=None)`` explicitly.
+"""
+
+import base64
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Generic, Optional, Sequence, TypeVar
+
+from fastapi import HTTPException, Query, Response, status
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import InstrumentedAttribute, Query as OrmQuery
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+T = TypeVar("T")
+
+# (column, descending)
+SortKey = Sequence[tuple[InstrumentedAttribute, bool]]
+
+
+@dataclass
+class PageParams:
+    limit: Optional[int] = DEFAULT_PAGE_SIZE
+    cursor: Optional[str] = None
+
+
+def page_params(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+    cursor: Optional[str] = Query(
+        None, description=f"Opaque token from the previous page's {NEXT_CURSOR_HEADER} header"
+    ),
+) -> PageParams:
+    return PageParams(limit=limit, cursor=cursor)
+
+
+@dataclass
+class Page(Generic[T]):
+    items: list[T]
+    next_cursor: Optional[str] = None
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _decode_value(column: InstrumentedAttribute, value: Any) -> Any:
+    python_type = column.type.python_type
+    if value is None:
+        return None
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    return python_type(value)
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps([_encode_value(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str, order: SortKey) -> list[Any]:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(order):
+            raise ValueError("cursor does not match this listing")
+        return [_decode_value(column, value) for (column, _), value in zip(order, values)]
+    except (ValueError, TypeError) as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from exc
+
+
+def _after(order: SortKey, values: Sequence[Any]):
+    """Rows strictly after ``values`` in ``order``: (a > x) OR (a = x AND b > y) OR ..."""
+    clauses = []
+    for position, (column, descending) in enumerate(order):
+        value = values[position]
+        step = column < value if descending else column > value
+        clauses.append(and_(*(prior == values[i] for i, (prior, _) in enumerate(order[:position])), step))
+    return or_(*clauses)
+
+
+def paginate(query: OrmQuery, order: SortKey, params: PageParams) -> Page:
+    """Apply ``order`` (which must end in a unique column) and the page window to ``query``."""
+    query = query.order_by(*(column.desc() if descending else column.asc() for column, descending in order))
+    if params.cursor:
+        query = query.filter(_after(order, decode_cursor(params.cursor, order)))
+    if params.limit is None:
+        return Page(query.all())
+
+    rows = query.limit(params.limit + 1).all()
+    if len(rows) <= params.limit:
+        return Page(rows)
+    rows = rows[: params.limit]
+    last = rows[-1]
+    return Page(rows, encode_cursor([getattr(last, column.key) for column, _ in order]))
+
+
+def set_next_cursor(response: Response, page: Page) -> list:
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    return page.items
@@ -0,0 +1,161 @@
+"""Sampling profiler for single requests, with collapsed-stack and speedscope output.
+
+``RequestProfile`` samples the stacks of every thread working for one request
+while it runs. A thread counts as working for the request when one of its frames
+is running inside the request's ``contextvars`` context: the threadpool copies
+that context into every sync endpoint and dependency call, and the event loop
+runs the request's tasks in it. Only profiled requests start a sampler, so the
+rest pay nothing beyond the header check in the middleware.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextvars import Context, ContextVar
+from datetime import UTC, datetime
+from typing import Literal
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+ProfileFormat = Literal["collapsed", "speedscope"]
+
+current_profile: ContextVar["RequestProfile | None"] = ContextVar("current_profile", default=None)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _handle_context(handle: asyncio.Handle) -> Context | None:
+    get_context = getattr(handle, "get_context", None)  # public from Python 3.12
+    context = get_context() if get_context is not None else getattr(handle, "_context", None)
+    # Older or alternative loops may not keep it at all; their callbacks just go unattributed.
+    return context if isinstance(context, Context) else None
+
+
+def _entered_context(frame) -> Context | None:
+    """The context a frame runs its callee in: a worker thread's ``context.run`` or an asyncio handle."""
+    for value in frame.f_locals.values():
+        if isinstance(value, Context):
+            return value
+        if isinstance(value, asyncio.Handle):
+            return _handle_context(value)
+    return None
+
+
+class RequestProfile:
+    def __init__(self, profile_id: str, method: str, path: str, interval_seconds: float) -> None:
+        self.profile_id = profile_id
+        self.method = method
+        self.path = path
+        self.interval_seconds = interval_seconds
+        self.started_at = datetime.now(UTC)
+        self.duration_ms = 0.0
+        self.status_code: int | None = None
+        self.stacks: Counter[tuple[str, ...]] = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name=f"profile-{self.profile_id}", daemon=True)
+        self._thread.start()
+
+    def stop(self, status_code: int | None) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.duration_ms = round((time.perf_counter() - self._started) * 1000, 3)
+        self.status_code = status_code
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.is_set():
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != own:
+                    self._sample(frame)
+            self.samples += 1
+            self._stop.wait(self.interval_seconds)
+
+    def _sample(self, frame) -> None:
+        stack = []
+        while frame is not None:
+            context = _entered_context(frame)
+            if context is not None and context.get(current_profile) is self:
+                # Everything above this frame is threadpool or event-loop plumbing.
+                self.stacks[tuple(reversed(stack))] += 1
+                return
+            stack.append(_frame_label(frame))
+            frame = frame.f_back
+
+    def summary(self) -> dict:
+        return {
+            "profile_id": self.profile_id,
+            "method": self.method,
+            "path": self.path,
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": self.duration_ms,
+            "status_code": self.status_code,
+            "samples": self.samples,
+            "interval_ms": self.interval_seconds * 1000,
+        }
+
+    def collapsed(self) -> str:
+        """Brendan Gregg's folded format, one ``root;...;leaf count`` line per stack."""
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in sorted(self.stacks.items()) if stack)
+
+    def speedscope(self) -> dict:
+        """A sampled profile in speedscope's file format, weighted in milliseconds."""
+        frames: dict[str, int] = {}
+        samples, weights = [], []
+        for stack, count in sorted(self.stacks.items()):
+            if stack:
+                samples.append([frames.setdefault(label, len(frames)) for label in stack])
+                weights.append(round(count * self.interval_seconds * 1000, 3))
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": [{"name": label} for label in frames]},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": f"{self.method} {self.path}",
+                    "unit": "milliseconds",
+                    "startValue": 0,
+                    "endValue": sum(weights),
+                    "samples": samples,
+                    "weights": weights,
+                }
+            ],
+            "name": self.profile_id,
+            "exporter": "sweetstock",
+        }
+
+
+class ProfileStore:
+    """The most recent ``max_entries`` finished profiles, by id."""
+
+    def __init__(self, max_entries: int = 20) -> None:
+        self.max_entries = max_entries
+        self._profiles: OrderedDict[str, RequestProfile] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, profile: RequestProfile) -> None:
+        with self._lock:
+            self._profiles[profile.profile_id] = profile
+            self._profiles.move_to_end(profile.profile_id)
+            while len(self._profiles) > self.max_entries:
+                self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> RequestProfile | None:
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+    def summaries(self) -> list[dict]:
+        """Newest first."""
+        with self._lock:
+            return [profile.summary() for profile in reversed(self._profiles.values())]
@@ -0,0 +1,137 @@
+"""Bounded log of slow SQL statements with their query plans.
+
+``SlowQueryLog`` keeps the most recent statements that ran longer than a
+threshold. Each entry names the route that was being served and the service
+function that issued the statement, and the first time a statement text is seen
+its plan is captured with ``EXPLAIN QUERY PLAN`` (``EXPLAIN`` elsewhere). Text
+parameters are redacted; numbers, dates and NULLs are kept, since they are what
+usually explains a plan.
+"""
+
+import sys
+import threading
+from collections import OrderedDict, deque
+from contextvars import ContextVar
+from datetime import UTC, date, datetime
+from decimal import Decimal
+
+from . import statement_timing
+
+# The ASGI scope of the request being served, set by the middleware in ``app.main``.
+current_scope: ContextVar[dict | None] = ContextVar("slow_query_scope", default=None)
+
+SERVICES_PACKAGE = __name__.split(".")[0] + ".services."
+EXPLAINABLE = ("select", "with", "insert", "update", "delete")
+MAX_PLANS = 1000
+
+
+def redact(value):
+    if value is None or isinstance(value, (bool, int, float, Decimal, date)):
+        return value
+    if isinstance(value, (str, bytes)):
+        return f"<{type(value).__name__} len={len(value)}>"
+    return f"<{type(value).__name__}>"
+
+
+def redact_parameters(parameters):
+    if isinstance(parameters, dict):
+        return {key: redact(value) for key, value in parameters.items()}
+    return [redact(value) for value in parameters or ()]
+
+
+def _route() -> str | None:
+    scope = current_scope.get()
+    if scope is None:
+        return None
+    route = scope.get("route")
+    return f"{scope.get('method')} {getattr(route, 'path', scope.get('path'))}"
+
+
+def _service() -> str | None:
+    """The innermost ``app.services`` function on the calling stack."""
+    frame = sys._getframe(2)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith(SERVICES_PACKAGE):
+            return f"{module.rsplit('.', 1)[1]}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return None
+
+
+class SlowQueryLog:
+    """Thread-safe ring buffer of statements slower than ``threshold_ms``."""
+
+    def __init__(self, threshold_ms: float = 200.0, max_entries: int = 100) -> None:
+        self.threshold_ms = threshold_ms
+        self._entries: deque[dict] = deque(maxlen=max_entries)
+        self._plans: OrderedDict[str, list[str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def listen(self, target) -> None:
+        """Start logging slow statements run through ``target`` (an engine, or the ``Engine`` class)."""
+        statement_timing.subscribe(target, self._observe)
+
+    def remove(self, target) -> None:
+        statement_timing.unsubscribe(target, self._observe)
+
+    def _observe(self, conn, statement, parameters, context, executemany, elapsed: float) -> None:
+        duration_ms = elapsed * 1000
+        if duration_ms < self.threshold_ms:
+            return
+        sample = parameters[0] if executemany and parameters else parameters
+        with self._lock:
+            plan = self._plans.get(statement)
+            first = plan is None
+        if first:
+            plan = self._explain(conn, statement, sample)
+            with self._lock:
+                self._plans[statement] = plan
+                while len(self._plans) > MAX_PLANS:
+                    self._plans.popitem(last=False)
+        entry = {
+            "occurred_at": datetime.now(UTC).isoformat(),
+            "duration_ms": round(duration_ms, 3),
+            "statement": statement,
+            "parameters": redact_parameters(sample),
+            "executemany": len(parameters) if executemany else None,
+            "route": _route(),
+            "service": _service(),
+            "first_occurrence": first,
+            "plan": plan,
+        }
+        with self._lock:
+            self._entries.append(entry)
+
+    @staticmethod
+    def _explain(conn, statement: str, parameters) -> list[str]:
+        if not statement.lstrip().lower().startswith(EXPLAINABLE):
+            return []
+        prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+        # A raw cursor, so the EXPLAIN itself is neither timed nor logged.
+        cursor = conn.connection.cursor()
+        try:
+            cursor.execute(prefix + statement, parameters or ())
+            return [str(row[-1]) for row in cursor.fetchall()]
+        except Exception as exc:  # the plan is best effort; never fail the caller's statement
+            return [f"EXPLAIN failed: {exc}"]
+        finally:
+            cursor.close()
+
+    def entries(self) -> list[dict]:
+        """Newest first."""
+        with self._lock:
+            return list(reversed(self._entries))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._plans.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "threshold_ms": self.threshold_ms,
+                "max_entries": self._entries.maxlen,
+                "entries": len(self._entries),
+                "plans": len(self._plans),
+            }
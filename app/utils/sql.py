@@ -0,0 +1,54 @@
+"""Small dialect-aware SQL expression helpers shared by the reporting code."""
+
+from decimal import Decimal
+
+from sqlalchemy import Date, Integer, cast, func
+from sqlalchemy.orm import Session
+
+
+def dialect_insert(db: Session):
+    """The backend's ``insert`` construct when it supports ``ON CONFLICT``, else ``None``."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+
+        return insert
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+
+        return insert
+    return None
+
+
+def month_key(db: Session, column):
+    """``YYYY-MM`` of a date/datetime column."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return func.to_char(column, "YYYY-MM")
+    if dialect in ("mysql", "mariadb"):
+        return func.date_format(column, "%Y-%m")
+    return func.strftime("%Y-%m", column)
+
+
+def day_key(db: Session, column):
+    """Calendar day of a datetime column."""
+    if db.get_bind().dialect.name == "sqlite":
+        return func.date(column)
+    return cast(column, Date)
+
+
+def in_paise(column):
+    """Round a money column to integer paise.
+
+    Money may be stored as floats (SQLite REAL); rounding each value before
+    summing keeps totals exact at any volume.
+    """
+    return cast(func.round(column * 100), Integer)
+
+
+def to_paise(amount: Decimal) -> int:
+    return int((Decimal(amount) * 100).to_integral_value())
+
+
+def from_paise(value) -> Decimal:
+    return Decimal(int(value or 0)).scaleb(-2)
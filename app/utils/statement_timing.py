@@ -0,0 +1,67 @@
+"""One pair of cursor hooks that times each SQL statement for every subscriber.
+
+The metrics and the slow-query log both want per-statement durations. Instead of
+each registering its own ``before/after_cursor_execute`` pair, they subscribe
+here: a target gets one pair of hooks while anything is subscribed to it, the
+clock is read once on each side of the statement, and every subscriber receives
+the same elapsed time.
+"""
+
+import threading
+import time
+from typing import Any, Callable
+
+from sqlalchemy import event
+
+# observer(conn, statement, parameters, context, executemany, elapsed_seconds)
+StatementObserver = Callable[[Any, str, Any, Any, bool, float], None]
+
+# Kept on the statement's execution context, so a statement that raises leaves nothing behind.
+_START_ATTR = "_statement_started"
+
+
+class _Hooks:
+    def __init__(self) -> None:
+        # Replaced, never mutated, so statements on other threads iterate a stable tuple.
+        self.observers: tuple[StatementObserver, ...] = ()
+
+    def before(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        if context is not None:
+            setattr(context, _START_ATTR, time.perf_counter())
+
+    def after(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        started = getattr(context, _START_ATTR, None)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        for observer in self.observers:
+            observer(conn, statement, parameters, context, executemany, elapsed)
+
+
+_hooks: dict[Any, _Hooks] = {}
+_lock = threading.Lock()
+
+
+def subscribe(target, observer: StatementObserver) -> None:
+    """Call ``observer`` after every statement run through ``target`` (an engine, or the ``Engine`` class)."""
+    with _lock:
+        hooks = _hooks.get(target)
+        if hooks is None:
+            hooks = _hooks[target] = _Hooks()
+            event.listen(target, "before_cursor_execute", hooks.before)
+            event.listen(target, "after_cursor_execute", hooks.after)
+        if observer not in hooks.observers:
+            hooks.observers = (*hooks.observers, observer)
+
+
+def unsubscribe(target, observer: StatementObserver) -> None:
+    """Stop calling ``observer``; the hooks come off ``target`` with its last subscriber."""
+    with _lock:
+        hooks = _hooks.get(target)
+        if hooks is None or observer not in hooks.observers:
+            return
+        hooks.observers = tuple(existing for existing in hooks.observers if existing != observer)
+        if not hooks.observers:
+            event.remove(target, "before_cursor_execute", hooks.before)
+            event.remove(target, "after_cursor_execute", hooks.after)
+            del _hooks[target]
@@ -0,0 +1,48 @@
+"""Shared helpers for the benchmark scripts.
+
+Benchmarks run against a throwaway SQLite file so commit/fsync costs are real.
+``use_temp_database`` must run before anything under ``app`` is imported, because
+the engine is built from settings at import time.
+"""
+
+import os
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+
+def use_temp_database(prefix: str = "bench") -> str:
+    handle, path = tempfile.mkstemp(prefix=f"{prefix}-", suffix=".db")
+    os.close(handle)
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    os.environ["DEBUG"] = "false"
+    # Measure the tuned profile unless the caller chose otherwise.
+    os.environ.setdefault("SQLITE_TUNING_ENABLED", "true")
+    return path
+
+
+def drop_temp_database(path: str) -> None:
+    """Remove a temporary database together with any WAL sidecar files."""
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+def make_client():
+    from fastapi.testclient import TestClient
+
+    from app.main import create_app
+
+    return TestClient(create_app())
+
+
+@contextmanager
+def timed(results: dict, key: str):
+    started = time.perf_counter()
+    yield
+    results[key] = time.perf_counter() - started
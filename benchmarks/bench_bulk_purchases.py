@@ -0,0 +1,71 @@
+"""Goods-receipt import: one POST /api/purchases/ per row vs one POST /api/purchases/bulk.
+
+    python -m benchmarks.bench_bulk_purchases --rows 10000
+"""
+
+import argparse
+import csv
+import io
+from datetime import date, timedelta
+
+from benchmarks._support import drop_temp_database, make_client, timed, use_temp_database
+
+
+def receipt(product_ids: list[int], rows: int, prefix: str) -> list[dict]:
+    expiry = date.today() + timedelta(days=60)
+    return [
+        {
+            "product_id": product_ids[i % len(product_ids)],
+            "batch_code": f"{prefix}-{i}",
+            "quantity": 50,
+            "unit_cost": "12.50",
+            "expiry_date": (expiry + timedelta(days=i % 30)).isoformat(),
+        }
+        for i in range(rows)
+    ]
+
+
+def as_csv(lines: list[dict]) -> str:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(lines[0]), lineterminator="\n")
+    writer.writeheader()
+    writer.writerows(lines)
+    return buffer.getvalue()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--products", type=int, default=200)
+    args = parser.parse_args()
+
+    path = use_temp_database("bulk-purchases")
+    try:
+        client = make_client()
+        product_ids = [
+            client.post("/api/products/", json={"name": f"SKU-{p}"}).json()["id"] for p in range(args.products)
+        ]
+
+        results: dict[str, float] = {}
+        with timed(results, "per_row"):
+            for row in receipt(product_ids, args.rows, "ROW"):
+                assert client.post("/api/purchases/", json=row).status_code == 201
+        with timed(results, "bulk_json"):
+            assert client.post("/api/purchases/bulk", json=receipt(product_ids, args.rows, "JSON")).status_code == 201
+        note = as_csv(receipt(product_ids, args.rows, "CSV"))
+        with timed(results, "bulk_csv"):
+            response = client.post("/api/purchases/bulk", content=note, headers={"Content-Type": "text/csv"})
+            assert response.status_code == 201
+
+        for key, seconds in results.items():
+            print(f"{key:>9}: {seconds:8.3f}s  {args.rows / seconds:10.0f} rows/s")
+        print(
+            f"  speedup: {results['per_row'] / results['bulk_json']:.0f}x (json), "
+            f"{results['per_row'] / results['bulk_csv']:.0f}x (csv)"
+        )
+    finally:
+        drop_temp_database(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Bulk invoice vs one POST per line.
+
+    python -m benchmarks.bench_bulk_sales --lines 60 --invoices 20
+"""
+
+import argparse
+from datetime import date, timedelta
+
+from benchmarks._support import drop_temp_database, make_client, timed, use_temp_database
+
+
+def seed(client, products: int, batches_per_product: int) -> list[int]:
+    product_ids = []
+    expiry = date.today() + timedelta(days=90)
+    for p in range(products):
+        product_id = client.post("/api/products/", json={"name": f"SKU-{p}"}).json()["id"]
+        product_ids.append(product_id)
+        for b in range(batches_per_product):
+            client.post(
+                "/api/purchases/",
+                json={
+                    "product_id": product_id,
+                    "batch_code": f"B-{p}-{b}",
+                    "quantity": 100_000,
+                    "unit_cost": "10",
+                    "expiry_date": (expiry + timedelta(days=b)).isoformat(),
+                },
+            )
+    return product_ids
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lines", type=int, default=60, help="lines per invoice")
+    parser.add_argument("--invoices", type=int, default=20)
+    parser.add_argument("--products", type=int, default=40)
+    parser.add_argument("--batches", type=int, default=20, help="open batches per product")
+    args = parser.parse_args()
+
+    path = use_temp_database("bulk-sales")
+    try:
+        client = make_client()
+        product_ids = seed(client, args.products, args.batches)
+        invoice = [
+            {"product_id": product_ids[i % len(product_ids)], "quantity": 3, "selling_price": "25"}
+            for i in range(args.lines)
+        ]
+
+        results: dict[str, float] = {}
+        with timed(results, "per_line"):
+            for _ in range(args.invoices):
+                for sale_line in invoice:
+                    assert client.post("/api/sales/", json=sale_line).status_code == 201
+        with timed(results, "bulk"):
+            for _ in range(args.invoices):
+                assert client.post("/api/sales/bulk", json=invoice).status_code == 201
+
+        for key, seconds in results.items():
+            print(f"{key:>9}: {seconds:8.3f}s  {args.invoices / seconds:8.1f} invoices/s")
+        print(f"  speedup: {results['per_line'] / results['bulk']:.1f}x")
+    finally:
+        drop_temp_database(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Catalog load: one POST /api/products/ per SKU vs POST /api/products/bulk upserts.
+
+    python -m benchmarks.bench_catalog_upsert --rows 50000 --sample 2000
+
+The per-record path is timed on ``--sample`` SKUs only and extrapolated; the
+bulk path loads the full catalog, then reloads it with 10% of the rows changed.
+"""
+
+import argparse
+
+from benchmarks._support import drop_temp_database, make_client, timed, use_temp_database
+
+
+def catalog(rows: int, prefix: str, brand_every: int = 0) -> list[dict]:
+    return [
+        {
+            "name": f"{prefix}-{i}",
+            "category": f"Category {i % 40}",
+            "brand": "Revised" if brand_every and i % brand_every == 0 else f"Brand {i % 300}",
+        }
+        for i in range(rows)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--sample", type=int, default=2_000, help="SKUs posted one at a time")
+    args = parser.parse_args()
+
+    path = use_temp_database("catalog-upsert")
+    try:
+        client = make_client()
+        results: dict[str, float] = {}
+        with timed(results, "per_record"):
+            for product in catalog(args.sample, "ONE"):
+                assert client.post("/api/products/", json=product).status_code == 201
+        with timed(results, "bulk_create"):
+            response = client.post("/api/products/bulk", json=catalog(args.rows, "SKU"))
+        assert response.json()["created"] == args.rows
+        with timed(results, "bulk_update"):
+            response = client.post("/api/products/bulk", json=catalog(args.rows, "SKU", brand_every=10))
+        print(f"reload: {response.json()}")
+
+        per_record = results["per_record"] / args.sample * args.rows
+        print(f"per_record: {per_record:8.1f}s for {args.rows} rows (extrapolated from {args.sample})")
+        for key in ("bulk_create", "bulk_update"):
+            print(f"{key:>10}: {results[key]:8.1f}s  {args.rows / results[key]:10.0f} rows/s")
+        print(f"   speedup: {per_record / results['bulk_create']:.0f}x")
+    finally:
+        drop_temp_database(path)
+
+
+if __name__ == "__main__":
+    main()
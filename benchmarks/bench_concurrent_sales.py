@@ -0,0 +1,136 @@
+"""Sales throughput with 1..N concurrent writer processes on one SKU.
+
+    python -m benchmarks.bench_concurrent_sales --workers 1 2 4 8
+
+Each worker process opens its own engine with the app's SQLite PRAGMAs (as a
+uvicorn worker would) and sells until the stock check refuses. Every run ends
+with an oversell audit.
+
+Expect flat or falling throughput past one worker. SQLite admits one writer at a
+time, and a process that finds the write lock taken does not queue for it: it
+sleeps in SQLite's busy handler, backing off from 1 ms up to 100 ms per retry,
+so every hand-off leaves the database idle for part of a sleep. With fewer CPUs
+than workers (the header prints the count) the processes also time-slice one
+core, and the lock holder can be descheduled mid-transaction. Batching writes
+inside one process (``bench_group_commit``) is what scales a single SQLite file.
+"""
+
+import argparse
+import multiprocessing
+import os
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from benchmarks._support import drop_temp_database, use_temp_database
+
+
+def _engine(url: str):
+    from sqlalchemy import create_engine
+
+    from app.config import get_settings
+    from app.database import apply_sqlite_pragmas, sqlite_pragmas
+
+    # Same connection profile as the app's own engine (busy timeout, WAL, synchronous, ...).
+    engine = create_engine(url, connect_args={"check_same_thread": False})
+    apply_sqlite_pragmas(engine, sqlite_pragmas(get_settings()))
+    return engine
+
+
+def seed(url: str, batches: int, units: int) -> int:
+    from sqlalchemy.orm import sessionmaker
+
+    from app.database import Base
+    from app.models.entities import InventoryBatch, Product
+
+    engine = _engine(url)
+    Base.metadata.create_all(bind=engine)
+    with sessionmaker(bind=engine)() as db:
+        product = Product(name="Hot SKU")
+        db.add(product)
+        db.flush()
+        for index in range(batches):
+            db.add(
+                InventoryBatch(
+                    product_id=product.id,
+                    batch_code=f"HOT-{index}",
+                    quantity_initial=units,
+                    quantity_remaining=units,
+                    unit_cost=Decimal("10"),
+                    expiry_date=date.today() + timedelta(days=30 + index),
+                )
+            )
+        db.commit()
+        product_id = product.id
+    engine.dispose()
+    return product_id
+
+
+def sell(url: str, product_id: int, quantity: int) -> tuple[int, int]:
+    from fastapi import HTTPException
+    from sqlalchemy.orm import sessionmaker
+
+    from app.schemas.sale import SaleCreate
+    from app.services import sales_service
+
+    engine = _engine(url)
+    session_factory = sessionmaker(bind=engine, autoflush=False)
+    payload = SaleCreate(product_id=product_id, quantity=quantity, selling_price="20")
+    sales = conflicts = 0
+    while True:
+        with session_factory() as db:
+            try:
+                sales_service.create_sale(db, payload)
+                sales += 1
+            except HTTPException as exc:
+                if exc.status_code != 409:
+                    break
+                conflicts += 1
+    engine.dispose()
+    return sales, conflicts
+
+
+def audit(url: str) -> int:
+    from sqlalchemy import func
+    from sqlalchemy.orm import sessionmaker
+
+    from app.models.entities import InventoryBatch
+
+    engine = _engine(url)
+    with sessionmaker(bind=engine)() as db:
+        negative = db.query(func.count()).filter(InventoryBatch.quantity_remaining < 0).scalar()
+    engine.dispose()
+    return negative
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--batches", type=int, default=50)
+    parser.add_argument("--units", type=int, default=200, help="units per batch")
+    parser.add_argument("--quantity", type=int, default=3, help="units per sale")
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    print(f"cpus={os.cpu_count()}")
+    for workers in args.workers:
+        path = use_temp_database(f"concurrent-{workers}")
+        url = os.environ["DATABASE_URL"]
+        try:
+            product_id = seed(url, args.batches, args.units)
+            with context.Pool(workers) as pool:
+                started = time.perf_counter()
+                results = pool.starmap(sell, [(url, product_id, args.quantity)] * workers)
+                elapsed = time.perf_counter() - started
+            sales = sum(result[0] for result in results)
+            conflicts = sum(result[1] for result in results)
+            print(
+                f"workers={workers:<3} sales={sales:<6} {sales / elapsed:8.1f} sales/s  "
+                f"conflict-retries={conflicts:<5} negative-batches={audit(url)}"
+            )
+        finally:
+            drop_temp_database(path)
+
+
+if __name__ == "__main__":
+    main()
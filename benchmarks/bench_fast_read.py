@@ -0,0 +1,129 @@
+"""Model path vs FAST_JSON_ENABLED column path for GET /api/stock/ and GET /api/sales/.
+
+    python -m benchmarks.bench_fast_read --sizes 10000 100000 1000000
+
+Each size is the number of batches (and of sales, one allocation each). Time is
+the best of ``--repeat`` full requests; peak memory is traced separately with
+tracemalloc, which slows the request down, so the two are never mixed.
+"""
+
+import argparse
+import os
+import time
+import tracemalloc
+from datetime import UTC, date, datetime, timedelta
+from decimal import Decimal
+
+from benchmarks._support import drop_temp_database, make_client, use_temp_database
+
+BATCHES_PER_PRODUCT = 100
+CHUNK = 20_000
+
+
+def grow(engine, start: int, stop: int) -> None:
+    from sqlalchemy import insert
+
+    from app.models.entities import InventoryBatch, Product, Sale, SaleAllocation
+
+    expiry = date.today() + timedelta(days=30)
+    sold_at = datetime(2024, 1, 1, tzinfo=UTC)
+    with engine.begin() as conn:
+        for first in range(start, stop, CHUNK):
+            ids = range(first + 1, min(first + CHUNK, stop) + 1)
+            new_products = [
+                {"id": i // BATCHES_PER_PRODUCT + 1, "name": f"SKU-{i // BATCHES_PER_PRODUCT + 1}"}
+                for i in ids
+                if (i - 1) % BATCHES_PER_PRODUCT == 0
+            ]
+            if new_products:
+                conn.execute(insert(Product), new_products)
+            conn.execute(
+                insert(InventoryBatch),
+                [
+                    {
+                        "id": i,
+                        "product_id": (i - 1) // BATCHES_PER_PRODUCT + 1,
+                        "batch_code": f"B-{i}",
+                        "quantity_initial": 50,
+                        "quantity_remaining": 49,
+                        "unit_cost": Decimal("12.75"),
+                        "expiry_date": expiry + timedelta(days=i % 60),
+                        "supplier_name": "Bench Supplier",
+                    }
+                    for i in ids
+                ],
+            )
+            conn.execute(
+                insert(Sale),
+                [
+                    {
+                        "id": i,
+                        "product_id": (i - 1) // BATCHES_PER_PRODUCT + 1,
+                        "quantity": 1,
+                        "selling_price": Decimal("19.50"),
+                        "sale_date": sold_at + timedelta(seconds=i),
+                    }
+                    for i in ids
+                ],
+            )
+            conn.execute(
+                insert(SaleAllocation),
+                [{"sale_id": i, "batch_id": i, "quantity": 1, "unit_cost": Decimal("12.75")} for i in ids],
+            )
+
+
+def fetch(client, url: str) -> int:
+    response = client.get(url)
+    assert response.status_code == 200
+    return len(response.content)
+
+
+def measure(client, url: str, repeat: int) -> tuple[float, float, int]:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        size = fetch(client, url)
+        best = min(best, time.perf_counter() - started)
+    tracemalloc.start()
+    fetch(client, url)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak / 2**20, size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    path = use_temp_database("fast-read")
+    os.environ["RESULT_CACHE_ENABLED"] = "false"
+    try:
+        client = make_client()
+        from app.config import get_settings
+        from app.database import engine
+
+        settings = get_settings()
+        rows = 0
+        print(f"{'endpoint':<12}{'rows':>10}{'path':>7}{'best s':>10}{'peak MiB':>11}{'MiB out':>10}")
+        for size in sorted(args.sizes):
+            grow(engine, rows, size)
+            rows = size
+            for url in ("/api/stock/", "/api/sales/"):
+                timings = {}
+                for path_name, fast in (("model", False), ("fast", True)):
+                    settings.fast_json_enabled = fast
+                    timings[path_name] = measure(client, url, args.repeat)
+                    seconds, peak, body = timings[path_name]
+                    print(f"{url:<12}{size:>10}{path_name:>7}{seconds:>10.3f}{peak:>11.1f}{body / 2**20:>10.1f}")
+                print(
+                    f"{'':<12}{'':>10}{'gain':>7}{timings['model'][0] / timings['fast'][0]:>9.1f}x"
+                    f"{timings['model'][1] / timings['fast'][1]:>10.1f}x"
+                )
+    finally:
+        drop_temp_database(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Concurrent single-line sales per second with group commit off and on.
+
+    python -m benchmarks.bench_group_commit --threads 16 --sales 50
+
+Each thread plays a counter terminal posting small sales through
+``sales_service.create_sale`` with its own session, like a threadpool worker.
+"""
+
+import argparse
+import os
+import threading
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from benchmarks._support import drop_temp_database, use_temp_database
+
+
+def run(url: str, threads: int, sales_per_thread: int, products: int, enabled: bool) -> float:
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from app.config import get_settings
+    from app.database import Base
+    from app.models.entities import InventoryBatch, Product
+    from app.schemas.sale import SaleCreate
+    from app.services import sales_service
+
+    get_settings().sale_group_commit_enabled = enabled
+    engine = create_engine(url, connect_args={"check_same_thread": False, "timeout": 60})
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine, autoflush=False)
+    with session_factory() as db:
+        for p in range(products):
+            product = Product(name=f"SKU-{p}")
+            db.add(product)
+            db.flush()
+            db.add(
+                InventoryBatch(
+                    product_id=product.id,
+                    batch_code=f"B-{p}",
+                    quantity_initial=1_000_000,
+                    quantity_remaining=1_000_000,
+                    unit_cost=Decimal("10"),
+                    expiry_date=date.today() + timedelta(days=90),
+                )
+            )
+        db.commit()
+        product_ids = [product.id for product in db.query(Product)]
+
+    def terminal(offset: int):
+        for n in range(sales_per_thread):
+            payload = SaleCreate(
+                product_id=product_ids[(offset + n) % len(product_ids)], quantity=1, selling_price="15"
+            )
+            with session_factory() as db:
+                sales_service.create_sale(db, payload)
+
+    workers = [threading.Thread(target=terminal, args=(i,)) for i in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+    engine.dispose()
+    return threads * sales_per_thread / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--sales", type=int, default=50, help="sales per thread")
+    parser.add_argument("--products", type=int, default=20)
+    args = parser.parse_args()
+
+    for enabled in (False, True):
+        path = use_temp_database("group-commit")
+        try:
+            rate = run(os.environ["DATABASE_URL"], args.threads, args.sales, args.products, enabled)
+            print(f"group commit {'on ' if enabled else 'off'}: {rate:8.1f} sales/s")
+        finally:
+            drop_temp_database(path)
+
+
+if __name__ == "__main__":
+    main()
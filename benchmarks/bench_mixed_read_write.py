@@ -0,0 +1,153 @@
+"""Sale latency while report and listing readers run, with and without the SQLite profile.
+
+    python -m benchmarks.bench_mixed_read_write --writers 2 --readers 4 --seconds 10
+
+For each profile a fresh database is seeded, then writer processes post sales
+through the primary engine while reader processes loop over the stock overview,
+the monthly profit report and a page of sales through the read pool, as the GET
+routes do. Every process opens its own engines, like a uvicorn worker.
+"""
+
+import argparse
+import multiprocessing
+import os
+import statistics
+import time
+from datetime import UTC, date, datetime, timedelta
+from decimal import Decimal
+
+from benchmarks._support import drop_temp_database, use_temp_database
+
+PROFILES = {"untuned": "false", "tuned": "true"}
+
+
+def seed(products: int, batches: int, history: int) -> None:
+    from sqlalchemy import insert
+
+    from app.database import SessionLocal, engine
+    from app.migrate import migrate
+    from app.models.entities import InventoryBatch, Product, Sale, SaleAllocation
+    from app.services import sales_rollup, stock_totals
+
+    migrate(engine)
+    start = datetime(2024, 1, 1, tzinfo=UTC)
+    with engine.begin() as conn:
+        conn.execute(insert(Product), [{"id": p, "name": f"SKU-{p}"} for p in range(1, products + 1)])
+        conn.execute(
+            insert(InventoryBatch),
+            [
+                {
+                    "id": b,
+                    "product_id": b % products + 1,
+                    "batch_code": f"B-{b}",
+                    "quantity_initial": 10**7,
+                    "quantity_remaining": 10**7,
+                    "unit_cost": Decimal("10"),
+                    "expiry_date": date.today() + timedelta(days=30 + b % 90),
+                }
+                for b in range(1, batches + 1)
+            ],
+        )
+        conn.execute(
+            insert(Sale),
+            [
+                {
+                    "id": s,
+                    "product_id": s % products + 1,
+                    "quantity": 2,
+                    "selling_price": Decimal("15"),
+                    "sale_date": start + timedelta(minutes=s),
+                }
+                for s in range(1, history + 1)
+            ],
+        )
+        conn.execute(
+            insert(SaleAllocation),
+            [
+                {"sale_id": s, "batch_id": s % batches + 1, "quantity": 2, "unit_cost": Decimal("10")}
+                for s in range(1, history + 1)
+            ],
+        )
+    with SessionLocal() as db:
+        stock_totals.rebuild(db)
+        sales_rollup.rebuild(db)
+    engine.dispose()
+
+
+def write(products: int, start_at: float, deadline: float) -> list[float]:
+    from app.database import SessionLocal
+    from app.schemas.sale import SaleCreate
+    from app.services import sales_service
+
+    time.sleep(max(0.0, start_at - time.time()))
+    latencies, n = [], 0
+    while time.time() < deadline:
+        n += 1
+        payload = SaleCreate(product_id=n % products + 1, quantity=1, selling_price="15")
+        started = time.perf_counter()
+        with SessionLocal() as db:
+            sales_service.create_sale(db, payload)
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def read(start_at: float, deadline: float) -> int:
+    from app.database import ReadSessionLocal
+    from app.services import report_service, sales_service, stock_service
+    from app.utils.pagination import PageParams
+
+    time.sleep(max(0.0, start_at - time.time()))
+    reads = 0
+    while time.time() < deadline:
+        with ReadSessionLocal() as db:
+            stock_service.get_stock_overview(db)
+            report_service.get_monthly_profit_report(db, by_product=True)
+            sales_service.list_sales(db, PageParams(limit=500))
+        reads += 1
+    return reads
+
+
+def run_profile(args, tuned: str) -> dict:
+    os.environ["SQLITE_TUNING_ENABLED"] = tuned
+    path = use_temp_database(f"mixed-{tuned}")
+    context = multiprocessing.get_context("spawn")
+    try:
+        with context.Pool(1) as pool:
+            pool.apply(seed, (args.products, args.batches, args.history))
+        with context.Pool(args.writers + args.readers) as pool:
+            start_at = time.time() + 5  # give every worker time to import the app first
+            deadline = start_at + args.seconds
+            writers = [pool.apply_async(write, (args.products, start_at, deadline)) for _ in range(args.writers)]
+            readers = [pool.apply_async(read, (start_at, deadline)) for _ in range(args.readers)]
+            latencies = sorted(latency for job in writers for latency in job.get())
+            reads = sum(job.get() for job in readers)
+    finally:
+        drop_temp_database(path)
+    quantiles = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "sales/s": len(latencies) / args.seconds,
+        "p50 ms": quantiles[49] * 1000,
+        "p99 ms": quantiles[98] * 1000,
+        "max ms": latencies[-1] * 1000,
+        "reads/s": reads / args.seconds,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--products", type=int, default=200)
+    parser.add_argument("--batches", type=int, default=20_000)
+    parser.add_argument("--history", type=int, default=200_000, help="sales already on file")
+    args = parser.parse_args()
+
+    print(f"{'profile':<10}{'sales/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}{'reads/s':>10}")
+    for name, tuned in PROFILES.items():
+        result = run_profile(args, tuned)
+        print(f"{name:<10}" + "".join(f"{value:>10.1f}" for value in result.values()))
+
+
+if __name__ == "__main__":
+    main()
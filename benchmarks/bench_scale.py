@@ -0,0 +1,184 @@
+"""Service timings at several data scales, emitted as JSON for release-to-release comparison.
+
+    python -m benchmarks.bench_scale --scales tiny small --output scale.json
+    python -m benchmarks.bench_scale --scales real --repeat 3 --writes 100
+
+Every scale gets its own SQLite file (with the app's pragmas), filled by
+``benchmarks.datagen`` with a fixed seed. Reads run ``--repeat`` times each in a
+fresh session; then ``create_purchase`` and ``create_sale`` run ``--writes``
+times each, one commit per call, against products that still hold stock.
+Reads call the services directly, so the result cache never answers for them.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from datetime import UTC, datetime, timedelta
+
+from benchmarks._support import ROOT_DIR, drop_temp_database, use_temp_database
+from benchmarks.datagen import SCALES, add_scale_arguments, generate, scale_from_args
+
+
+def read_paths():
+    from app.services import report_service, stock_service
+
+    return {
+        "get_stock_overview": stock_service.get_stock_overview,
+        "get_expiry_alerts": stock_service.get_expiry_alerts,
+        "get_top_selling_products": lambda db: report_service.get_top_selling_products(db, 5),
+        "get_top_selling_products[days=30]": lambda db: report_service.get_top_selling_products(db, 5, 30),
+        "get_slow_moving_products": lambda db: report_service.get_slow_moving_products(db, 5, 30),
+        "get_monthly_profit_report": report_service.get_monthly_profit_report,
+        "get_monthly_profit_report[by_product]": lambda db: report_service.get_monthly_profit_report(
+            db, by_product=True
+        ),
+    }
+
+
+def summarize(seconds: list[float]) -> dict:
+    ms = sorted(value * 1000 for value in seconds)
+    p95 = statistics.quantiles(ms, n=20, method="inclusive")[18] if len(ms) > 1 else ms[0]
+    return {
+        "runs": len(ms),
+        "min_ms": round(ms[0], 3),
+        "median_ms": round(statistics.median(ms), 3),
+        "p95_ms": round(p95, 3),
+        "max_ms": round(ms[-1], 3),
+    }
+
+
+def time_reads(session_factory, repeat: int) -> dict:
+    results = {}
+    for name, call in read_paths().items():
+        seconds = []
+        for _ in range(repeat):
+            with session_factory() as db:
+                started = time.perf_counter()
+                call(db)
+                seconds.append(time.perf_counter() - started)
+        results[name] = summarize(seconds)
+    return results
+
+
+def time_writes(session_factory, writes: int, seed: int) -> dict:
+    from fastapi import HTTPException
+    from sqlalchemy import select
+
+    from app.models.entities import ProductStock
+    from app.schemas.purchase import PurchaseCreate
+    from app.schemas.sale import SaleCreate
+    from app.services import purchase_service, sales_service
+
+    rng = random.Random(seed)
+    with session_factory() as db:
+        stocked = db.scalars(select(ProductStock.product_id).where(ProductStock.units_on_hand > 0)).all()
+    expiry = datetime.now(UTC).date() + timedelta(days=60)
+
+    purchases = []
+    for n in range(writes):
+        payload = PurchaseCreate(
+            product_id=rng.choice(stocked), batch_code=f"BENCH-{n}", quantity=50, unit_cost="25", expiry_date=expiry
+        )
+        with session_factory() as db:
+            started = time.perf_counter()
+            purchase_service.create_purchase(db, payload)
+            purchases.append(time.perf_counter() - started)
+
+    sales, rejected = [], 0
+    for _ in range(writes):
+        payload = SaleCreate(product_id=rng.choice(stocked), quantity=rng.choice((1, 1, 2, 3)), selling_price="40")
+        with session_factory() as db:
+            started = time.perf_counter()
+            try:
+                sales_service.create_sale(db, payload)
+            except HTTPException:
+                rejected += 1
+                continue
+            sales.append(time.perf_counter() - started)
+
+    return {
+        "create_purchase": summarize(purchases),
+        "create_sale": {**summarize(sales), "rejected": rejected} if sales else {"runs": 0, "rejected": rejected},
+    }
+
+
+def run_scale(name: str, scale, args) -> dict:
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from app.config import get_settings
+    from app.database import apply_sqlite_pragmas, sqlite_pragmas
+    from app.migrate import migrate
+
+    handle, path = tempfile.mkstemp(prefix=f"scale-{name}-", suffix=".db")
+    os.close(handle)
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    apply_sqlite_pragmas(engine, sqlite_pragmas(get_settings()))
+    try:
+        migrate(engine)
+        generated = generate(engine, scale, args.seed, args.end)
+        print(f"{name}: generated {generated}", file=sys.stderr)
+        session_factory = sessionmaker(bind=engine, autoflush=False)
+        timings = time_reads(session_factory, args.repeat)
+        timings.update(time_writes(session_factory, args.writes, args.seed))
+        return {"scale": name, "config": asdict(scale), "generated": generated, "timings": timings}
+    finally:
+        engine.dispose()
+        drop_temp_database(path)
+
+
+def revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=ROOT_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", nargs="+", choices=SCALES, default=["tiny", "small"])
+    parser.add_argument("--repeat", type=int, default=5, help="runs of each read path")
+    parser.add_argument("--writes", type=int, default=200, help="create_purchase and create_sale calls")
+    parser.add_argument("--output", help="write the JSON here as well as to stdout")
+    add_scale_arguments(parser)
+    args = parser.parse_args()
+
+    # The app's global engine is never used here, but keep it away from inventory.db.
+    placeholder = use_temp_database("scale")
+    try:
+        report = {
+            "benchmark": "bench_scale",
+            "started_at": datetime.now(UTC).isoformat(),
+            "revision": revision(),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "seed": args.seed,
+            "results": [],
+        }
+        for name in args.scales:
+            report["results"].append(run_scale(name, scale_from_args(name, args), args))
+    finally:
+        drop_temp_database(placeholder)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
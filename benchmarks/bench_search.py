@@ -0,0 +1,69 @@
+"""Typeahead latency: GET /api/products/search against a large catalog.
+
+    python -m benchmarks.bench_search --products 20000 --queries 500
+
+Prints per-keystroke latency percentiles for 1-6 character slices of real
+names, which covers the short-query name scan and the FTS5 trigram path: once
+for the whole HTTP round trip and once for the service call alone.
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from benchmarks._support import drop_temp_database, make_client, use_temp_database
+
+WORDS = ["Kaju", "Katli", "Rasgulla", "Laddoo", "Barfi", "Peda", "Kesar", "Pista", "Soan", "Papdi", "Halwa", "Gulab"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--products", type=int, default=20_000)
+    parser.add_argument("--queries", type=int, default=500)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    path = use_temp_database("search")
+    try:
+        client = make_client()
+        catalog = [
+            {"name": f"{rng.choice(WORDS)} {rng.choice(WORDS)} {i}", "brand": f"Brand {i % 90}", "category": "Mithai"}
+            for i in range(args.products)
+        ]
+        assert client.post("/api/products/bulk", json=catalog).status_code == 200
+
+        from app.database import ReadSessionLocal
+        from app.services import product_service
+
+        db = ReadSessionLocal()
+        by_length: dict[int, list[float]] = {}
+        query_only: dict[int, list[float]] = {}
+        for _ in range(args.queries):
+            name = rng.choice(catalog)["name"]
+            start = rng.randrange(0, 5)
+            for length in range(1, 7):
+                q = name[start : start + length]
+                started = time.perf_counter()
+                response = client.get("/api/products/search", params={"q": q})
+                by_length.setdefault(length, []).append(time.perf_counter() - started)
+                assert response.status_code == 200
+                started = time.perf_counter()
+                product_service.search_products(db, q)
+                query_only.setdefault(length, []).append(time.perf_counter() - started)
+        db.close()
+
+        print(f"{'chars':>5}{'http p50':>10}{'http p99':>10}{'query p50':>11}{'query p99':>11}  (ms)")
+        for length in sorted(by_length):
+            http = statistics.quantiles(by_length[length], n=100, method="inclusive")
+            query = statistics.quantiles(query_only[length], n=100, method="inclusive")
+            print(
+                f"{length:>5}{http[49] * 1000:>10.2f}{http[98] * 1000:>10.2f}"
+                f"{query[49] * 1000:>11.2f}{query[98] * 1000:>11.2f}"
+            )
+    finally:
+        drop_temp_database(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+"""Deterministic synthetic data at configurable scale.
+
+    python -m benchmarks.datagen --scale small --database-url sqlite:///./scale.db
+
+``generate`` fills an empty schema with products, suppliers, retailers, batches
+and a sales ledger whose allocations are consistent with the batches, then
+rebuilds ``product_stock`` and ``daily_product_sales`` so every read path sees
+the same numbers the write path would have produced. The same seed, scale and
+end date always give the same rows.
+
+The shape is meant to look like a sweets distributor rather than uniform noise:
+
+- product popularity follows a Zipf curve, so a few SKUs carry most of the volume;
+- each product has a shelf life (a week to six months) and a preferred supplier,
+  and its deliveries are spread over the window, sized to about 1.15x demand;
+- daily sales follow a weekly cycle (weekends busiest) and a yearly wave;
+- most sales are one or two units, with occasional bulk orders, and about 60%
+  go to (Zipf-weighted) retailers;
+- sales draw on the earliest-expiring batch already delivered and not yet
+  expired. Anything left in an expired batch stays behind as wastage, and
+  demand with no stock on hand is recorded as a stockout instead of a sale.
+"""
+
+import argparse
+import heapq
+import itertools
+import math
+import os
+import random
+import time
+from dataclasses import asdict, dataclass
+from datetime import UTC, date, datetime, timedelta
+from decimal import Decimal
+
+CHUNK = 20_000
+SEED = 20240601
+
+SHELF_LIFE_DAYS = (7, 15, 30, 60, 120, 180)
+CATEGORIES = ("Barfi", "Laddoo", "Peda", "Halwa", "Namkeen", "Dry Fruit", "Chikki", "Rasgulla")
+BRANDS = ("Haldiram", "Bikanervala", "Chitale", "Ganguram", "Anand", "Agarwal", "House")
+CITIES = ("Pune", "Mumbai", "Jaipur", "Kolkata", "Delhi", "Indore", "Nagpur")
+CHANNELS = ("kirana", "supermarket", "caterer", "online", "hotel")
+# Units per sale and their relative frequency; 12 and 25 are bulk orders.
+QUANTITIES = (1, 2, 3, 5, 12, 25)
+QUANTITY_WEIGHTS = (55, 24, 10, 7, 3, 1)
+MEAN_QUANTITY = sum(q * w for q, w in zip(QUANTITIES, QUANTITY_WEIGHTS)) / sum(QUANTITY_WEIGHTS)
+WEEKDAY_FACTOR = (1.0, 0.9, 0.95, 1.0, 1.15, 1.4, 1.3)
+RETAIL_SHARE = 0.6
+OVERSUPPLY = 1.15
+
+
+@dataclass(frozen=True)
+class Scale:
+    products: int
+    batches: int
+    sales: int
+    suppliers: int
+    retailers: int
+    days: int = 365
+
+
+SCALE_FIELDS = tuple(Scale.__dataclass_fields__)
+SCALES = {
+    "tiny": Scale(products=50, batches=1_000, sales=10_000, suppliers=8, retailers=20, days=120),
+    "small": Scale(products=500, batches=20_000, sales=200_000, suppliers=40, retailers=200),
+    "medium": Scale(products=2_000, batches=100_000, sales=2_000_000, suppliers=120, retailers=1_000),
+    # About our production size.
+    "real": Scale(products=5_000, batches=500_000, sales=10_000_000, suppliers=300, retailers=5_000),
+}
+
+
+def _zipf_weights(rng: random.Random, count: int, exponent: float = 1.1) -> list[float]:
+    ranks = list(range(1, count + 1))
+    rng.shuffle(ranks)
+    return [1 / rank**exponent for rank in ranks]
+
+
+def _apportion(total: int, weights: list[float], minimum: int = 0) -> list[int]:
+    """Split ``total`` into integers proportional to ``weights`` (largest remainder), each at least ``minimum``."""
+    spare = total - minimum * len(weights)
+    if spare < 0:
+        raise ValueError(f"cannot give {len(weights)} shares at least {minimum} each out of {total}")
+    scale = spare / sum(weights)
+    exact = [weight * scale for weight in weights]
+    shares = [math.floor(value) for value in exact]
+    by_remainder = sorted(range(len(weights)), key=lambda i: exact[i] - shares[i], reverse=True)
+    for i in by_remainder[: spare - sum(shares)]:
+        shares[i] += 1
+    return [share + minimum for share in shares]
+
+
+def _money(value: float) -> Decimal:
+    return Decimal(f"{value:.2f}")
+
+
+def _at(day: date, seconds: int) -> datetime:
+    return datetime(day.year, day.month, day.day, tzinfo=UTC) + timedelta(seconds=seconds)
+
+
+def generate(engine, scale: Scale, seed: int = SEED, end: date | None = None) -> dict:
+    """Fill the (empty) database behind ``engine``; returns row counts and timing.
+
+    ``end`` is the last day of sales history and defaults to today, so expiry
+    alerts and windowed reports see a realistic near future and recent past.
+    """
+    from sqlalchemy import bindparam, func, insert, select, update
+    from sqlalchemy.orm import Session
+
+    from app.models.entities import InventoryBatch, Product, Retailer, Sale, SaleAllocation, Supplier
+    from app.services import sales_rollup, stock_totals
+
+    if scale.batches < scale.products:
+        raise ValueError("need at least one batch per product")
+    started = time.perf_counter()
+    rng = random.Random(seed)
+    end = end or datetime.now(UTC).date()
+    start = end - timedelta(days=scale.days - 1)
+    opened_at = _at(start, 0)
+
+    with engine.connect() as conn:
+        if conn.execute(select(func.count()).select_from(Product)).scalar_one():
+            raise ValueError("generate() needs an empty database")
+
+    popularity = _zipf_weights(rng, scale.products)
+    shelf_life = [rng.choice(SHELF_LIFE_DAYS) for _ in range(scale.products)]
+    base_cost = [rng.uniform(20, 400) for _ in range(scale.products)]
+    markup = [rng.uniform(1.25, 1.8) for _ in range(scale.products)]
+    supplier_of = [rng.randrange(scale.suppliers) + 1 for _ in range(scale.products)]
+    retailer_weights = list(itertools.accumulate(_zipf_weights(rng, scale.retailers)))
+
+    # Deliveries: batch counts and sizes follow each product's expected demand.
+    batch_counts = _apportion(scale.batches, popularity, minimum=1)
+    total_popularity = sum(popularity)
+    deliveries = []
+    for index, count in enumerate(batch_counts):
+        demand = scale.sales * MEAN_QUANTITY * popularity[index] / total_popularity
+        for k in range(count):
+            day = start + timedelta(days=min(int((k + rng.random()) * scale.days / count), scale.days - 1))
+            quantity = max(5, round(demand / count * OVERSUPPLY * rng.uniform(0.8, 1.2)))
+            cost = base_cost[index] * rng.uniform(0.95, 1.05)
+            deliveries.append((day, index, k, quantity, cost))
+    deliveries.sort(key=lambda delivery: (delivery[0], delivery[1], delivery[2]))
+
+    batch_rows = []
+    for batch_id, (day, index, k, quantity, cost) in enumerate(deliveries, start=1):
+        batch_rows.append(
+            {
+                "id": batch_id,
+                "product_id": index + 1,
+                "supplier_id": supplier_of[index],
+                "supplier_name": f"Supplier {supplier_of[index]:04d}",
+                "batch_code": f"SKU{index + 1:05d}-{k + 1:04d}",
+                "quantity_initial": quantity,
+                "quantity_remaining": quantity,
+                "unit_cost": _money(cost),
+                "expiry_date": day + timedelta(days=shelf_life[index]),
+                "purchased_at": _at(day, 7 * 3600 + rng.randrange(4 * 3600)),
+            }
+        )
+
+    with engine.begin() as conn:
+        conn.execute(
+            insert(Supplier),
+            [
+                {"id": n, "name": f"Supplier {n:04d}", "city": rng.choice(CITIES), "created_at": opened_at}
+                for n in range(1, scale.suppliers + 1)
+            ],
+        )
+        conn.execute(
+            insert(Retailer),
+            [
+                {"id": n, "name": f"Retailer {n:05d}", "channel": rng.choice(CHANNELS), "created_at": opened_at}
+                for n in range(1, scale.retailers + 1)
+            ],
+        )
+        conn.execute(
+            insert(Product),
+            [
+                {
+                    "id": n + 1,
+                    "name": f"{rng.choice(CATEGORIES)} {n + 1:05d}",
+                    "category": rng.choice(CATEGORIES),
+                    "brand": rng.choice(BRANDS),
+                    "created_at": opened_at,
+                }
+                for n in range(scale.products)
+            ],
+        )
+        for first in range(0, len(batch_rows), CHUNK):
+            conn.execute(insert(InventoryBatch), batch_rows[first : first + CHUNK])
+
+    # Daily volume: weekly cycle times a yearly wave, apportioned to hit scale.sales exactly.
+    day_weights = [
+        WEEKDAY_FACTOR[(start + timedelta(days=d)).weekday()]
+        * (1 + 0.15 * math.sin(2 * math.pi * (start + timedelta(days=d)).timetuple().tm_yday / 365))
+        for d in range(scale.days)
+    ]
+    daily_sales = _apportion(scale.sales, day_weights)
+    product_weights = list(itertools.accumulate(popularity))
+    products = range(scale.products)
+    prices: dict[tuple[int, int], Decimal] = {}
+
+    remaining = [row["quantity_initial"] for row in batch_rows]
+    open_batches: list[list[tuple]] = [[] for _ in products]
+    next_delivery = 0
+    sale_id = 0
+    allocations = 0
+    stockouts = 0
+    sales_chunk: list[dict] = []
+    allocations_chunk: list[dict] = []
+
+    def flush(conn) -> None:
+        if sales_chunk:
+            conn.execute(insert(Sale), sales_chunk)
+            conn.execute(insert(SaleAllocation), allocations_chunk)
+            sales_chunk.clear()
+            allocations_chunk.clear()
+
+    with engine.begin() as conn:
+        for offset, count in enumerate(daily_sales):
+            day = start + timedelta(days=offset)
+            while next_delivery < len(batch_rows) and deliveries[next_delivery][0] <= day:
+                row = batch_rows[next_delivery]
+                heapq.heappush(
+                    open_batches[row["product_id"] - 1],
+                    (row["expiry_date"], row["purchased_at"], next_delivery),
+                )
+                next_delivery += 1
+
+            seconds = sorted(9 * 3600 + rng.randrange(12 * 3600) for _ in range(count))
+            for index, at in zip(rng.choices(products, cum_weights=product_weights, k=count), seconds):
+                heap = open_batches[index]
+                while heap and (heap[0][0] < day or remaining[heap[0][2]] == 0):
+                    heapq.heappop(heap)
+                wanted = rng.choices(QUANTITIES, weights=QUANTITY_WEIGHTS)[0]
+                if not heap:
+                    stockouts += 1
+                    continue
+                sale_id += 1
+                sold = 0
+                while heap and sold < wanted:
+                    position = heap[0][2]
+                    take = min(wanted - sold, remaining[position])
+                    remaining[position] -= take
+                    sold += take
+                    allocations_chunk.append(
+                        {
+                            "sale_id": sale_id,
+                            "batch_id": position + 1,
+                            "quantity": take,
+                            "unit_cost": batch_rows[position]["unit_cost"],
+                        }
+                    )
+                    if remaining[position] == 0:
+                        heapq.heappop(heap)
+                    while heap and heap[0][0] < day:
+                        heapq.heappop(heap)
+                # Prices drift up about 1% a month.
+                month = offset // 30
+                price = prices.get((index, month))
+                if price is None:
+                    price = prices[(index, month)] = _money(base_cost[index] * markup[index] * 1.01**month)
+                retail = rng.random() < RETAIL_SHARE
+                sales_chunk.append(
+                    {
+                        "id": sale_id,
+                        "product_id": index + 1,
+                        "retailer_id": rng.choices(range(1, scale.retailers + 1), cum_weights=retailer_weights)[0]
+                        if retail
+                        else None,
+                        "quantity": sold,
+                        "selling_price": price,
+                        "sale_date": _at(day, at),
+                    }
+                )
+                if len(sales_chunk) >= CHUNK:
+                    allocations += len(allocations_chunk)
+                    flush(conn)
+        allocations += len(allocations_chunk)
+        flush(conn)
+
+        changed = [
+            {"batch_id": position + 1, "remaining": left}
+            for position, left in enumerate(remaining)
+            if left != batch_rows[position]["quantity_initial"]
+        ]
+        statement = (
+            update(InventoryBatch.__table__)
+            .where(InventoryBatch.__table__.c.id == bindparam("batch_id"))
+            .values(quantity_remaining=bindparam("remaining"))
+        )
+        for first in range(0, len(changed), CHUNK):
+            conn.execute(statement, changed[first : first + CHUNK])
+
+    with Session(bind=engine) as db:
+        stock_totals.rebuild(db)
+        sales_rollup.rebuild(db)
+
+    return {
+        "products": scale.products,
+        "suppliers": scale.suppliers,
+        "retailers": scale.retailers,
+        "batches": len(batch_rows),
+        "sales": sale_id,
+        "allocations": allocations,
+        "stockouts": stockouts,
+        "first_day": start.isoformat(),
+        "last_day": end.isoformat(),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def scale_from_args(preset: str, args) -> Scale:
+    """``SCALES[preset]`` with any ``--products``/``--sales``/... overrides applied."""
+    overrides = {field: getattr(args, field) for field in SCALE_FIELDS if getattr(args, field) is not None}
+    return Scale(**{**asdict(SCALES[preset]), **overrides})
+
+
+def add_scale_arguments(parser: argparse.ArgumentParser) -> None:
+    for field in SCALE_FIELDS:
+        parser.add_argument(f"--{field}", type=int, help="override the preset")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--end", type=date.fromisoformat, help="last day of sales history (default: today)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=SCALES, default="small")
+    parser.add_argument("--database-url", required=True, help="an empty (or not yet created) database")
+    add_scale_arguments(parser)
+    args = parser.parse_args()
+
+    # Settings are read at import time, so the target database must be set first.
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ["DEBUG"] = "false"
+    from app.database import engine
+    from app.migrate import migrate
+
+    migrate(engine)
+    counts = generate(engine, scale_from_args(args.scale, args), args.seed, args.end)
+    print(", ".join(f"{key}={value}" for key, value in counts.items()))
+
+
+if __name__ == "__main__":
+    main()
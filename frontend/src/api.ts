@@ -13,12 +13,18 @@ import type {
 } from './types'
 
 const BASE_URL = (import.meta.env.VITE_API_URL as string | undefined)?.replace(/\/$/, '') ?? 'http://127.0.0.1:8000'
+// POSTs that record stock movements carry an Idempotency-Key, so retrying them never records twice.
 const MAX_RETRIES = 3
 const RETRYABLE_STATUS = new Set([502, 503, 504])
+// List endpoints serve keyset pages; the full rosters are read page by page until no next cursor comes back.
+const PAGE_SIZE = 500
+const NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+
+const searchQuery = (q: string, limit: number) => new URLSearchParams({ q, limit: String(limit) }).toString()
 
 const wait = (ms: number) => new Promise((resolve) => setTimeout(resolve, ms))
 
-async function request<T>(path: string, options: RequestInit = {}, attempt = 1): Promise<T> {
+async function send(path: string, options: RequestInit = {}, attempt = 1): Promise<Response> {
   const url = `${BASE_URL}${path}`
   const headers = new Headers(options.headers)
   if (options.body && !headers.has('Content-Type')) {
@@ -30,7 +36,7 @@ async function request<T>(path: string, options: RequestInit = {}, attempt = 1):
     if (!response.ok) {
       if (RETRYABLE_STATUS.has(response.status) && attempt < MAX_RETRIES) {
         await wait(200 * attempt)
-        return request(path, options, attempt + 1)
+        return send(path, options, attempt + 1)
       }
       let detail = response.statusText
       try {
@@ -41,23 +47,42 @@ async function request<T>(path: string, options: RequestInit = {}, attempt = 1):
       }
       throw new Error(detail || 'Request failed')
     }
-
-    if (response.status === 204) {
-      return undefined as T
-    }
-
-    return response.json() as Promise<T>
+    return response
   } catch (error) {
     if (error instanceof TypeError && attempt < MAX_RETRIES) {
       await wait(200 * attempt)
-      return request(path, options, attempt + 1)
+      return send(path, options, attempt + 1)
     }
     throw error
   }
 }
 
+async function request<T>(path: string, options: RequestInit = {}): Promise<T> {
+  const response = await send(path, options)
+  if (response.status === 204) {
+    return undefined as T
+  }
+  return response.json() as Promise<T>
+}
+
+async function requestAll<T>(path: string): Promise<T[]> {
+  const items: T[] = []
+  let cursor: string | null = null
+  do {
+    const params = new URLSearchParams({ limit: String(PAGE_SIZE) })
+    if (cursor) {
+      params.set('cursor', cursor)
+    }
+    const response = await send(`${path}?${params}`)
+    items.push(...((await response.json()) as T[]))
+    cursor = response.headers.get(NEXT_CURSOR_HEADER)
+  } while (cursor)
+  return items
+}
+
 export const api = {
-  getProducts: () => request<Product[]>('/api/products/'),
+  getProducts: () => requestAll<Product>('/api/products/'),
+  searchProducts: (q: string, limit = 10) => request<Product[]>(`/api/products/search?${searchQuery(q, limit)}`),
   createProduct: (payload: { name: string; category?: string; brand?: string }) =>
     request<Product>('/api/products/', {
       method: 'POST',
@@ -77,6 +102,7 @@ export const api = {
   }) =>
     request<PurchaseRead>('/api/purchases/', {
       method: 'POST',
+      headers: { 'Idempotency-Key': crypto.randomUUID() },
       body: JSON.stringify(payload),
     }),
 
@@ -92,16 +118,18 @@ export const api = {
   }) =>
     request<SaleRead>('/api/sales/', {
       method: 'POST',
+      headers: { 'Idempotency-Key': crypto.randomUUID() },
       body: JSON.stringify(payload),
     }),
 
   getStock: () => request<StockOverview>('/api/stock/'),
   getExpiryAlerts: () => request<ExpiryAlert[]>('/api/stock/expiring'),
-  getSales: () => request<SaleRead[]>('/api/sales/'),
+  getSales: () => requestAll<SaleRead>('/api/sales/'),
   getTopSelling: (limit = 5) => request<TopProduct[]>(`/api/reports/top-selling?limit=${limit}`),
   getSlowMoving: (limit = 5) => request<SlowProduct[]>(`/api/reports/slow-moving?limit=${limit}`),
   getProfitReport: () => request<ProfitReport>('/api/reports/monthly-profit'),
-  getSuppliers: () => request<Supplier[]>('/api/suppliers/'),
+  getSuppliers: () => requestAll<Supplier>('/api/suppliers/'),
+  searchSuppliers: (q: string, limit = 10) => request<Supplier[]>(`/api/suppliers/search?${searchQuery(q, limit)}`),
   createSupplier: (payload: Omit<Supplier, 'id' | 'created_at'>) =>
     request<Supplier>('/api/suppliers/', {
       method: 'POST',
@@ -111,7 +139,8 @@ export const api = {
     request<void>(`/api/suppliers/${supplierId}`, {
       method: 'DELETE',
     }),
-  getRetailers: () => request<Retailer[]>('/api/retailers/'),
+  getRetailers: () => requestAll<Retailer>('/api/retailers/'),
+  searchRetailers: (q: string, limit = 10) => request<Retailer[]>(`/api/retailers/search?${searchQuery(q, limit)}`),
   createRetailer: (payload: Omit<Retailer, 'id' | 'created_at'>) =>
     request<Retailer>('/api/retailers/', {
       method: 'POST',
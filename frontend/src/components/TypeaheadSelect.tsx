@@ -0,0 +1,92 @@
+import { useEffect, useState } from 'react'
+
+const SEARCH_DELAY_MS = 200
+
+interface Option {
+  id: number
+  name: string
+}
+
+interface TypeaheadSelectProps<T extends Option> {
+  id: string
+  value: string
+  onChange: (value: string) => void
+  options: T[]
+  search: (q: string) => Promise<T[]>
+  placeholder: string
+  searchLabel: string
+  required?: boolean
+  children?: React.ReactNode
+}
+
+// A roster <select> with a search box in front: typing narrows the options to the API's ranked matches,
+// so long rosters stay usable without scrolling through every entry.
+export const TypeaheadSelect = <T extends Option>({
+  id,
+  value,
+  onChange,
+  options,
+  search,
+  placeholder,
+  searchLabel,
+  required,
+  children,
+}: TypeaheadSelectProps<T>) => {
+  const [query, setQuery] = useState('')
+  const [matches, setMatches] = useState<T[]>([])
+  const trimmed = query.trim()
+
+  useEffect(() => {
+    if (!trimmed) {
+      return
+    }
+    let cancelled = false
+    const timer = setTimeout(() => {
+      search(trimmed)
+        .then((results) => {
+          if (!cancelled) {
+            setMatches(results)
+          }
+        })
+        .catch(() => {
+          if (!cancelled) {
+            setMatches([])
+          }
+        })
+    }, SEARCH_DELAY_MS)
+    return () => {
+      cancelled = true
+      clearTimeout(timer)
+    }
+  }, [trimmed, search])
+
+  const shown = trimmed ? matches : options
+  // Keep the current choice selectable while the search results leave it out.
+  const selected =
+    value && !shown.some((option) => String(option.id) === value)
+      ? options.find((option) => String(option.id) === value)
+      : undefined
+
+  return (
+    <>
+      <input
+        id={`${id}-search`}
+        type="search"
+        aria-label={searchLabel}
+        placeholder="Type to search…"
+        value={query}
+        onChange={(event) => setQuery(event.target.value)}
+      />
+      <select id={id} value={value} onChange={(event) => onChange(event.target.value)} required={required}>
+        <option value="">{placeholder}</option>
+        {selected && <option value={selected.id}>{selected.name}</option>}
+        {shown.map((option) => (
+          <option key={option.id} value={option.id}>
+            {option.name}
+          </option>
+        ))}
+        {children}
+      </select>
+    </>
+  )
+}
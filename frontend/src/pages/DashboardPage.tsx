@@ -152,7 +152,7 @@ export const DashboardPage = () => {
                 <div>
                   <strong>{item.product_name}</strong>
                 </div>
-                <span>{item.sold_last_30_days} sold (30d)</span>
+                <span>{item.sold_in_window} sold (30d)</span>
               </li>
             ))}
             {!slowMoving.length && <li className="empty">Need more data to highlight trends.</li>}
@@ -1,5 +1,6 @@
 import { useMemo, useState } from 'react'
 import { api } from '../api'
+import { TypeaheadSelect } from '../components/TypeaheadSelect'
 import { useInventory } from '../context/InventoryContext'
 import type { PurchaseForm, SupplierForm } from '../types'
 import { formatCurrency, formatDate, formatUnitSize, formatWeightFromGrams } from '../utils/format'
@@ -198,19 +199,16 @@ export const PurchasesPage = () => {
 
           <div className="field">
             <label htmlFor="purchase-product">Product *</label>
-            <select
+            <TypeaheadSelect
               id="purchase-product"
               value={form.product_id}
-              onChange={(event) => setForm({ ...form, product_id: event.target.value })}
+              onChange={(value) => setForm({ ...form, product_id: value })}
+              options={products}
+              search={api.searchProducts}
+              placeholder="Select product"
+              searchLabel="Search products"
               required
-            >
-              <option value="">Select product</option>
-              {products.map((product) => (
-                <option key={product.id} value={product.id}>
-                  {product.name}
-                </option>
-              ))}
-            </select>
+            />
             <p className="hint">Missing? Head to Products first.</p>
           </div>
 
@@ -314,20 +312,18 @@ export const PurchasesPage = () => {
 
           <div className="field">
             <label htmlFor="purchase-supplier-select">Supplier roster</label>
-            <select
+            <TypeaheadSelect
               id="purchase-supplier-select"
               value={form.supplier_id}
-              onChange={(event) => handleSupplierSelect(event.target.value)}
+              onChange={handleSupplierSelect}
+              options={suppliers}
+              search={api.searchSuppliers}
+              placeholder="Select supplier"
+              searchLabel="Search suppliers"
               required
             >
-              <option value="">Select supplier</option>
               <option value={SUPPLIER_OTHER_OPTION}>Other / new supplier</option>
-              {suppliers.map((supplier) => (
-                <option key={supplier.id} value={supplier.id}>
-                  {supplier.name}
-                </option>
-              ))}
-            </select>
+            </TypeaheadSelect>
             <p className="hint">Selecting a supplier keeps batch history tied to their profile.</p>
           </div>
 
@@ -95,7 +95,7 @@ export const ReportsPage = () => {
                   <div>
                     <strong>{item.product_name}</strong>
                   </div>
-                  <span>{item.sold_last_30_days} sold</span>
+                  <span>{item.sold_in_window} sold</span>
                 </li>
               ))
             ) : (
@@ -1,5 +1,6 @@
 import { useEffect, useMemo, useState } from 'react'
 import { api } from '../api'
+import { TypeaheadSelect } from '../components/TypeaheadSelect'
 import { useInventory } from '../context/InventoryContext'
 import type { RetailerForm, SaleForm } from '../types'
 import { formatCurrency, formatDate, formatUnitSize, formatWeightFromGrams } from '../utils/format'
@@ -244,19 +245,16 @@ export const SalesPage = () => {
 
           <div className="field">
             <label htmlFor="sale-product">Product *</label>
-            <select
+            <TypeaheadSelect
               id="sale-product"
               value={form.product_id}
-              onChange={(event) => setForm({ ...form, product_id: event.target.value })}
+              onChange={(value) => setForm({ ...form, product_id: value })}
+              options={products}
+              search={api.searchProducts}
+              placeholder="Select product"
+              searchLabel="Search products"
               required
-            >
-              <option value="">Select product</option>
-              {products.map((product) => (
-                <option key={product.id} value={product.id}>
-                  {product.name}
-                </option>
-              ))}
-            </select>
+            />
           </div>
 
           <div className="field-group">
@@ -299,20 +297,18 @@ export const SalesPage = () => {
 
           <div className="field">
             <label htmlFor="sale-retailer">Retailer roster *</label>
-            <select
+            <TypeaheadSelect
               id="sale-retailer"
               value={form.retailer_id}
-              onChange={(event) => handleRetailerSelect(event.target.value)}
+              onChange={handleRetailerSelect}
+              options={retailers}
+              search={api.searchRetailers}
+              placeholder="Select retailer"
+              searchLabel="Search retailers"
               required
             >
-              <option value="">Select retailer</option>
-              {retailers.map((retailer) => (
-                <option key={retailer.id} value={retailer.id}>
-                  {retailer.name}
-                </option>
-              ))}
               <option value={RETAILER_OTHER_OPTION}>Other / walk-in</option>
-            </select>
+            </TypeaheadSelect>
             <p className="hint">Keep sales history tied back to each retailer.</p>
           </div>
 
@@ -110,7 +110,7 @@ export interface TopProduct {
 export interface SlowProduct {
   product_id: number
   product_name: string
-  sold_last_30_days: number
+  sold_in_window: number
 }
 
 export interface ProfitLine {
@@ -1,10 +1,15 @@
-from collections.abc import Generator
+from collections.abc import Callable, Generator
+import atexit
 import os
+import shutil
 import sys
+import tempfile
 
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from httpx import Response
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
@@ -12,20 +17,33 @@ ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if ROOT_DIR not in sys.path:
     sys.path.insert(0, ROOT_DIR)
 
-from app.database import Base, get_db
+# The app builds its global engine from settings at import time; keep it (and the
+# startup schema check) on a throwaway file instead of the working copy's inventory.db.
+_TEMP_DIR = tempfile.mkdtemp(prefix="sweetstock-tests-")
+atexit.register(shutil.rmtree, _TEMP_DIR, ignore_errors=True)
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_TEMP_DIR, 'app.db')}"
+os.environ["AUTO_MIGRATE"] = "true"
+
+from app.database import Base, get_db, get_read_db
 from app.main import create_app
 
 
 @pytest.fixture()
-def client() -> Generator[TestClient, None, None]:
+def db_engine() -> Generator[Engine, None, None]:
     engine = create_engine(
         "sqlite://",
         connect_args={"check_same_thread": False},
         poolclass=StaticPool,
         future=True,
     )
-    TestingSessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
     Base.metadata.create_all(bind=engine)
+    yield engine
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture()
+def client(db_engine: Engine) -> Generator[TestClient, None, None]:
+    TestingSessionLocal = sessionmaker(bind=db_engine, autoflush=False, autocommit=False, future=True)
 
     app = create_app()
 
@@ -37,8 +55,36 @@ def client() -> Generator[TestClient, None, None]:
             db.close()
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
 
     with TestClient(app) as test_client:
         yield test_client
 
-    Base.metadata.drop_all(bind=engine)
+
+@pytest.fixture()
+def query_budget(client: TestClient, db_engine: Engine) -> Generator[Callable[..., Response], None, None]:
+    """``query_budget(budget, method, url, **kwargs)`` makes a request through ``client`` and fails
+    if it ran more than ``budget`` SQL statements; the response is returned for further checks."""
+    statements: list[str] = []
+    capturing = False
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if capturing:
+            statements.append(statement)
+
+    def request(budget: int, method: str, url: str, **kwargs) -> Response:
+        nonlocal capturing
+        statements.clear()
+        capturing = True
+        try:
+            response = client.request(method, url, **kwargs)
+        finally:
+            capturing = False
+        listing = "\n".join(f"{n}. {statement}" for n, statement in enumerate(statements, start=1))
+        summary = f"{method} {url} ran {len(statements)} statements (budget {budget})"
+        assert len(statements) <= budget, f"{summary}:\n{listing}"
+        return response
+
+    event.listen(db_engine, "before_cursor_execute", record)
+    yield request
+    event.remove(db_engine, "before_cursor_execute", record)
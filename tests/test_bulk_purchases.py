@@ -0,0 +1,118 @@
+from datetime import date, timedelta
+
+from fastapi.testclient import TestClient
+
+from app.services import purchase_service
+
+EXPIRY = (date.today() + timedelta(days=30)).isoformat()
+
+
+def create_product(client: TestClient, name: str) -> int:
+    response = client.post("/api/products/", json={"name": name})
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def line(product_id: int, code: str, qty: int = 10, **extra) -> dict:
+    return {
+        "product_id": product_id,
+        "batch_code": code,
+        "quantity": qty,
+        "unit_cost": "50",
+        "expiry_date": EXPIRY,
+        **extra,
+    }
+
+
+def test_bulk_purchase_inserts_every_batch_and_updates_stock(client: TestClient):
+    barfi_id = create_product(client, "Kaju Barfi")
+    peda_id = create_product(client, "Kesar Peda")
+    supplier_id = client.post("/api/suppliers/", json={"name": "Amul Dairy"}).json()["id"]
+
+    response = client.post(
+        "/api/purchases/bulk",
+        json=[line(barfi_id, "KB-1", 10, supplier_id=supplier_id), line(barfi_id, "KB-2", 5), line(peda_id, "KP-1", 7)],
+    )
+    assert response.status_code == 201
+    result = response.json()
+    assert result["dry_run"] is False
+    assert (result["batches"], result["units"]) == (3, 22)
+    assert len(result["batch_ids"]) == 3
+
+    batches = {batch["batch_code"]: batch for batch in client.get("/api/purchases/").json()}
+    assert batches["KB-1"]["supplier_name"] == "Amul Dairy"
+    assert batches["KB-2"]["quantity_remaining"] == 5
+    overview = client.get("/api/stock/").json()
+    assert overview["total_units"] == 22
+
+    sale = client.post("/api/sales/", json={"product_id": barfi_id, "quantity": 12, "selling_price": "80"})
+    assert sale.status_code == 201
+
+
+def test_csv_goods_receipt_note_with_dry_run(client: TestClient):
+    product_id = create_product(client, "Soan Papdi")
+    note = (
+        "product_id,batch_code,quantity,unit_cost,expiry_date,supplier_name\n"
+        f"{product_id},SP-1,12,40.00,{EXPIRY},Haldiram\n"
+        f"{product_id},SP-2,8,42.50,{EXPIRY},\n"
+    )
+    headers = {"Content-Type": "text/csv"}
+
+    preview = client.post("/api/purchases/bulk", params={"dry_run": "true"}, content=note, headers=headers)
+    assert preview.status_code == 200
+    assert preview.json() == {"dry_run": True, "batches": 2, "units": 20, "batch_ids": []}
+    assert client.get("/api/purchases/").json() == []
+
+    saved = client.post("/api/purchases/bulk", content=note, headers=headers)
+    assert saved.status_code == 201
+    batches = {batch["batch_code"]: batch for batch in client.get("/api/purchases/").json()}
+    assert batches["SP-1"]["supplier_name"] == "Haldiram"
+    assert batches["SP-2"]["supplier_name"] is None
+    assert batches["SP-2"]["unit_cost"] == "42.50"
+
+
+def test_bulk_purchase_reports_every_bad_line_and_saves_nothing(client: TestClient):
+    product_id = create_product(client, "Rasgulla")
+    client.post("/api/purchases/", json=line(product_id, "R-1"))
+
+    response = client.post(
+        "/api/purchases/bulk",
+        json=[
+            line(product_id, "R-2"),
+            line(product_id, "R-1"),
+            line(999, "X-1"),
+            line(product_id, "R-2"),
+            line(product_id, "R-3", supplier_id=42),
+        ],
+    )
+    assert response.status_code == 400
+    assert [(error["line"], error["status_code"]) for error in response.json()["detail"]] == [
+        (2, 409),
+        (3, 404),
+        (4, 409),
+        (5, 404),
+    ]
+    assert [batch["batch_code"] for batch in client.get("/api/purchases/").json()] == ["R-1"]
+
+    bad_csv = "product_id,batch_code,quantity,unit_cost,expiry_date\n" f"{product_id},R-9,-1,10,{EXPIRY}\n"
+    invalid = client.post("/api/purchases/bulk", content=bad_csv, headers={"Content-Type": "text/csv"})
+    assert invalid.status_code == 422
+    assert invalid.json()["detail"][0]["line"] == 2
+
+
+def test_batch_committed_after_the_checks_gets_the_same_line_error(client: TestClient, monkeypatch):
+    product_id = create_product(client, "Cham Cham")
+    existing = purchase_service._existing_batch_keys
+
+    def racing_check(db, keys):
+        # A concurrent goods receipt commits C-1 right after this request looked for it.
+        if not existing(db, keys):
+            assert client.post("/api/purchases/", json=line(product_id, "C-1")).status_code == 201
+            return set()
+        return existing(db, keys)
+
+    monkeypatch.setattr(purchase_service, "_existing_batch_keys", racing_check)
+    response = client.post("/api/purchases/bulk", json=[line(product_id, "C-2"), line(product_id, "C-1")])
+    assert response.status_code == 400
+    assert response.json()["detail"] == [{"line": 2, "status_code": 409, "detail": "Batch already exists for product"}]
+    assert [batch["batch_code"] for batch in client.get("/api/purchases/").json()] == ["C-1"]
@@ -0,0 +1,106 @@
+import json
+from datetime import date, timedelta
+
+from fastapi.testclient import TestClient
+
+from app.utils.bulk_input import MAX_BULK_LINES
+
+
+def create_product(client: TestClient, name: str) -> int:
+    response = client.post("/api/products/", json={"name": name})
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def add_batch(client: TestClient, product_id: int, batch_code: str, qty: int, expiry_days: int, cost: str):
+    payload = {
+        "product_id": product_id,
+        "batch_code": batch_code,
+        "quantity": qty,
+        "unit_cost": cost,
+        "expiry_date": (date.today() + timedelta(days=expiry_days)).isoformat(),
+    }
+    response = client.post("/api/purchases/", json=payload)
+    assert response.status_code == 201
+
+
+def line(product_id: int, qty: int, **extra) -> dict:
+    return {"product_id": product_id, "quantity": qty, "selling_price": "200", **extra}
+
+
+def remaining_by_batch(client: TestClient) -> dict[str, int]:
+    batches = client.get("/api/stock/").json()["batches"]
+    return {batch["batch_code"]: batch["quantity_remaining"] for batch in batches}
+
+
+def test_bulk_sale_allocates_lines_in_order(client: TestClient):
+    laddoo_id = create_product(client, "Motichur Laddoo")
+    peda_id = create_product(client, "Kesar Peda")
+    add_batch(client, laddoo_id, "L-1", 30, 10, "100")
+    add_batch(client, laddoo_id, "L-2", 50, 40, "90")
+    add_batch(client, peda_id, "P-1", 20, 15, "150")
+
+    lines = [
+        line(laddoo_id, 20, invoice_number="BULK-1"),
+        line(peda_id, 5),
+        line(laddoo_id, 25, invoice_number="BULK-2"),
+    ]
+    response = client.post("/api/sales/bulk", json=lines)
+    assert response.status_code == 201
+    sales = response.json()
+    assert [sale["invoice_number"] for sale in sales] == ["BULK-1", None, "BULK-2"]
+    # The third line drains what the first one left of L-1 before touching L-2.
+    assert [allocation["quantity"] for allocation in sales[2]["allocations"]] == [10, 15]
+    assert remaining_by_batch(client) == {"L-1": 0, "L-2": 35, "P-1": 15}
+
+
+def test_bulk_sale_accepts_ndjson_stream(client: TestClient):
+    product_id = create_product(client, "Rasgulla")
+    add_batch(client, product_id, "R-1", 10, 10, "80")
+
+    body = "\n".join(json.dumps(line(product_id, qty)) for qty in (3, 4)) + "\n"
+    response = client.post(
+        "/api/sales/bulk", content=body, headers={"Content-Type": "application/x-ndjson"}
+    )
+    assert response.status_code == 201
+    assert [sale["quantity"] for sale in response.json()] == [3, 4]
+    assert remaining_by_batch(client) == {"R-1": 3}
+
+
+def test_bulk_sale_rolls_back_whole_invoice_on_any_failure(client: TestClient):
+    product_id = create_product(client, "Soan Papdi")
+    add_batch(client, product_id, "S-1", 10, 10, "50")
+
+    lines = [
+        line(product_id, 6, invoice_number="DUP"),
+        line(9999, 1),
+        line(product_id, 6),
+        line(product_id, 1, invoice_number="DUP"),
+    ]
+    response = client.post("/api/sales/bulk", json=lines)
+    assert response.status_code == 400
+    errors = {error["line"]: error for error in response.json()["detail"]}
+    assert sorted(errors) == [2, 3, 4]
+    assert errors[2]["status_code"] == 404
+    assert errors[3]["detail"] == "Insufficient stock for sale"
+    assert errors[4]["status_code"] == 409
+
+    assert remaining_by_batch(client) == {"S-1": 10}
+    assert client.get("/api/sales/").json() == []
+
+    invalid = client.post("/api/sales/bulk", json=[line(product_id, 1), {"product_id": product_id, "quantity": 0}])
+    assert invalid.status_code == 422
+    assert [error["line"] for error in invalid.json()["detail"]] == [2]
+
+
+def test_oversized_bulk_body_is_refused_before_validation(client: TestClient):
+    # Every line is invalid; the size limit must win over the per-line errors.
+    count = MAX_BULK_LINES + 1
+    bodies = {
+        "application/x-ndjson": "{}\n" * count,
+        "text/csv": "product_id\n" + "x\n" * count,
+        "application/json": json.dumps([{}] * count),
+    }
+    for media_type, body in bodies.items():
+        response = client.post("/api/sales/bulk", content=body, headers={"Content-Type": media_type})
+        assert response.status_code == 413, media_type
@@ -0,0 +1,122 @@
+import multiprocessing
+import threading
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models.entities import InventoryBatch, Product, SaleAllocation
+from app.schemas.sale import SaleCreate
+from app.services import sales_service
+
+BATCHES = 5
+UNITS_PER_BATCH = 40
+UNITS_PER_SALE = 3
+
+
+def _make_engine(url: str):
+    return create_engine(url, connect_args={"check_same_thread": False, "timeout": 30})
+
+
+def _seed(url: str) -> int:
+    engine = _make_engine(url)
+    Base.metadata.create_all(bind=engine)
+    with sessionmaker(bind=engine)() as db:
+        product = Product(name="Hot SKU")
+        db.add(product)
+        db.flush()
+        for index in range(BATCHES):
+            db.add(
+                InventoryBatch(
+                    product_id=product.id,
+                    batch_code=f"HOT-{index}",
+                    quantity_initial=UNITS_PER_BATCH,
+                    quantity_remaining=UNITS_PER_BATCH,
+                    unit_cost=Decimal("10"),
+                    expiry_date=date.today() + timedelta(days=10 + index),
+                )
+            )
+        db.commit()
+        product_id = product.id
+    engine.dispose()
+    return product_id
+
+
+def _sell_until_empty(url: str, product_id: int, engine=None) -> int:
+    """Keep selling until the stock check refuses; returns units sold by this worker."""
+    own_engine = engine is None
+    engine = engine or _make_engine(url)
+    session_factory = sessionmaker(bind=engine, autoflush=False)
+    sold = 0
+    payload = SaleCreate(product_id=product_id, quantity=UNITS_PER_SALE, selling_price="20")
+    while True:
+        with session_factory() as db:
+            try:
+                sale = sales_service.create_sale(db, payload)
+            except HTTPException as exc:
+                if exc.status_code == 409:
+                    continue
+                assert exc.status_code == 400
+                break
+            sold += sum(allocation.quantity for allocation in sale.allocations)
+    if own_engine:
+        engine.dispose()
+    return sold
+
+
+def _assert_no_oversell(url: str, sold: int) -> None:
+    engine = _make_engine(url)
+    with sessionmaker(bind=engine)() as db:
+        batches = db.query(InventoryBatch).all()
+        allocated = dict(
+            db.query(SaleAllocation.batch_id, func.sum(SaleAllocation.quantity)).group_by(SaleAllocation.batch_id)
+        )
+    engine.dispose()
+
+    total = BATCHES * UNITS_PER_BATCH
+    assert all(batch.quantity_remaining >= 0 for batch in batches)
+    for batch in batches:
+        assert allocated.get(batch.id, 0) == batch.quantity_initial - batch.quantity_remaining
+    remaining = sum(batch.quantity_remaining for batch in batches)
+    assert sold == total - remaining
+    assert remaining < UNITS_PER_SALE
+
+
+@pytest.fixture()
+def database_url(tmp_path) -> str:
+    return f"sqlite:///{tmp_path / 'concurrency.db'}"
+
+
+def test_threads_never_oversell_a_batch(database_url: str):
+    product_id = _seed(database_url)
+    engine = _make_engine(database_url)
+    results: list[int] = []
+    lock = threading.Lock()
+
+    def worker():
+        sold = _sell_until_empty(database_url, product_id, engine)
+        with lock:
+            results.append(sold)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+
+    assert len(results) == 8
+    _assert_no_oversell(database_url, sum(results))
+
+
+def test_processes_never_oversell_a_batch(database_url: str):
+    product_id = _seed(database_url)
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(4) as pool:
+        results = pool.starmap(_sell_until_empty, [(database_url, product_id)] * 4)
+
+    _assert_no_oversell(database_url, sum(results))
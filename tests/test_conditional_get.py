@@ -0,0 +1,62 @@
+from datetime import date, timedelta
+
+from fastapi.testclient import TestClient
+
+from app.config import get_settings
+from app.services import stock_service
+
+
+def add_batch(client: TestClient, product_id: int, code: str) -> None:
+    response = client.post(
+        "/api/purchases/",
+        json={
+            "product_id": product_id,
+            "batch_code": code,
+            "quantity": 8,
+            "unit_cost": "90.00",
+            "expiry_date": (date.today() + timedelta(days=20)).isoformat(),
+        },
+    )
+    assert response.status_code == 201
+
+
+def test_unchanged_stock_answers_304_without_querying(client: TestClient, monkeypatch):
+    product_id = client.post("/api/products/", json={"name": "Mysore Pak"}).json()["id"]
+    add_batch(client, product_id, "MP-1")
+
+    first = client.get("/api/stock/")
+    etag = first.headers["ETag"]
+    assert first.headers["Cache-Control"] == "no-cache"
+
+    def not_expected(db):
+        raise AssertionError("stock overview was queried for a 304")
+
+    monkeypatch.setattr(stock_service, "get_stock_overview", not_expected)
+    not_modified = client.get("/api/stock/", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["ETag"] == etag
+    monkeypatch.undo()
+
+    add_batch(client, product_id, "MP-2")
+    changed = client.get("/api/stock/", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert changed.json()["total_units"] == 16
+
+
+def test_etags_follow_the_tables_each_route_reads(client: TestClient, monkeypatch):
+    product_id = client.post("/api/products/", json={"name": "Cham Cham"}).json()["id"]
+    add_batch(client, product_id, "CC-1")
+    urls = ("/api/products/", "/api/suppliers/", "/api/sales/", "/api/reports/top-selling")
+    tags = {url: client.get(url).headers["ETag"] for url in urls}
+
+    client.post("/api/sales/", json={"product_id": product_id, "quantity": 1, "selling_price": "120"})
+    for url in urls:
+        status = client.get(url, headers={"If-None-Match": tags[url]}).status_code
+        assert status == (200 if url in ("/api/sales/", "/api/reports/top-selling") else 304), url
+
+    monkeypatch.setattr(get_settings(), "fast_json_enabled", True)
+    fast = client.get("/api/sales/", params={"limit": 1})
+    assert fast.headers["ETag"]
+    assert client.get("/api/sales/", headers={"If-None-Match": f'"x", {fast.headers["ETag"]}'}).status_code == 304
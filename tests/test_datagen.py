@@ -0,0 +1,67 @@
+from datetime import date
+
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.models.entities import InventoryBatch, Sale
+from app.services import stock_totals
+from benchmarks.datagen import Scale, generate
+
+SCALE = Scale(products=12, batches=80, sales=900, suppliers=3, retailers=6, days=60)
+END = date(2025, 3, 31)
+
+
+def generated_engine(seed: int):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    counts = generate(engine, SCALE, seed=seed, end=END)
+    return engine, counts
+
+
+def snapshot(engine) -> tuple[list, list]:
+    with Session(engine) as db:
+        batches = db.execute(
+            select(InventoryBatch.batch_code, InventoryBatch.quantity_remaining, InventoryBatch.expiry_date)
+        ).all()
+        sales = db.execute(select(Sale.product_id, Sale.retailer_id, Sale.quantity, Sale.sale_date)).all()
+    return batches, sales
+
+
+def test_generator_is_deterministic_and_consistent():
+    engine, counts = generated_engine(seed=7)
+    again, _ = generated_engine(seed=7)
+    other, _ = generated_engine(seed=8)
+    assert snapshot(engine) == snapshot(again)
+    assert snapshot(engine) != snapshot(other)
+
+    assert counts["batches"] == SCALE.batches
+    assert counts["sales"] + counts["stockouts"] == SCALE.sales
+    assert (counts["first_day"], counts["last_day"]) == ("2025-01-31", "2025-03-31")
+
+    with Session(engine) as db:
+        assert stock_totals.verify(db) == []
+        # Every unit that left a batch belongs to a sale, and every sale is fully allocated.
+        assert not db.execute(
+            text(
+                "SELECT id FROM inventory_batches b WHERE quantity_initial - quantity_remaining != "
+                "(SELECT coalesce(sum(quantity), 0) FROM sale_allocations a WHERE a.batch_id = b.id)"
+            )
+        ).all()
+        assert not db.execute(
+            text(
+                "SELECT id FROM sales s WHERE quantity != "
+                "(SELECT sum(quantity) FROM sale_allocations a WHERE a.sale_id = s.id)"
+            )
+        ).all()
+        # No allocation drew on a batch that was not yet delivered or already expired.
+        assert not db.execute(
+            text(
+                "SELECT a.id FROM sale_allocations a JOIN sales s ON s.id = a.sale_id "
+                "JOIN inventory_batches b ON b.id = a.batch_id "
+                "WHERE date(s.sale_date) < date(b.purchased_at) OR date(s.sale_date) > b.expiry_date"
+            )
+        ).all()
+    for each in (engine, again, other):
+        each.dispose()
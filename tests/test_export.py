@@ -0,0 +1,72 @@
+import csv
+import io
+import json
+from datetime import date, timedelta
+
+from fastapi.testclient import TestClient
+
+from app.database import get_read_db
+from app.services import purchase_service
+from app.utils import export
+
+
+def seed(client: TestClient) -> int:
+    product_id = client.post("/api/products/", json={"name": "Kaju Katli"}).json()["id"]
+    for code, cost, days in (("K1", "100.00", 5), ("K2", "120.00", 9)):
+        client.post(
+            "/api/purchases/",
+            json={
+                "product_id": product_id,
+                "batch_code": code,
+                "quantity": 5,
+                "unit_cost": cost,
+                "expiry_date": (date.today() + timedelta(days=days)).isoformat(),
+            },
+        )
+    # Spans both batches: two allocation rows for one sale.
+    client.post(
+        "/api/sales/",
+        json={"product_id": product_id, "quantity": 7, "selling_price": "180.00", "invoice_number": "INV-1"},
+    )
+    return product_id
+
+
+def test_sales_ledger_csv_has_one_row_per_allocation(client: TestClient):
+    seed(client)
+    response = client.get("/api/sales/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert 'filename="sales-ledger.csv"' in response.headers["content-disposition"]
+
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [(row["batch_code"], row["allocated_quantity"], row["cogs"]) for row in rows] == [
+        ("K1", "5", "500.00"),
+        ("K2", "2", "240.00"),
+    ]
+    assert {row["invoice_number"] for row in rows} == {"INV-1"}
+    assert rows[0]["product_name"] == "Kaju Katli"
+    assert rows[0]["retailer_id"] == ""
+
+
+def test_exports_stream_ndjson_and_filter_by_day(client: TestClient, monkeypatch):
+    seed(client)
+    response = client.get("/api/purchases/export", params={"format": "ndjson"})
+    assert response.headers["content-type"] == "application/x-ndjson"
+    batches = [json.loads(line) for line in response.text.splitlines()]
+    assert [batch["batch_code"] for batch in batches] == ["K1", "K2"]
+    assert batches[1]["unit_cost"] == "120.00"
+
+    # The body is produced one yield_per partition at a time.
+    monkeypatch.setattr(export, "EXPORT_CHUNK", 1)
+    db = next(client.app.dependency_overrides[get_read_db]())
+    chunks = list(export.stream_rows(db, purchase_service.batches_export_statement(), "ndjson"))
+    db.close()
+    assert b"".join(chunks) == response.content
+    assert len(chunks) == 2
+
+    today, tomorrow = date.today().isoformat(), (date.today() + timedelta(days=1)).isoformat()
+    assert len(client.get("/api/sales/export", params={"date_from": today, "date_to": today}).text.splitlines()) == 3
+    empty = client.get("/api/sales/export", params={"date_from": tomorrow})
+    assert empty.text.splitlines()[0].startswith("sale_id,sale_date,")
+    assert len(empty.text.splitlines()) == 1
+    assert client.get("/api/purchases/export", params={"format": "xml"}).status_code == 422
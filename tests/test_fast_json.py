@@ -0,0 +1,59 @@
+from datetime import date, timedelta
+
+from fastapi.testclient import TestClient
+
+from app.config import get_settings
+from app.utils.pagination import NEXT_CURSOR_HEADER
+
+
+def seed(client: TestClient) -> None:
+    supplier_id = client.post("/api/suppliers/", json={"name": "Bikaner Sweets Co"}).json()["id"]
+    retailer_id = client.post("/api/retailers/", json={"name": "Agarwal Mart", "channel": "Retail"}).json()["id"]
+    for name in ("Soan Papdi", "Gulab Jamun"):
+        product_id = client.post("/api/products/", json={"name": name}).json()["id"]
+        for code, days, supplier in (("S1", 4, supplier_id), ("S2", 9, None)):
+            client.post(
+                "/api/purchases/",
+                json={
+                    "product_id": product_id,
+                    "batch_code": code,
+                    "quantity": 12,
+                    "unit_cost": "41.50",
+                    "unit_size_value": "0.5",
+                    "unit_size_unit": "kg",
+                    "expiry_date": (date.today() + timedelta(days=days)).isoformat(),
+                    "supplier_id": supplier,
+                    "supplier_name": "Walk-in vendor" if supplier is None else None,
+                },
+            )
+        client.post(
+            "/api/sales/",
+            json={"product_id": product_id, "quantity": 15, "selling_price": "60.25", "retailer_id": retailer_id},
+        )
+        client.post("/api/sales/", json={"product_id": product_id, "quantity": 2, "selling_price": "61"})
+
+
+def fetch(client: TestClient, monkeypatch, fast: bool, url: str, **params):
+    monkeypatch.setattr(get_settings(), "fast_json_enabled", fast)
+    response = client.get(url, params=params)
+    assert response.status_code == 200
+    return response
+
+
+def test_fast_path_matches_model_path(client: TestClient, monkeypatch):
+    seed(client)
+    for url in ("/api/stock/", "/api/sales/"):
+        slow = fetch(client, monkeypatch, False, url)
+        fast = fetch(client, monkeypatch, True, url)
+        assert fast.content == slow.content
+        assert fast.headers["content-type"] == "application/json"
+
+    sales = fetch(client, monkeypatch, True, "/api/sales/").json()
+    assert any(sale["retailer"] and len(sale["allocations"]) == 2 for sale in sales)
+
+    slow_page = fetch(client, monkeypatch, False, "/api/sales/", limit=3)
+    fast_page = fetch(client, monkeypatch, True, "/api/sales/", limit=3)
+    assert fast_page.content == slow_page.content
+    assert fast_page.headers[NEXT_CURSOR_HEADER] == slow_page.headers[NEXT_CURSOR_HEADER]
+    rest = fetch(client, monkeypatch, True, "/api/sales/", limit=3, cursor=fast_page.headers[NEXT_CURSOR_HEADER])
+    assert [sale["id"] for sale in fast_page.json() + rest.json()] == [sale["id"] for sale in sales]
@@ -0,0 +1,160 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert, update
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.config import get_settings
+from app.database import Base
+from app.models.entities import InventoryBatch, Product
+from app.schemas.sale import SaleCreate
+from app.services import fifo_index, sales_service
+
+
+@pytest.fixture()
+def fifo_index_enabled(monkeypatch):
+    monkeypatch.setattr(get_settings(), "fifo_index_enabled", True)
+
+
+@pytest.fixture()
+def session(fifo_index_enabled):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine, autoflush=False)()
+    yield db
+    db.close()
+    engine.dispose()
+
+
+def add_batch(client: TestClient, product_id: int, batch_code: str, qty: int, expiry_days: int):
+    payload = {
+        "product_id": product_id,
+        "batch_code": batch_code,
+        "quantity": qty,
+        "unit_cost": "100",
+        "expiry_date": (date.today() + timedelta(days=expiry_days)).isoformat(),
+    }
+    assert client.post("/api/purchases/", json=payload).status_code == 201
+
+
+def sell(client: TestClient, product_id: int, qty: int) -> list[dict]:
+    response = client.post("/api/sales/", json={"product_id": product_id, "quantity": qty, "selling_price": "150"})
+    assert response.status_code == 201
+    return response.json()["allocations"]
+
+
+def test_indexed_sales_follow_fifo_and_see_new_purchases(client: TestClient, fifo_index_enabled):
+    product_id = client.post("/api/products/", json={"name": "Kaju Katli"}).json()["id"]
+    add_batch(client, product_id, "K-30", 10, 30)
+    add_batch(client, product_id, "K-60", 10, 60)
+
+    assert [a["quantity"] for a in sell(client, product_id, 12)] == [10, 2]
+
+    # A purchase committed after the index was built must slot in ahead by expiry.
+    add_batch(client, product_id, "K-05", 5, 5)
+    first = sell(client, product_id, 6)
+    assert [a["quantity"] for a in first] == [5, 1]
+
+    short = client.post("/api/sales/", json={"product_id": product_id, "quantity": 99, "selling_price": "150"})
+    assert short.status_code == 400
+
+    stock = {b["batch_code"]: b["quantity_remaining"] for b in client.get("/api/stock/").json()["batches"]}
+    assert stock == {"K-30": 0, "K-60": 7, "K-05": 0}
+
+
+def test_index_ignores_rollbacks_and_rebuilds_when_stale(session):
+    product = Product(name="Rasmalai")
+    session.add(product)
+    session.flush()
+    for code, days in (("R-1", 10), ("R-2", 20), ("R-3", 30)):
+        session.add(
+            InventoryBatch(
+                product_id=product.id,
+                batch_code=code,
+                quantity_initial=10,
+                quantity_remaining=10,
+                unit_cost=Decimal("50"),
+                expiry_date=date.today() + timedelta(days=days),
+            )
+        )
+    session.commit()
+
+    index = fifo_index.get_fifo_index(session)
+    assert [b.batch_code for b in index.batches_for(session, product.id, 15)] == ["R-1", "R-2"]
+    assert index.size(product.id) == 3
+
+    batch = session.query(InventoryBatch).filter_by(batch_code="R-1").one()
+    batch.quantity_remaining = 0
+    session.flush()
+    session.rollback()
+    assert [b.batch_code for b in index.batches_for(session, product.id, 5)] == ["R-1"]
+
+    sale = sales_service.create_sale(session, SaleCreate(product_id=product.id, quantity=12, selling_price="80"))
+    assert [a.quantity for a in sale.allocations] == [10, 2]
+    assert index.size(product.id) == 2
+
+    # Another process drains R-2 behind the index's back; the mismatch forces a rebuild.
+    session.execute(update(InventoryBatch).where(InventoryBatch.batch_code == "R-2").values(quantity_remaining=0))
+    session.commit()
+    assert [b.batch_code for b in index.batches_for(session, product.id, 5)] == ["R-3"]
+    assert index.size(product.id) == 1
+
+
+def test_batches_added_by_other_processes_are_not_skipped(session):
+    product = Product(name="Kalakand")
+    session.add(product)
+    session.flush()
+    for code, days in (("L-1", 10), ("L-2", 20)):
+        session.add(
+            InventoryBatch(
+                product_id=product.id,
+                batch_code=code,
+                quantity_initial=10,
+                quantity_remaining=10,
+                unit_cost=Decimal("50"),
+                expiry_date=date.today() + timedelta(days=days),
+            )
+        )
+    session.commit()
+    index = fifo_index.get_fifo_index(session)
+    assert [b.batch_code for b in index.batches_for(session, product.id, 5)] == ["L-1"]
+
+    # A batch expiring sooner arrives through another worker, so the index never hears of it.
+    session.execute(
+        insert(InventoryBatch).values(
+            product_id=product.id,
+            batch_code="L-0",
+            quantity_initial=10,
+            quantity_remaining=10,
+            unit_cost=Decimal("50"),
+            expiry_date=date.today() + timedelta(days=5),
+        )
+    )
+    session.commit()
+    assert [b.batch_code for b in index.batches_for(session, product.id, 5)] == ["L-0"]
+    assert index.size(product.id) == 3
+
+
+def test_falls_back_to_the_database_when_the_index_stays_stale(session, monkeypatch):
+    product = Product(name="Soan Papdi")
+    session.add(product)
+    session.flush()
+    for code, days in (("S-1", 10), ("S-2", 20)):
+        session.add(
+            InventoryBatch(
+                product_id=product.id,
+                batch_code=code,
+                quantity_initial=10,
+                quantity_remaining=10,
+                unit_cost=Decimal("50"),
+                expiry_date=date.today() + timedelta(days=days),
+            )
+        )
+    session.commit()
+    index = fifo_index.get_fifo_index(session)
+    monkeypatch.setattr(index, "_plan", lambda db, product_id, quantity: ([999], 10, {999: 10}))
+
+    assert [b.batch_code for b in index.batches_for(session, product.id, 5)] == ["S-1", "S-2"]
@@ -0,0 +1,185 @@
+import gc
+import threading
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.config import get_settings
+from app.database import Base
+from app.models.entities import InventoryBatch, Product
+from app.schemas.sale import SaleCreate
+from app.services import group_commit, sales_service
+
+
+@pytest.fixture()
+def group_commit_enabled(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "sale_group_commit_enabled", True)
+    monkeypatch.setattr(settings, "sale_group_commit_window_ms", 50.0)
+
+
+def test_grouped_sale_through_api(client: TestClient, group_commit_enabled):
+    product_id = client.post("/api/products/", json={"name": "Gulab Jamun"}).json()["id"]
+    purchase = {
+        "product_id": product_id,
+        "batch_code": "GJ-1",
+        "quantity": 10,
+        "unit_cost": "40",
+        "expiry_date": (date.today() + timedelta(days=10)).isoformat(),
+    }
+    assert client.post("/api/purchases/", json=purchase).status_code == 201
+
+    sale = {"product_id": product_id, "quantity": 4, "selling_price": "60", "invoice_number": "GC-1"}
+    response = client.post("/api/sales/", json=sale)
+    assert response.status_code == 201
+    assert response.json()["allocations"][0]["quantity"] == 4
+
+    assert client.post("/api/sales/", json=sale).status_code == 409
+    assert client.post("/api/sales/", json={**sale, "invoice_number": None, "quantity": 7}).status_code == 400
+
+
+def test_concurrent_sales_share_commits(tmp_path, group_commit_enabled):
+    engine = create_engine(f"sqlite:///{tmp_path / 'group.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine, autoflush=False)
+    with session_factory() as db:
+        product = Product(name="Barfi")
+        db.add(product)
+        db.flush()
+        db.add(
+            InventoryBatch(
+                product_id=product.id,
+                batch_code="B-1",
+                quantity_initial=100,
+                quantity_remaining=100,
+                unit_cost=Decimal("30"),
+                expiry_date=date.today() + timedelta(days=30),
+            )
+        )
+        db.commit()
+        product_id = product.id
+
+    outcomes: list[int] = []
+    lock = threading.Lock()
+
+    def sell(quantity: int):
+        with session_factory() as db:
+            try:
+                sale = sales_service.create_sale(
+                    db, SaleCreate(product_id=product_id, quantity=quantity, selling_price="50")
+                )
+                result = sale.quantity
+            except HTTPException as exc:
+                result = -exc.status_code
+        with lock:
+            outcomes.append(result)
+
+    # 12 sales of 5 fit; the one asking for 500 must fail without sinking its group.
+    threads = [threading.Thread(target=sell, args=(5,)) for _ in range(12)]
+    threads.append(threading.Thread(target=sell, args=(500,)))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(outcomes) == [-400] + [5] * 12
+    with session_factory() as db:
+        assert db.query(InventoryBatch).one().quantity_remaining == 40
+
+    writer = group_commit.get_writer(session_factory(), "sales", sales_service._sale_writer)
+    assert writer.items_committed == 12
+    assert writer.groups_committed < 12
+    writer.close()
+    engine.dispose()
+
+
+def test_failed_group_commit_is_replayed_one_sale_at_a_time(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'replay.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as db:
+        db.add(Product(id=2, name="Taken"))
+        db.commit()
+
+    # Nothing is flushed until commit, so the duplicate id only surfaces when the group commits.
+    writer = group_commit.GroupCommitWriter(
+        engine, lambda db, product_id: db.add(Product(id=product_id, name=f"P{product_id}")), 3, 500.0
+    )
+    outcomes: dict[int, str] = {}
+
+    def submit(product_id: int):
+        try:
+            writer.submit(product_id)
+            outcomes[product_id] = "ok"
+        except IntegrityError:
+            outcomes[product_id] = "conflict"
+
+    threads = [threading.Thread(target=submit, args=(product_id,)) for product_id in (1, 2, 3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    writer.close()
+
+    assert outcomes == {1: "ok", 2: "conflict", 3: "ok"}
+    with Session(engine) as db:
+        assert {product.name for product in db.query(Product)} == {"P1", "Taken", "P3"}
+    engine.dispose()
+
+
+class Contended(Exception):
+    pass
+
+
+def test_dropping_a_payload_resets_the_retry_budget(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'retry.db'}", connect_args={"check_same_thread": False})
+    failures = {"always": float("inf"), "once": 1}
+
+    def work(db, name):
+        if failures[name] > 0:
+            failures[name] -= 1
+            raise Contended(name)
+        return name
+
+    writer = group_commit.GroupCommitWriter(engine, work, 2, 500.0, retry_on=(Contended,), max_attempts=2)
+    outcomes: dict[str, str] = {}
+
+    def submit(name: str):
+        try:
+            outcomes[name] = writer.submit(name)
+        except Contended:
+            outcomes[name] = "gave up"
+
+    first = threading.Thread(target=submit, args=("always",))
+    first.start()
+    # Queued behind "always" in the same group; it must still get its retry once "always" is dropped.
+    while writer._queue.qsize():
+        time.sleep(0.001)
+    second = threading.Thread(target=submit, args=("once",))
+    second.start()
+    first.join()
+    second.join()
+    writer.close()
+
+    assert outcomes == {"always": "gave up", "once": "once"}
+    assert writer.groups_committed == 1
+    engine.dispose()
+
+
+def test_writers_stop_with_their_engine():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False})
+    db = Session(engine)
+    writer = group_commit.get_writer(db, "probe", lambda e: group_commit.GroupCommitWriter(e, lambda *_: None, 1, 0))
+    db.close()
+    del db, engine
+    gc.collect()
+
+    writer._thread.join(timeout=5)
+    assert not writer._thread.is_alive()
+    assert not any("probe" in writers for writers in group_commit._writers.values())
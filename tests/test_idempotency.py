@@ -0,0 +1,178 @@
+import json
+import threading
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.config import get_settings
+from app.database import Base, get_db
+from app.models.entities import IdempotencyKey, InventoryBatch, Product
+from app.schemas.sale import SaleCreate
+from app.services import idempotency, sales_service
+
+
+def setup_stock(client: TestClient, quantity: int = 10) -> int:
+    product_id = client.post("/api/products/", json={"name": "Kaju Katli"}).json()["id"]
+    purchase = {
+        "product_id": product_id,
+        "batch_code": "KK-1",
+        "quantity": quantity,
+        "unit_cost": "40",
+        "expiry_date": (date.today() + timedelta(days=10)).isoformat(),
+    }
+    assert client.post("/api/purchases/", json=purchase).status_code == 201
+    return product_id
+
+
+def units_on_hand(client: TestClient) -> int:
+    return client.get("/api/stock/").json()["total_units"]
+
+
+@pytest.mark.parametrize("group_commit", [False, True])
+def test_retried_sale_is_recorded_once(client: TestClient, monkeypatch, group_commit):
+    monkeypatch.setattr(get_settings(), "sale_group_commit_enabled", group_commit)
+    product_id = setup_stock(client)
+    sale = {"product_id": product_id, "quantity": 4, "selling_price": "60"}
+    headers = {"Idempotency-Key": "sale-7f3a"}
+
+    first = client.post("/api/sales/", json=sale, headers=headers)
+    retry = client.post("/api/sales/", json=sale, headers=headers)
+    assert first.status_code == retry.status_code == 201
+    assert "Idempotent-Replayed" not in first.headers
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.json() == first.json()
+    assert units_on_hand(client) == 6
+    assert len(client.get("/api/sales/").json()) == 1
+
+    reused = client.post("/api/sales/", json={**sale, "quantity": 5}, headers=headers)
+    assert reused.status_code == 422
+    assert client.post("/api/sales/", json=sale, headers={"Idempotency-Key": "sale-other"}).status_code == 201
+    assert units_on_hand(client) == 2
+
+
+def test_retried_purchase_and_failed_request_are_not_stored(client: TestClient):
+    product_id = setup_stock(client)
+    purchase = {
+        "product_id": product_id,
+        "batch_code": "KK-2",
+        "quantity": 5,
+        "unit_cost": "42",
+        "expiry_date": (date.today() + timedelta(days=20)).isoformat(),
+    }
+    headers = {"Idempotency-Key": "grn-1"}
+    first = client.post("/api/purchases/", json=purchase, headers=headers)
+    # Stock sold from the batch since does not change what the retry gets back.
+    sale = {"product_id": product_id, "quantity": 12, "selling_price": "60"}
+    assert client.post("/api/sales/", json=sale).status_code == 201
+    retry = client.post("/api/purchases/", json=purchase, headers=headers)
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.status_code == 201
+    assert retry.json() == first.json()
+    assert first.json()["quantity_remaining"] == 5
+    assert units_on_hand(client) == 3
+
+    # A rejected sale records nothing, so the same key can be retried once stock arrives.
+    sale = {"product_id": product_id, "quantity": 20, "selling_price": "60"}
+    assert client.post("/api/sales/", json=sale, headers={"Idempotency-Key": "big"}).status_code == 400
+    retried = client.post("/api/sales/", json={**sale, "quantity": 3}, headers={"Idempotency-Key": "big"})
+    assert retried.status_code == 201
+
+
+@pytest.mark.parametrize("group_commit", [False, True])
+def test_keys_expire_and_are_pruned(client: TestClient, monkeypatch, group_commit):
+    monkeypatch.setattr(get_settings(), "sale_group_commit_enabled", group_commit)
+    product_id = setup_stock(client)
+    sale = {"product_id": product_id, "quantity": 1, "selling_price": "60"}
+    for key in ("a", "b", "c"):
+        assert client.post("/api/sales/", json=sale, headers={"Idempotency-Key": key}).status_code == 201
+
+    db = next(client.app.dependency_overrides[get_db]())
+    monkeypatch.setattr(get_settings(), "idempotency_max_keys", 2)
+    assert idempotency.prune(db) == 1
+    db.commit()
+    assert {row.key for row in db.query(IdempotencyKey)} == {"b", "c"}
+    db.close()
+
+    monkeypatch.setattr(get_settings(), "idempotency_ttl_seconds", -1)
+    again = client.post("/api/sales/", json={**sale, "quantity": 2}, headers={"Idempotency-Key": "b"})
+    assert again.status_code == 201
+    assert "Idempotent-Replayed" not in again.headers
+    assert units_on_hand(client) == 5
+
+
+@pytest.mark.parametrize("group_commit", [False, True])
+def test_expired_key_survives_an_allocation_retry(client: TestClient, monkeypatch, group_commit):
+    monkeypatch.setattr(get_settings(), "sale_group_commit_enabled", group_commit)
+    product_id = setup_stock(client)
+    sale = {"product_id": product_id, "quantity": 1, "selling_price": "60"}
+    assert client.post("/api/sales/", json=sale, headers={"Idempotency-Key": "k"}).status_code == 201
+
+    # The first allocation attempt loses a race and rolls back; the expired key must stay forgotten.
+    allocate, calls = sales_service._allocate, []
+
+    def flaky_allocate(db, sale, batches, quantity):
+        calls.append(quantity)
+        if len(calls) == 1:
+            raise sales_service.AllocationConflict(sale.product_id)
+        return allocate(db, sale, batches, quantity)
+
+    monkeypatch.setattr(sales_service, "_allocate", flaky_allocate)
+    monkeypatch.setattr(get_settings(), "idempotency_ttl_seconds", -1)
+    again = client.post("/api/sales/", json={**sale, "quantity": 2}, headers={"Idempotency-Key": "k"})
+    assert again.status_code == 201
+    assert calls == [2, 2]
+    assert units_on_hand(client) == 7
+
+
+def test_concurrent_requests_with_one_key_sell_once(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'idem.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine, autoflush=False)
+    with session_factory() as db:
+        product = Product(name="Barfi")
+        db.add(product)
+        db.flush()
+        db.add(
+            InventoryBatch(
+                product_id=product.id,
+                batch_code="B-1",
+                quantity_initial=100,
+                quantity_remaining=100,
+                unit_cost=Decimal("30"),
+                expiry_date=date.today() + timedelta(days=30),
+            )
+        )
+        db.commit()
+        payload = SaleCreate(product_id=product.id, quantity=3, selling_price="50")
+
+    barrier = threading.Barrier(4)
+    outcomes: list[object] = []
+
+    def sell():
+        with session_factory() as db:
+            barrier.wait()
+            try:
+                replayed = sales_service.find_idempotent_sale(db, "same-key", payload)
+                if replayed is not None:
+                    outcomes.append(json.loads(replayed.body)["id"])
+                else:
+                    outcomes.append(sales_service.create_sale(db, payload, "same-key").id)
+            except HTTPException as exc:
+                outcomes.append(exc.status_code)
+
+    threads = [threading.Thread(target=sell) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    sale_ids = {outcome for outcome in outcomes if outcome != 409}
+    assert len(sale_ids) == 1
+    with session_factory() as db:
+        assert db.get(InventoryBatch, 1).quantity_remaining == 97
+    engine.dispose()
@@ -0,0 +1,56 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.services import master_data
+
+
+def test_product_upsert_reports_created_updated_and_unchanged(client: TestClient):
+    client.post("/api/products/", json={"name": "Kaju Katli", "category": "Barfi", "brand": "Haldiram"})
+    client.post("/api/products/", json={"name": "Rasgulla", "category": "Bengali", "brand": "KC Das"})
+
+    response = client.post(
+        "/api/products/bulk",
+        json=[
+            {"name": "Kaju Katli", "category": "Barfi", "brand": "Haldiram"},
+            {"name": "Rasgulla", "category": "Bengali", "brand": "Bikanervala"},
+            {"name": "Soan Papdi", "category": "Flaky"},
+        ],
+    )
+    assert response.status_code == 200
+    assert response.json() == {"created": 1, "updated": 1, "unchanged": 1}
+
+    products = {product["name"]: product for product in client.get("/api/products/").json()}
+    assert products["Rasgulla"]["brand"] == "Bikanervala"
+    assert products["Soan Papdi"]["category"] == "Flaky"
+    assert len(products) == 3
+
+    again = client.post("/api/products/bulk", json=[{"name": "Soan Papdi", "category": "Flaky"}])
+    assert again.json() == {"created": 0, "updated": 0, "unchanged": 1}
+
+
+@pytest.mark.parametrize("use_on_conflict", [True, False])
+def test_supplier_and_retailer_upsert_in_batches(client: TestClient, monkeypatch, use_on_conflict):
+    monkeypatch.setattr(master_data, "UPSERT_CHUNK", 7)
+    if not use_on_conflict:
+        monkeypatch.setattr(master_data, "dialect_insert", lambda db: None)
+    client.post("/api/suppliers/", json={"name": "Supplier 3", "city": "Pune"})
+
+    suppliers = [{"name": f"Supplier {i}", "city": "Jaipur"} for i in range(20)]
+    assert client.post("/api/suppliers/bulk", json=suppliers).json() == {"created": 19, "updated": 1, "unchanged": 0}
+    cities = {supplier["name"]: supplier["city"] for supplier in client.get("/api/suppliers/").json()}
+    assert len(cities) == 20
+    assert set(cities.values()) == {"Jaipur"}
+
+    catalog = "name,channel,city\n" + "".join(f"Retailer {i},Modern Trade,\n" for i in range(15))
+    response = client.post("/api/retailers/bulk", content=catalog, headers={"Content-Type": "text/csv"})
+    assert response.json() == {"created": 15, "updated": 0, "unchanged": 0}
+    assert {retailer["channel"] for retailer in client.get("/api/retailers/").json()} == {"Modern Trade"}
+
+
+def test_upsert_invalidates_cached_lists(client: TestClient):
+    client.post("/api/retailers/bulk", json=[{"name": "Sharma Stores"}])
+    first = client.get("/api/retailers/")
+    client.post("/api/retailers/bulk", json=[{"name": "Sharma Stores", "channel": "General Trade"}])
+    second = client.get("/api/retailers/", headers={"If-None-Match": first.headers["ETag"]})
+    assert second.status_code == 200
+    assert second.json()[0]["channel"] == "General Trade"
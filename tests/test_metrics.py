@@ -0,0 +1,96 @@
+from datetime import date, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app.config import get_settings
+from app.main import create_app
+from app.services import instrumentation
+from app.utils.metrics import Counter, Histogram, Registry, _Metric
+
+
+def metrics_client(client: TestClient, monkeypatch) -> TestClient:
+    monkeypatch.setattr(get_settings(), "metrics_enabled", True)
+    app = create_app()
+    app.dependency_overrides.update(client.app.dependency_overrides)
+    return TestClient(app)
+
+
+def sample(text: str, line_prefix: str) -> float:
+    matches = [line for line in text.splitlines() if line.startswith(line_prefix + " ")]
+    assert len(matches) == 1, line_prefix
+    return float(matches[0].rsplit(" ", 1)[1])
+
+
+def test_exposition_format():
+    registry = Registry()
+    hits = registry.register(Counter("hits_total", "Hits.", ("route",)))
+    sizes = registry.register(Histogram("size", "Sizes.", (), (1, 5)))
+    hits.inc('/a"b', amount=2)
+    for value in (1, 3, 9):
+        sizes.observe(value)
+
+    assert registry.render() == (
+        "# HELP hits_total Hits.\n# TYPE hits_total counter\n"
+        'hits_total{route="/a\\"b"} 2\n'
+        "# HELP size Sizes.\n# TYPE size histogram\n"
+        'size_bucket{le="1"} 1\nsize_bucket{le="5"} 2\nsize_bucket{le="+Inf"} 3\n'
+        "size_sum 13\nsize_count 3\n"
+    )
+
+
+def test_metrics_endpoint_only_when_enabled(client: TestClient):
+    assert client.get("/metrics").status_code == 404
+
+
+def test_route_latency_sql_counts_and_domain_counters(client: TestClient, monkeypatch):
+    api = metrics_client(client, monkeypatch)
+    product_id = api.post("/api/products/", json={"name": "Milk Cake"}).json()["id"]
+    route = 'method="POST",route="/api/purchases/"'
+    purchases_before = instrumentation.http_requests.value("POST", "/api/purchases/", "201")
+    rows_before = instrumentation.purchase_rows.value()
+    sales_before = instrumentation.sales_allocated.value()
+    spans_before = instrumentation.batches_per_sale.count()
+
+    for code, days in (("MC-1", 5), ("MC-2", 9)):
+        expiry = (date.today() + timedelta(days=days)).isoformat()
+        payload = {"product_id": product_id, "batch_code": code, "quantity": 4, "unit_cost": "60"}
+        assert api.post("/api/purchases/", json={**payload, "expiry_date": expiry}).status_code == 201
+    sale = {"product_id": product_id, "selling_price": "90"}
+    assert api.post("/api/sales/", json={**sale, "quantity": 6}).status_code == 201
+    # A sale that cannot be filled rolls back and must not be counted.
+    assert api.post("/api/sales/", json={**sale, "quantity": 50}).status_code == 400
+    assert api.delete("/api/suppliers/999").status_code == 404
+    api.get("/no-such-page")
+
+    response = api.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    assert sample(text, f'http_requests_total{{{route},status="201"}}') == purchases_before + 2
+    assert 'http_requests_total{method="DELETE",route="/api/suppliers/{supplier_id}",status="404"}' in text
+    assert 'route="<unmatched>"' in text
+    assert sample(text, f'http_request_duration_seconds_bucket{{{route},le="+Inf"}}') >= 2
+    assert sample(text, f"http_request_db_queries_sum{{{route}}}") > 0
+    assert instrumentation.purchase_rows.value() == rows_before + 2
+    assert instrumentation.sales_allocated.value() == sales_before + 1
+    assert instrumentation.batches_per_sale.count() == spans_before + 1
+    assert "db_queries_total " in text
+
+
+def test_metric_kinds_must_render_samples():
+    with pytest.raises(TypeError):
+        _Metric("bare", "No samples.")
+
+
+def test_failed_statements_leave_no_timing_state(client: TestClient, db_engine, monkeypatch):
+    metrics_client(client, monkeypatch)
+    with db_engine.connect() as conn:
+        with pytest.raises(OperationalError):
+            conn.execute(text("SELECT * FROM no_such_table"))
+        before = instrumentation.db_queries.value()
+        conn.execute(text("SELECT 1"))
+        assert instrumentation.db_queries.value() == before + 1
+        assert not any("started" in str(key) for key in conn.info)
@@ -0,0 +1,118 @@
+import threading
+
+import pytest
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.orm import Session
+
+from app.migrate import LATEST_VERSION, MIGRATIONS, SchemaOutOfDate, current_version, ensure_current, migrate
+from app.services import sales_rollup, stock_totals
+
+DERIVED_TABLES = ("product_stock", "daily_product_sales")
+
+LEGACY_SCHEMA = [
+    "CREATE TABLE products (id INTEGER PRIMARY KEY, name VARCHAR(120) UNIQUE NOT NULL, category VARCHAR(80),"
+    " brand VARCHAR(80), created_at DATETIME NOT NULL)",
+    "CREATE TABLE inventory_batches (id INTEGER PRIMARY KEY, product_id INTEGER NOT NULL REFERENCES products(id),"
+    " batch_code VARCHAR(80) NOT NULL, quantity_initial INTEGER NOT NULL, quantity_remaining INTEGER NOT NULL,"
+    " unit_cost NUMERIC(10, 2) NOT NULL, expiry_date DATE NOT NULL, supplier_name VARCHAR(120),"
+    " purchased_at DATETIME NOT NULL)",
+    "CREATE TABLE sales (id INTEGER PRIMARY KEY, product_id INTEGER NOT NULL REFERENCES products(id),"
+    " quantity INTEGER NOT NULL, selling_price NUMERIC(10, 2) NOT NULL, sale_date DATETIME NOT NULL,"
+    " customer_name VARCHAR(120))",
+    "CREATE TABLE sale_allocations (id INTEGER PRIMARY KEY, sale_id INTEGER NOT NULL, batch_id INTEGER NOT NULL,"
+    " quantity INTEGER NOT NULL, unit_cost NUMERIC(10, 2) NOT NULL)",
+    "INSERT INTO products VALUES (1, 'Peda', NULL, NULL, '2024-05-01 10:00:00')",
+    "INSERT INTO inventory_batches VALUES (1, 1, 'P1', 20, 15, 12.5, '2024-06-01', 'Dairy', '2024-05-01 10:00:00')",
+    "INSERT INTO sales VALUES (1, 1, 5, 20, '2024-05-02 09:00:00', NULL)",
+    "INSERT INTO sale_allocations VALUES (1, 1, 1, 5, 12.5)",
+]
+
+
+@pytest.fixture()
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'migrate.db'}", connect_args={"check_same_thread": False})
+    yield engine
+    engine.dispose()
+
+
+def test_upgrades_a_legacy_database_once(engine):
+    with engine.begin() as conn:
+        for statement in LEGACY_SCHEMA:
+            conn.execute(text(statement))
+
+    assert migrate(engine) == [name for _, name, _ in MIGRATIONS]
+    assert current_version(engine) == LATEST_VERSION
+    assert migrate(engine) == []
+
+    inspector = inspect(engine)
+    assert {"supplier_id", "unit_size_unit"} <= {c["name"] for c in inspector.get_columns("inventory_batches")}
+    assert {"retailer_id", "invoice_number"} <= {c["name"] for c in inspector.get_columns("sales")}
+    assert "ix_batches_open_fifo" in {index["name"] for index in inspector.get_indexes("inventory_batches")}
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT units_on_hand FROM product_stock")).scalar_one() == 15
+        assert conn.execute(text("SELECT quantity, revenue_paise FROM daily_product_sales")).one() == (5, 10000)
+        backfilled = [conn.execute(text(f"SELECT * FROM {name}")).all() for name in DERIVED_TABLES]
+
+    # The step's literal SQL agrees with what the services rebuild from the same ledger.
+    with Session(engine) as db:
+        stock_totals.rebuild(db)
+        sales_rollup.rebuild(db)
+    with engine.connect() as conn:
+        assert [conn.execute(text(f"SELECT * FROM {name}")).all() for name in DERIVED_TABLES] == backfilled
+
+
+def test_startup_is_a_single_read_once_current(engine):
+    with pytest.raises(SchemaOutOfDate):
+        ensure_current(engine, auto_migrate=False)
+    ensure_current(engine, auto_migrate=True)
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    ensure_current(engine, auto_migrate=False)
+    assert len(statements) == 1 and "schema_version" in statements[0]
+
+
+def test_workers_booting_together_migrate_once(engine):
+    results, errors = [], []
+    barrier = threading.Barrier(4)
+
+    def boot():
+        barrier.wait()
+        try:
+            results.append(migrate(engine))
+        except Exception as exc:  # pragma: no cover - reported below
+            errors.append(exc)
+
+    workers = [threading.Thread(target=boot) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert errors == []
+    assert sorted(len(applied) for applied in results) == [0, 0, 0, len(MIGRATIONS)]
+    assert current_version(engine) == LATEST_VERSION
+
+
+def _schema(engine):
+    inspector = inspect(engine)
+    return {
+        table: (
+            {column["name"] for column in inspector.get_columns(table)},
+            {index["name"] for index in inspector.get_indexes(table)},
+        )
+        for table in inspector.get_table_names()
+        if table != "schema_version"
+    }
+
+
+def test_migrated_schema_matches_the_models(engine, tmp_path):
+    from app.database import Base
+
+    migrate(engine)
+    declared = create_engine(f"sqlite:///{tmp_path / 'declared.db'}")
+    Base.metadata.create_all(bind=declared)
+    try:
+        assert _schema(engine) == _schema(declared)
+    finally:
+        declared.dispose()
@@ -0,0 +1,145 @@
+import re
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+from app.database import get_db
+from app.models.entities import Product, Retailer, Sale, Supplier
+from app.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER
+
+
+def collect(client: TestClient, url: str, limit: int) -> tuple[list[dict], int]:
+    items, pages, cursor = [], 0, None
+    while True:
+        params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        response = client.get(url, params=params)
+        assert response.status_code == 200
+        pages += 1
+        items.extend(response.json())
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            return items, pages
+
+
+def seed(client: TestClient) -> tuple[list[int], int]:
+    product_ids = [client.post("/api/products/", json={"name": f"Barfi {i}"}).json()["id"] for i in range(5)]
+    supplier_id = client.post("/api/suppliers/", json={"name": "Haldiram Depot"}).json()["id"]
+    for i, product_id in enumerate(product_ids):
+        for code in ("A", "B"):
+            client.post(
+                "/api/purchases/",
+                json={
+                    "product_id": product_id,
+                    "batch_code": f"{code}{i}",
+                    "quantity": 10,
+                    "unit_cost": "50.00",
+                    "expiry_date": (date.today() + timedelta(days=i + (5 if code == "B" else 1))).isoformat(),
+                    "supplier_id": supplier_id if code == "A" else None,
+                },
+            )
+    return product_ids, supplier_id
+
+
+def test_keyset_pages_cover_every_row_once(client: TestClient):
+    product_ids, _ = seed(client)
+    for n in range(7):
+        product_id = product_ids[n % 2]
+        client.post(
+            "/api/sales/",
+            json={"product_id": product_id, "quantity": 1, "selling_price": "80", "invoice_number": f"INV-{n}"},
+        )
+
+    everything = client.get("/api/sales/").json()
+    assert NEXT_CURSOR_HEADER not in client.get("/api/sales/").headers
+    paged, pages = collect(client, "/api/sales/", limit=3)
+    assert pages == 3
+    assert [sale["id"] for sale in paged] == [sale["id"] for sale in everything]
+    assert [sale["id"] for sale in paged] == sorted((sale["id"] for sale in paged), reverse=True)
+
+    products, _ = collect(client, "/api/products/", limit=2)
+    assert [product["name"] for product in products] == [f"Barfi {i}" for i in range(5)]
+    batches, _ = collect(client, "/api/purchases/", limit=4)
+    assert len({batch["id"] for batch in batches}) == len(batches) == 10
+    assert [batch["expiry_date"] for batch in batches] == sorted(batch["expiry_date"] for batch in batches)
+
+
+def test_list_filters(client: TestClient):
+    product_ids, supplier_id = seed(client)
+    for n in range(3):
+        client.post(
+            "/api/sales/",
+            json={"product_id": product_ids[0], "quantity": 4, "selling_price": "80", "invoice_number": f"F-{n}"},
+        )
+    client.post("/api/sales/", json={"product_id": product_ids[1], "quantity": 1, "selling_price": "80"})
+
+    today = date.today().isoformat()
+    assert len(client.get("/api/sales/", params={"product_id": product_ids[0]}).json()) == 3
+    assert [s["invoice_number"] for s in client.get("/api/sales/", params={"invoice_number": "F-1"}).json()] == ["F-1"]
+    assert len(client.get("/api/sales/", params={"date_from": today, "date_to": today}).json()) == 4
+    tomorrow = (date.today() + timedelta(days=1)).isoformat()
+    assert client.get("/api/sales/", params={"date_from": tomorrow}).json() == []
+
+    # Product 0's batch A0 (10 units) drained by 12 units sold, B0 holds the rest.
+    drained = client.get("/api/purchases/", params={"in_stock": "false"}).json()
+    assert [batch["batch_code"] for batch in drained] == ["A0"]
+    supplied = client.get("/api/purchases/", params={"supplier_id": supplier_id}).json()
+    assert sorted(batch["batch_code"] for batch in supplied) == [f"A{i}" for i in range(5)]
+    window = {
+        "expires_from": (date.today() + timedelta(days=2)).isoformat(),
+        "expires_to": (date.today() + timedelta(days=3)).isoformat(),
+    }
+    window = client.get("/api/purchases/", params=window).json()
+    assert sorted(batch["batch_code"] for batch in window) == ["A1", "A2"]
+
+
+def test_bad_cursor_is_rejected(client: TestClient):
+    assert client.get("/api/sales/", params={"limit": 5, "cursor": "not-a-cursor"}).status_code == 400
+    assert client.get("/api/products/", params={"limit": 0}).status_code == 422
+
+
+def test_lists_are_paged_by_default(client: TestClient):
+    db = next(client.app.dependency_overrides[get_db]())
+    db.execute(insert(Product), [{"name": f"Peda {i:03d}"} for i in range(DEFAULT_PAGE_SIZE + 1)])
+    db.commit()
+    db.close()
+
+    first = client.get("/api/products/")
+    assert len(first.json()) == DEFAULT_PAGE_SIZE
+    rest = client.get("/api/products/", params={"cursor": first.headers[NEXT_CURSOR_HEADER]}).json()
+    assert [product["name"] for product in rest] == [f"Peda {DEFAULT_PAGE_SIZE:03d}"]
+    assert client.get("/api/products/", params={"limit": MAX_PAGE_SIZE + 1}).status_code == 422
+
+
+CLIENT_API = Path(__file__).resolve().parents[1] / "frontend" / "src" / "api.ts"
+
+
+def client_page_size() -> int:
+    return int(re.search(r"^const PAGE_SIZE = (\d+)$", CLIENT_API.read_text(), re.MULTILINE).group(1))
+
+
+@pytest.mark.parametrize(
+    ("url", "model", "row"),
+    [
+        ("/api/products/", Product, lambda i, _: {"name": f"Peda {i:04d}"}),
+        ("/api/suppliers/", Supplier, lambda i, _: {"name": f"Depot {i:04d}"}),
+        ("/api/retailers/", Retailer, lambda i, _: {"name": f"Counter {i:04d}"}),
+        ("/api/sales/", Sale, lambda _, product_id: {"product_id": product_id, "quantity": 1, "selling_price": 80}),
+    ],
+)
+def test_client_rosters_follow_the_cursor_to_the_end(client: TestClient, url: str, model, row):
+    """The dashboard loads whole rosters the way ``requestAll`` in frontend/src/api.ts does."""
+    page_size = client_page_size()
+    assert DEFAULT_PAGE_SIZE < page_size <= MAX_PAGE_SIZE
+
+    product_id = client.post("/api/products/", json={"name": "Kaju Katli"}).json()["id"]
+    db = next(client.app.dependency_overrides[get_db]())
+    db.execute(insert(model), [row(i, product_id) for i in range(page_size + 1)])
+    db.commit()
+    db.close()
+
+    items, pages = collect(client, url, limit=page_size)
+    assert pages == 2
+    assert len({item["id"] for item in items}) == len(items) >= page_size + 1
@@ -0,0 +1,77 @@
+from datetime import date, timedelta
+
+from fastapi.testclient import TestClient
+
+from app.config import get_settings
+from app.main import create_app
+from app.routers.debug import ADMIN_TOKEN_HEADER
+from app.utils.profiling import PROFILE_HEADER, PROFILE_ID_HEADER
+
+
+def profiling_client(client: TestClient, monkeypatch) -> TestClient:
+    monkeypatch.setattr(get_settings(), "profiling_enabled", True)
+    monkeypatch.setattr(get_settings(), "profile_sample_interval_ms", 0.2)
+    app = create_app()
+    app.dependency_overrides.update(client.app.dependency_overrides)
+    return TestClient(app)
+
+
+def receipt(product_id: int, prefix: str, count: int) -> list[dict]:
+    expiry = (date.today() + timedelta(days=30)).isoformat()
+    line = {"product_id": product_id, "quantity": 2, "unit_cost": "10", "expiry_date": expiry}
+    return [{**line, "batch_code": f"{prefix}-{n}"} for n in range(count)]
+
+
+def test_profiled_request_yields_collapsed_stacks_and_speedscope(client: TestClient, monkeypatch):
+    api = profiling_client(client, monkeypatch)
+    product_id = api.post("/api/products/", json={"name": "Gulab Jamun"}).json()["id"]
+
+    plain = api.post("/api/purchases/bulk", json=receipt(product_id, "A", 5))
+    assert PROFILE_ID_HEADER not in plain.headers
+    assert api.get("/api/debug/profiles").json() == {"enabled": True, "profiles": []}
+
+    response = api.post("/api/purchases/bulk", json=receipt(product_id, "B", 3000), headers={PROFILE_HEADER: "1"})
+    assert response.status_code == 201
+    profile_id = response.headers[PROFILE_ID_HEADER]
+
+    [summary] = api.get("/api/debug/profiles").json()["profiles"]
+    assert summary["profile_id"] == profile_id
+    assert (summary["method"], summary["path"], summary["status_code"]) == ("POST", "/api/purchases/bulk", 201)
+    assert summary["samples"] > 0
+
+    collapsed = api.get(f"/api/debug/profiles/{profile_id}").text
+    lines = collapsed.splitlines()
+    assert lines and all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert "create_purchases_bulk (purchase_service.py:" in collapsed
+    assert "_run (profiling.py:" not in collapsed
+
+    speedscope = api.get(f"/api/debug/profiles/{profile_id}", params={"format": "speedscope"})
+    assert "speedscope.json" in speedscope.headers["content-disposition"]
+    document = speedscope.json()
+    [sampled] = document["profiles"]
+    assert sampled["type"] == "sampled"
+    assert len(sampled["samples"]) == len(sampled["weights"]) == len(lines)
+    frame_count = len(document["shared"]["frames"])
+    assert all(0 <= index < frame_count for stack in sampled["samples"] for index in stack)
+
+    assert api.get("/api/debug/profiles/nope").status_code == 404
+
+
+def test_profiling_is_off_by_default(client: TestClient):
+    response = client.get("/api/products/", headers={PROFILE_HEADER: "1"})
+    assert PROFILE_ID_HEADER not in response.headers
+    assert client.get("/api/debug/profiles").json() == {"enabled": False, "profiles": []}
+
+
+def test_only_admins_can_profile(client: TestClient, monkeypatch):
+    api = profiling_client(client, monkeypatch)
+    monkeypatch.setattr(get_settings(), "admin_token", "s3cret")
+
+    response = api.get("/api/products/", headers={PROFILE_HEADER: "1"})
+    assert response.status_code == 200 and PROFILE_ID_HEADER not in response.headers
+    assert api.get("/api/debug/profiles").status_code == 403
+
+    admin = {PROFILE_HEADER: "1", ADMIN_TOKEN_HEADER: "s3cret"}
+    profile_id = api.get("/api/products/", headers=admin).headers[PROFILE_ID_HEADER]
+    assert api.get(f"/api/debug/profiles/{profile_id}").status_code == 403
+    assert api.get(f"/api/debug/profiles/{profile_id}", headers={ADMIN_TOKEN_HEADER: "s3cret"}).status_code == 200
@@ -0,0 +1,117 @@
+import random
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session, joinedload, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.models.entities import InventoryBatch, Product, Sale, SaleAllocation
+from app.schemas.report import ProfitLine, ProfitReport
+from app.services import report_service, sales_rollup
+
+
+def reference_monthly_profit(db: Session) -> ProfitReport:
+    """The original in-Python implementation over raw sales, kept as the oracle."""
+    month_totals: dict[str, dict[str, Decimal]] = defaultdict(lambda: {"revenue": Decimal("0"), "cogs": Decimal("0")})
+    for sale in db.query(Sale).options(joinedload(Sale.allocations)).all():
+        month_key = sale.sale_date.strftime("%Y-%m")
+        month_totals[month_key]["revenue"] += Decimal(sale.quantity) * Decimal(sale.selling_price)
+        month_totals[month_key]["cogs"] += sum(Decimal(a.quantity) * Decimal(a.unit_cost) for a in sale.allocations)
+    return ProfitReport(
+        months=[
+            ProfitLine(month=month, revenue=t["revenue"], cogs=t["cogs"], profit=t["revenue"] - t["cogs"])
+            for month, t in sorted(month_totals.items())
+        ]
+    )
+
+
+@pytest.fixture(scope="module")
+def large_ledger():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(20251118)
+    products, sales_count = 40, 100_000
+    start = datetime(2024, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(insert(Product), [{"id": i, "name": f"SKU-{i}"} for i in range(1, products + 1)])
+        conn.execute(
+            insert(InventoryBatch),
+            [
+                {
+                    "id": i,
+                    "product_id": i,
+                    "batch_code": f"B-{i}",
+                    "quantity_initial": 10**9,
+                    "quantity_remaining": 10**9,
+                    "unit_cost": Decimal(rng.randint(100, 9999)) / 100,
+                    "expiry_date": date(2030, 1, 1),
+                }
+                for i in range(1, products + 1)
+            ],
+        )
+        sales, allocations = [], []
+        for sale_id in range(1, sales_count + 1):
+            product_id = rng.randint(1, products)
+            quantity = rng.randint(1, 40)
+            sales.append(
+                {
+                    "id": sale_id,
+                    "product_id": product_id,
+                    "quantity": quantity,
+                    "selling_price": Decimal(rng.randint(100, 19999)) / 100,
+                    "sale_date": start + timedelta(minutes=rng.randint(0, 60 * 24 * 731 - 1)),
+                }
+            )
+            split = rng.randint(0, quantity)
+            for part in (split, quantity - split):
+                if part:
+                    allocations.append(
+                        {
+                            "sale_id": sale_id,
+                            "batch_id": product_id,
+                            "quantity": part,
+                            "unit_cost": Decimal(rng.randint(100, 9999)) / 100,
+                        }
+                    )
+        conn.execute(insert(Sale), sales)
+        conn.execute(insert(SaleAllocation), allocations)
+    session_factory = sessionmaker(bind=engine)
+    with session_factory() as db:
+        sales_rollup.rebuild(db)
+    yield session_factory
+    engine.dispose()
+
+
+def test_sql_report_matches_reference_at_100k_sales(large_ledger):
+    with large_ledger() as db:
+        expected = reference_monthly_profit(db)
+        actual = report_service.get_monthly_profit_report(db)
+    assert len(actual.months) == 24
+    assert actual.model_dump_json() == expected.model_dump_json()
+
+
+def test_month_window_and_product_breakdown(large_ledger):
+    with large_ledger() as db:
+        full = {line.month: line for line in report_service.get_monthly_profit_report(db).months}
+        window = report_service.get_monthly_profit_report(db, "2024-03", "2024-05", by_product=True)
+
+    assert [line.month for line in window.months] == ["2024-03", "2024-04", "2024-05"]
+    for line in window.months:
+        month = full[line.month]
+        assert (line.revenue, line.cogs, line.profit) == (month.revenue, month.cogs, month.profit)
+        assert sum(product.revenue for product in line.products) == line.revenue
+        assert sum(product.cogs for product in line.products) == line.cogs
+        assert all(product.product_name == f"SKU-{product.product_id}" for product in line.products)
+
+
+def test_monthly_profit_query_parameters(client: TestClient):
+    response = client.get("/api/reports/monthly-profit")
+    assert response.status_code == 200
+    assert response.json() == {"currency": "INR", "months": []}
+    assert client.get("/api/reports/monthly-profit?from=2025-13").status_code == 422
+    assert client.get("/api/reports/monthly-profit?from=2025-01&to=2025-02&by_product=true").status_code == 200
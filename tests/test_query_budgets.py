@@ -0,0 +1,92 @@
+"""Query-count budgets: every read endpoint must run a fixed number of statements, whatever the data size.
+
+A lazy load that slips back into a serializer (``SaleRead.retailer``, ``PurchaseRead.supplier``,
+allocations) turns into one statement per row, which blows the budget at 1,000 and 10,000 rows.
+"""
+
+from datetime import date, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import insert, update
+
+from app.database import get_db
+from app.models.entities import InventoryBatch, Sale, SaleAllocation
+from app.services import sales_rollup, stock_totals
+from app.utils.pagination import DEFAULT_PAGE_SIZE
+
+# (method, url): the most statements one request may run, at any data size. Two is the
+# data_versions read behind the ETag plus the query itself.
+BUDGETS = {
+    ("GET", "/api/sales/"): 3,
+    ("GET", "/api/purchases/"): 2,
+    ("GET", "/api/stock/"): 3,
+    ("GET", "/api/stock/expiring"): 2,
+    ("GET", "/api/products/"): 2,
+    ("GET", "/api/suppliers/"): 2,
+    ("GET", "/api/retailers/"): 2,
+    ("GET", "/api/reports/top-selling"): 2,
+    ("GET", "/api/reports/slow-moving"): 2,
+    ("GET", "/api/reports/monthly-profit"): 2,
+}
+BULK_CHUNK = 5000
+
+
+def post_in_chunks(client: TestClient, url: str, lines: list[dict]) -> None:
+    for start in range(0, len(lines), BULK_CHUNK):
+        response = client.post(url, json=lines[start : start + BULK_CHUNK])
+        assert response.status_code in (200, 201), response.text
+
+
+def seed(client: TestClient, rows: int) -> None:
+    """``rows`` batches and ``rows`` sales, spread over distinct products, suppliers and retailers."""
+    parties = max(rows // 10, 2)
+    for entity in ("products", "suppliers", "retailers"):
+        post_in_chunks(client, f"/api/{entity}/bulk", [{"name": f"{entity} {n}"} for n in range(parties)])
+    # Half the batches expire inside the alert window, so the expiry report has rows too.
+    post_in_chunks(
+        client,
+        "/api/purchases/bulk",
+        [
+            {
+                "product_id": n % parties + 1,
+                "batch_code": f"B-{n}",
+                "quantity": 3,
+                "unit_cost": "10",
+                "expiry_date": (date.today() + timedelta(days=2 + n % 2 * 60)).isoformat(),
+                "supplier_id": n % parties + 1,
+            }
+            for n in range(rows)
+        ],
+    )
+    # Sales go straight into the ledger (one unit from each batch) and the derived tables are
+    # rebuilt afterwards; allocating 10,000 sales one by one would dominate the test's runtime.
+    db = next(client.app.dependency_overrides[get_db]())
+    db.execute(
+        insert(Sale),
+        [
+            {"product_id": n % parties + 1, "retailer_id": n % parties + 1, "quantity": 1, "selling_price": 15}
+            for n in range(rows)
+        ],
+    )
+    db.execute(
+        insert(SaleAllocation),
+        [{"sale_id": n + 1, "batch_id": n + 1, "quantity": 1, "unit_cost": 10} for n in range(rows)],
+    )
+    db.execute(update(InventoryBatch).values(quantity_remaining=InventoryBatch.quantity_remaining - 1))
+    db.commit()
+    stock_totals.rebuild(db)
+    sales_rollup.rebuild(db)
+    db.close()
+
+
+@pytest.mark.parametrize("rows", [10, 1_000, 10_000])
+def test_read_endpoints_stay_within_query_budget(client: TestClient, query_budget, rows: int):
+    # Measure the queries themselves, not cache hits.
+    client.app.state.result_cache = None
+    seed(client, rows)
+    for (method, url), budget in BUDGETS.items():
+        response = query_budget(budget, method, url)
+        assert response.status_code == 200, url
+    assert len(client.get("/api/sales/").json()) == min(rows, DEFAULT_PAGE_SIZE)
+    assert client.get("/api/stock/").json()["total_units"] == 2 * rows
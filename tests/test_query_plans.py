@@ -0,0 +1,161 @@
+"""EXPLAIN QUERY PLAN regression tests: every statement the hot service paths run must be index-driven."""
+
+import re
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.models.entities import Product, Retailer, Supplier
+from app.schemas.purchase import PurchaseCreate
+from app.schemas.sale import SaleCreate
+from app.services import product_service, purchase_service, report_service, sales_service, stock_service
+from app.utils.pagination import PageParams
+
+# Any SCAN step, including ``SCAN t USING [COVERING] INDEX i``: walking a whole index is still O(table).
+SCAN = re.compile(r"^SCAN (\w+)")
+
+# Scans a hot path is allowed to make, by table, each with the reason it is fine.
+JUSTIFIED_SCANS = {
+    "stock_overview": {"products": "the overview returns every product and its batches, in name order"},
+    "top_selling_window": {"products": "the product dimension joined to the window's rollup rows"},
+    "slow_moving": {"products": "every product is a candidate, including those with no sales at all"},
+    "sales_by_product": {"anon_1": "the page of sale ids selected for the allocations subquery load"},
+    "sales_by_date": {"anon_1": "the page of sale ids selected for the allocations subquery load"},
+    "sales_by_invoice": {"anon_1": "the page of sale ids selected for the allocations subquery load"},
+    "product_search": {"products_fts": "an FTS5 MATCH, which SQLite reports as a virtual-table scan"},
+    "product_search_short": {"products": "a name-prefix LIKE walks the name index and stops at the limit"},
+    "products_page": {"products": "a keyset page walks the name index and stops at the limit"},
+}
+
+
+@pytest.fixture()
+def planned():
+    """A seeded session plus the statements it executes, as (sql, parameters) pairs."""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    statements: list[tuple[str, tuple]] = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().split()[0] in ("SELECT", "UPDATE", "DELETE"):
+            statements.append((statement, parameters))
+
+    with sessionmaker(bind=engine, autoflush=False)() as db:
+        product, retailer, supplier = Product(name="Rasmalai"), Retailer(name="Sharma Stores"), Supplier(name="Amul")
+        db.add_all([product, retailer, supplier])
+        db.commit()
+        for code, days in (("R1", 3), ("R2", 9)):
+            purchase_service.create_purchase(
+                db,
+                PurchaseCreate(
+                    product_id=product.id,
+                    batch_code=code,
+                    quantity=10,
+                    unit_cost="30",
+                    expiry_date=date.today() + timedelta(days=days),
+                    supplier_id=supplier.id,
+                ),
+            )
+        sales_service.create_sale(
+            db, SaleCreate(product_id=product.id, quantity=2, selling_price="45", invoice_number="A1")
+        )
+        statements.clear()
+        yield db, statements, {"product": product.id, "retailer": retailer.id, "supplier": supplier.id}
+    engine.dispose()
+
+
+def plans(db, statements) -> list[tuple[str, list[str]]]:
+    connection = db.connection()
+    return [
+        (sql, [row[3] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", params)])
+        for sql, params in statements
+    ]
+
+
+HOT_PATHS = {
+    "create_sale": (
+        lambda db, ids: sales_service.create_sale(
+            db, SaleCreate(product_id=ids["product"], quantity=12, selling_price="45", retailer_id=ids["retailer"])
+        ),
+        "ix_batches_open_fifo",
+    ),
+    "fifo_for_products": (
+        lambda db, ids: sales_service._get_fifo_batches_for_products(db, {ids["product"], 999}),
+        "ix_batches_open_fifo",
+    ),
+    "expiry_alerts": (lambda db, ids: stock_service.get_expiry_alerts(db), "ix_batches_open_expiry"),
+    "stock_overview": (lambda db, ids: stock_service.get_stock_overview(db), None),
+    "top_selling_window": (lambda db, ids: report_service.get_top_selling_products(db, 5, 7), None),
+    "slow_moving": (lambda db, ids: report_service.get_slow_moving_products(db, 5, 30), None),
+    "monthly_profit_window": (
+        lambda db, ids: report_service.get_monthly_profit_report(db, "2025-01", "2025-06", True),
+        "ix_daily_product_sales_day",
+    ),
+    "sales_by_product": (
+        lambda db, ids: sales_service.list_sales(db, PageParams(limit=5), product_id=ids["product"]),
+        "ix_sales_product_date_id",
+    ),
+    "sales_by_retailer": (
+        lambda db, ids: sales_service.list_sales(db, PageParams(limit=5), retailer_id=ids["retailer"]),
+        "ix_sales_retailer_date_id",
+    ),
+    "sales_by_date": (
+        lambda db, ids: sales_service.list_sales(db, PageParams(limit=5), date_from=date.today()),
+        "ix_sales_date_id",
+    ),
+    "sales_fast_by_product": (
+        lambda db, ids: sales_service.list_sales_fast(db, PageParams(limit=5), product_id=ids["product"]),
+        "ix_sale_allocations_sale_id",
+    ),
+    "sales_by_invoice": (lambda db, ids: sales_service.list_sales(db, PageParams(limit=5), invoice_number="A1"), None),
+    "batches_by_product": (
+        lambda db, ids: purchase_service.list_batches(
+            db, PageParams(limit=5), product_id=ids["product"], in_stock=True
+        ),
+        "ix_batches_product_expiry_code_id",
+    ),
+    "batches_by_supplier": (
+        lambda db, ids: purchase_service.list_batches(db, PageParams(limit=5), supplier_id=ids["supplier"]),
+        "ix_batches_supplier_expiry_code_id",
+    ),
+    "batches_by_expiry": (
+        lambda db, ids: purchase_service.list_batches(db, PageParams(limit=5), expires_from=date.today()),
+        "ix_batches_expiry_code_id",
+    ),
+    "sales_ledger_export": (
+        lambda db, ids: db.execute(sales_service.sales_ledger_statement(date.today(), date.today())).all(),
+        "ix_sales_date_id",
+    ),
+    "purchases_export": (
+        lambda db, ids: db.execute(purchase_service.batches_export_statement(date.today())).all(),
+        "ix_batches_purchased_at_id",
+    ),
+    "product_search": (lambda db, ids: product_service.search_products(db, "malai"), "products_fts"),
+    "product_search_short": (lambda db, ids: product_service.search_products(db, "Ra"), None),
+    "products_page": (lambda db, ids: product_service.list_products(db, PageParams(limit=5)), None),
+}
+
+
+@pytest.mark.parametrize("name", HOT_PATHS)
+def test_hot_path_has_no_unjustified_scan(planned, name):
+    db, statements, ids = planned
+    call, expected_index = HOT_PATHS[name]
+    call(db, ids)
+    db.commit()
+    assert statements, "nothing was executed"
+
+    explained = plans(db, statements)
+    allowed = JUSTIFIED_SCANS.get(name, {})
+    scans = [
+        (sql, step)
+        for sql, steps in explained
+        for step in steps
+        if (match := SCAN.match(step)) and match.group(1) not in allowed
+    ]
+    assert not scans, "unjustified scan:\n" + "\n\n".join(f"{step}\n{sql}" for sql, step in scans)
+    if expected_index:
+        assert any(expected_index in step for _, steps in explained for step in steps), explained
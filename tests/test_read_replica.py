@@ -0,0 +1,70 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import database
+from app.config import get_settings
+from app.database import READ_PRIMARY_COOKIE, READ_PRIMARY_HEADER, copy_sqlite_database, get_db
+from app.main import create_app
+from app.migrate import migrate
+
+
+@pytest.fixture()
+def replicated(tmp_path, monkeypatch):
+    """An app writing to one SQLite file and serving GETs from a second, synced by copy."""
+    primary_url = f"sqlite:///{tmp_path / 'primary.db'}"
+    replica_url = f"sqlite:///{tmp_path / 'replica.db'}"
+    primary = create_engine(primary_url, connect_args={"check_same_thread": False})
+    replica = create_engine(replica_url, connect_args={"check_same_thread": False})
+    migrate(primary)
+    copy_sqlite_database(primary_url, replica_url)
+
+    primary_sessions = sessionmaker(bind=primary, autoflush=False)
+    monkeypatch.setattr(get_settings(), "replica_database_url", replica_url)
+    monkeypatch.setattr(database, "ReadSessionLocal", primary_sessions)
+    monkeypatch.setattr(database, "ReplicaSessionLocal", sessionmaker(bind=replica, autoflush=False))
+
+    def override_get_db():
+        db = primary_sessions()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = create_app()
+    app.dependency_overrides[get_db] = override_get_db
+    with TestClient(app) as client:
+        yield client, lambda: copy_sqlite_database(primary_url, replica_url)
+    primary.dispose()
+    replica.dispose()
+
+
+def names(response) -> list[str]:
+    assert response.status_code == 200
+    return [product["name"] for product in response.json()]
+
+
+def test_reads_go_to_the_replica_until_it_is_synced(replicated):
+    client, sync = replicated
+    created = client.post("/api/products/", json={"name": "Kaju Katli"})
+    assert created.status_code == 201
+    assert created.cookies.get(READ_PRIMARY_COOKIE)
+
+    client.cookies.clear()
+    assert names(client.get("/api/products/")) == []
+    assert names(client.get("/api/products/", headers={READ_PRIMARY_HEADER: "1"})) == ["Kaju Katli"]
+
+    sync()
+    assert names(client.get("/api/products/")) == ["Kaju Katli"]
+
+
+def test_writer_reads_its_own_writes_from_the_primary(replicated):
+    client, _ = replicated
+    client.post("/api/products/", json={"name": "Soan Papdi"})
+    # The cookie from the write routes this client's reads to the primary.
+    assert names(client.get("/api/products/")) == ["Soan Papdi"]
+
+    rejected = client.post("/api/products/", json={"name": "Soan Papdi"})
+    assert rejected.status_code >= 400
+    assert READ_PRIMARY_COOKIE not in rejected.cookies
@@ -0,0 +1,66 @@
+from datetime import date, timedelta
+
+from fastapi.testclient import TestClient
+
+
+def seed(client: TestClient) -> int:
+    product_id = client.post("/api/products/", json={"name": "Kaju Katli"}).json()["id"]
+    response = client.post(
+        "/api/purchases/",
+        json={
+            "product_id": product_id,
+            "batch_code": "KK-1",
+            "quantity": 50,
+            "unit_cost": "200.00",
+            "expiry_date": (date.today() + timedelta(days=3)).isoformat(),
+        },
+    )
+    assert response.status_code == 201
+    return product_id
+
+
+def cache_stats(client: TestClient) -> dict:
+    return client.get("/api/debug/cache").json()
+
+
+def test_reports_are_cached_until_a_sale_commits(client: TestClient):
+    product_id = seed(client)
+    client.app.state.result_cache.clear()
+    before = cache_stats(client)
+
+    first = client.get("/api/reports/top-selling").json()
+    assert client.get("/api/reports/top-selling").json() == first == []
+    stats = cache_stats(client)
+    assert (stats["misses"] - before["misses"], stats["hits"] - before["hits"]) == (1, 1)
+
+    sale = client.post("/api/sales/", json={"product_id": product_id, "quantity": 4, "selling_price": "260.00"})
+    assert sale.status_code == 201
+    after_sale = client.get("/api/reports/top-selling").json()
+    assert [(row["product_id"], row["total_quantity"]) for row in after_sale] == [(product_id, 4)]
+    assert cache_stats(client)["misses"] - stats["misses"] == 1
+
+
+def test_stock_views_see_new_purchases_and_differ_by_arguments(client: TestClient):
+    product_id = seed(client)
+    assert client.get("/api/stock/").json()["total_units"] == 50
+    assert len(client.get("/api/stock/expiring").json()) == 1
+
+    client.post(
+        "/api/purchases/",
+        json={
+            "product_id": product_id,
+            "batch_code": "KK-2",
+            "quantity": 10,
+            "unit_cost": "210.00",
+            "expiry_date": (date.today() + timedelta(days=2)).isoformat(),
+        },
+    )
+    assert client.get("/api/stock/").json()["total_units"] == 60
+    assert len(client.get("/api/stock/expiring").json()) == 2
+
+
+    misses = cache_stats(client)["misses"]
+    client.get("/api/reports/slow-moving?days=30")
+    client.get("/api/reports/slow-moving?days=7")
+    client.get("/api/reports/slow-moving?days=7")
+    assert cache_stats(client)["misses"] - misses == 2
@@ -0,0 +1,97 @@
+from datetime import UTC, date, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.models.entities import DailyProductSales, Product, Sale, SaleAllocation
+from app.schemas.purchase import PurchaseCreate
+from app.schemas.sale import SaleCreate
+from app.services import data_version, purchase_service, report_service, sales_rollup, sales_service
+
+
+@pytest.fixture()
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    with sessionmaker(bind=engine, autoflush=False)() as session:
+        yield session
+    engine.dispose()
+
+
+def rollup_rows(db) -> list[tuple]:
+    return [
+        (row.product_id, row.day, row.quantity, row.revenue_paise, row.cogs_paise)
+        for row in db.query(DailyProductSales).order_by(DailyProductSales.product_id, DailyProductSales.day)
+    ]
+
+
+def test_incremental_rollup_matches_rebuild_and_drives_windows(db):
+    laddoo, peda = Product(name="Motichur Laddoo"), Product(name="Kesar Peda")
+    db.add_all([laddoo, peda])
+    db.commit()
+    for product, cost in ((laddoo, "99.99"), (peda, "120.50")):
+        for code, days in (("A", 10), ("B", 20)):
+            purchase_service.create_purchase(
+                db,
+                PurchaseCreate(
+                    product_id=product.id,
+                    batch_code=code,
+                    quantity=20,
+                    unit_cost=cost,
+                    expiry_date=date.today() + timedelta(days=days),
+                ),
+            )
+
+    sales_service.create_sale(db, SaleCreate(product_id=laddoo.id, quantity=25, selling_price="149.95"))
+    sales_service.create_sales_bulk(
+        db,
+        [
+            SaleCreate(product_id=laddoo.id, quantity=5, selling_price="150.05"),
+            SaleCreate(product_id=peda.id, quantity=3, selling_price="180"),
+        ],
+    )
+    incremental = rollup_rows(db)
+    today = datetime.now(UTC).date()
+    assert incremental == [
+        (laddoo.id, today, 30, 25 * 14995 + 5 * 15005, 30 * 9999),
+        (peda.id, today, 3, 3 * 18000, 3 * 12050),
+    ]
+    (sales_version,) = data_version.current(db, (data_version.SALES,))
+    assert sales_rollup.rebuild(db) == 2
+    assert data_version.current(db, (data_version.SALES,)) == (sales_version + 1,)
+    assert rollup_rows(db) == incremental
+
+    # An old sale that only a backfill knows about.
+    old_sale_id = db.execute(
+        insert(Sale).returning(Sale.id),
+        [
+            {
+                "product_id": peda.id,
+                "quantity": 100,
+                "selling_price": Decimal("10"),
+                "sale_date": datetime.now(UTC) - timedelta(days=60),
+            }
+        ],
+    ).scalar_one()
+    db.execute(insert(SaleAllocation).values(sale_id=old_sale_id, batch_id=1, quantity=100, unit_cost=Decimal("5")))
+    db.commit()
+    sales_rollup.rebuild(db)
+
+    all_time = report_service.get_top_selling_products(db, limit=5)
+    assert [(row.product_name, row.total_quantity) for row in all_time] == [
+        ("Kesar Peda", 103),
+        ("Motichur Laddoo", 30),
+    ]
+    last_week = report_service.get_top_selling_products(db, limit=5, days=7)
+    assert [(row.product_name, row.total_quantity) for row in last_week] == [
+        ("Motichur Laddoo", 30),
+        ("Kesar Peda", 3),
+    ]
+    assert last_week[0].total_revenue == Decimal("4499.00")
+
+    slow = report_service.get_slow_moving_products(db, limit=1, days=30)
+    assert (slow[0].product_name, slow[0].sold_in_window) == ("Kesar Peda", 3)
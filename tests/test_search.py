@@ -0,0 +1,47 @@
+from fastapi.testclient import TestClient
+
+
+def names(response) -> list[str]:
+    assert response.status_code == 200
+    return [row["name"] for row in response.json()]
+
+
+def test_product_search_ranks_name_prefix_before_substring(client: TestClient):
+    for name, brand, category in (
+        ("Kaju Katli", "Haldiram", "Barfi"),
+        ("Kesar Kaju Roll", "Bikaji", "Rolls"),
+        ("Motichur Laddoo", "Haldiram", "Laddoo"),
+        ("Kaju Pista Barfi", None, "Barfi"),
+    ):
+        client.post("/api/products/", json={"name": name, "brand": brand, "category": category})
+
+    assert names(client.get("/api/products/search", params={"q": "kaju"})) == [
+        "Kaju Katli",
+        "Kaju Pista Barfi",
+        "Kesar Kaju Roll",
+    ]
+    # Brand and category are searched too, but name hits rank above them.
+    assert names(client.get("/api/products/search", params={"q": "barfi"})) == ["Kaju Pista Barfi", "Kaju Katli"]
+    assert names(client.get("/api/products/search", params={"q": "aldir"})) == ["Kaju Katli", "Motichur Laddoo"]
+    # Too short for trigrams: name prefix only.
+    assert names(client.get("/api/products/search", params={"q": "Ka"})) == ["Kaju Katli", "Kaju Pista Barfi"]
+    assert names(client.get("/api/products/search", params={"q": "kaju", "limit": 1})) == ["Kaju Katli"]
+    assert names(client.get("/api/products/search", params={"q": '50% "off"'})) == []
+    assert client.get("/api/products/search", params={"q": ""}).status_code == 422
+
+
+def test_search_index_follows_updates_and_deletes(client: TestClient):
+    supplier_id = client.post("/api/suppliers/", json={"name": "Amul Dairy", "city": "Anand"}).json()["id"]
+    client.post("/api/suppliers/", json={"name": "Mother Dairy", "city": "Delhi"})
+    assert names(client.get("/api/suppliers/search", params={"q": "dairy"})) == ["Amul Dairy", "Mother Dairy"]
+    assert names(client.get("/api/suppliers/search", params={"q": "anand"})) == ["Amul Dairy"]
+
+    client.post("/api/suppliers/bulk", json=[{"name": "Amul Dairy", "city": "Gandhinagar"}])
+    assert names(client.get("/api/suppliers/search", params={"q": "anand"})) == []
+    assert names(client.get("/api/suppliers/search", params={"q": "gandhi"})) == ["Amul Dairy"]
+
+    assert client.delete(f"/api/suppliers/{supplier_id}").status_code == 204
+    assert names(client.get("/api/suppliers/search", params={"q": "dairy"})) == ["Mother Dairy"]
+
+    client.post("/api/retailers/", json={"name": "Sharma Stores", "channel": "General Trade"})
+    assert names(client.get("/api/retailers/search", params={"q": "general"})) == ["Sharma Stores"]
@@ -0,0 +1,97 @@
+from datetime import date, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+
+from app.config import get_settings
+from app.database import slow_query_log
+from app.main import create_app
+from app.routers.debug import ADMIN_TOKEN_HEADER
+
+
+@pytest.fixture()
+def capture_all(client: TestClient, monkeypatch):
+    """Log every statement (threshold 0) for an app built with the slow-query log on."""
+    monkeypatch.setattr(get_settings(), "slow_query_log_enabled", True)
+    monkeypatch.setattr(slow_query_log, "threshold_ms", 0)
+    slow_query_log.clear()
+    slow_query_log.listen(Engine)
+    app = create_app()
+    app.dependency_overrides.update(client.app.dependency_overrides)
+    try:
+        yield TestClient(app)
+    finally:
+        slow_query_log.remove(Engine)
+        slow_query_log.clear()
+
+
+def test_slow_statements_carry_route_service_plan_and_redacted_parameters(capture_all: TestClient):
+    api = capture_all
+    product_id = api.post("/api/products/", json={"name": "Kalakand Special"}).json()["id"]
+    expiry = (date.today() + timedelta(days=10)).isoformat()
+    api.post(
+        "/api/purchases/",
+        json={"product_id": product_id, "batch_code": "KS-1", "quantity": 3, "unit_cost": "70", "expiry_date": expiry},
+    )
+    assert api.get("/api/stock/").status_code == 200
+    assert api.get("/api/stock/").status_code in (200, 304)
+
+    body = api.get("/api/debug/slow-queries").json()
+    assert body["enabled"] is True
+    assert body["threshold_ms"] == 0
+    queries = body["queries"]
+    assert queries == sorted(queries, key=lambda entry: entry["occurred_at"], reverse=True)
+
+    overview = [entry for entry in queries if entry["service"] == "stock_service.get_stock_overview"]
+    assert overview and {entry["route"] for entry in overview} == {"GET /api/stock/"}
+    # The plan is captured once per statement text; repeats point at the same plan.
+    firsts = [entry for entry in overview if entry["first_occurrence"]]
+    assert len({entry["statement"] for entry in firsts}) == len(firsts)
+    assert any(entry["plan"] and entry["plan"][0].startswith(("SCAN", "SEARCH")) for entry in firsts)
+
+    insert = next(entry for entry in queries if entry["statement"].startswith("INSERT INTO products"))
+    assert insert["route"] == "POST /api/products/"
+    assert insert["service"] == "product_service.create_product"
+    assert "Kalakand Special" not in str(insert["parameters"])
+    assert "<str len=16>" in insert["parameters"]
+
+    assert api.delete("/api/debug/slow-queries").status_code == 204
+    assert api.get("/api/debug/slow-queries").json()["entries"] == 0
+
+
+def test_ring_buffer_is_bounded_and_fast_statements_are_skipped(client: TestClient, monkeypatch):
+    monkeypatch.setattr(slow_query_log, "threshold_ms", 10_000)
+    slow_query_log.listen(Engine)
+    try:
+        client.get("/api/products/")
+        assert slow_query_log.entries() == []
+        monkeypatch.setattr(slow_query_log, "threshold_ms", 0)
+        for _ in range(slow_query_log.stats()["max_entries"] + 5):
+            client.get("/api/suppliers/")
+        assert len(slow_query_log.entries()) == slow_query_log.stats()["max_entries"]
+        assert client.get("/api/debug/slow-queries").status_code == 404
+    finally:
+        slow_query_log.remove(Engine)
+        slow_query_log.clear()
+
+
+def test_slow_queries_need_debug_mode_or_the_admin_token(capture_all: TestClient, monkeypatch):
+    monkeypatch.setattr(get_settings(), "debug", False)
+    assert capture_all.get("/api/debug/slow-queries").status_code == 403
+
+    monkeypatch.setattr(get_settings(), "admin_token", "s3cret")
+    assert capture_all.get("/api/debug/slow-queries", headers={ADMIN_TOKEN_HEADER: "guess"}).status_code == 403
+    assert capture_all.get("/api/debug/slow-queries", headers={ADMIN_TOKEN_HEADER: "s3cret"}).status_code == 200
+    assert capture_all.delete("/api/debug/slow-queries").status_code == 403
+
+
+def test_failed_statements_leave_no_timing_state(capture_all: TestClient, db_engine):
+    with db_engine.connect() as conn:
+        with pytest.raises(OperationalError):
+            conn.execute(text("SELECT * FROM no_such_table"))
+        conn.execute(text("SELECT 42"))
+        assert not any("started" in str(key) for key in conn.info)
+    assert slow_query_log.entries()[0]["statement"] == "SELECT 42"
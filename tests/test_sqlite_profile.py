@@ -0,0 +1,60 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from app.config import Settings
+from app.database import apply_sqlite_pragmas, sqlite_pragmas
+
+
+@pytest.fixture()
+def engines(tmp_path):
+    url = f"sqlite:///{tmp_path / 'profile.db'}"
+    settings = Settings(sqlite_tuning_enabled=True, sqlite_busy_timeout_ms=200)
+    writer = create_engine(url, connect_args={"check_same_thread": False})
+    reader = create_engine(url, connect_args={"check_same_thread": False})
+    apply_sqlite_pragmas(writer, sqlite_pragmas(settings))
+    apply_sqlite_pragmas(reader, sqlite_pragmas(settings, read_only=True))
+    with writer.begin() as conn:
+        conn.execute(text("CREATE TABLE counter (id INTEGER PRIMARY KEY, value INTEGER NOT NULL)"))
+        conn.execute(text("INSERT INTO counter VALUES (1, 0)"))
+    yield writer, reader
+    writer.dispose()
+    reader.dispose()
+
+
+def test_profile_pragmas_are_applied(engines):
+    writer, reader = engines
+    with writer.connect() as conn:
+        pragma = lambda name: conn.exec_driver_sql(f"PRAGMA {name}").scalar()  # noqa: E731
+        assert pragma("journal_mode") == "wal"
+        assert pragma("synchronous") == 1  # NORMAL
+        assert pragma("busy_timeout") == 200
+        assert pragma("cache_size") == -64 * 1024
+        assert pragma("temp_store") == 2  # MEMORY
+    with reader.connect() as conn:
+        with pytest.raises(OperationalError, match="readonly|read-only|query_only"):
+            conn.execute(text("UPDATE counter SET value = 1"))
+
+
+def test_open_read_snapshot_does_not_stall_commits(engines):
+    writer, reader = engines
+    # The driver only opens transactions for writes; start the read transaction by hand.
+    raw = reader.raw_connection()
+    try:
+        cursor = raw.cursor()
+        cursor.execute("BEGIN")
+        assert cursor.execute("SELECT value FROM counter").fetchone() == (0,)
+
+        # Under rollback journaling the reader's SHARED lock would make this time out after 200 ms.
+        with writer.begin() as write_conn:
+            write_conn.execute(text("UPDATE counter SET value = value + 1"))
+
+        assert cursor.execute("SELECT value FROM counter").fetchone() == (0,)
+        cursor.execute("COMMIT")
+        assert cursor.execute("SELECT value FROM counter").fetchone() == (1,)
+    finally:
+        raw.close()
+
+
+def test_tuning_is_opt_in():
+    assert sqlite_pragmas(Settings()) == ["PRAGMA busy_timeout = 5000"]
@@ -0,0 +1,41 @@
+from sqlalchemy import create_engine, text
+
+from app.utils import statement_timing
+
+
+def test_one_timing_per_statement_is_shared_by_every_subscriber():
+    engine = create_engine("sqlite://")
+    seen: dict[str, list] = {"metrics": [], "slow_log": []}
+
+    def observer(name):
+        return lambda conn, statement, parameters, context, executemany, elapsed: seen[name].append(
+            (statement, elapsed)
+        )
+
+    def hooks() -> tuple[int, int]:
+        # Counts include any hooks installed on the Engine class by other tests' apps.
+        return len(engine.dispatch.before_cursor_execute), len(engine.dispatch.after_cursor_execute)
+
+    baseline = hooks()
+    metrics, slow_log = observer("metrics"), observer("slow_log")
+    statement_timing.subscribe(engine, metrics)
+    statement_timing.subscribe(engine, slow_log)
+    statement_timing.subscribe(engine, slow_log)
+    assert hooks() == (baseline[0] + 1, baseline[1] + 1)
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        assert seen["metrics"] == seen["slow_log"]
+        assert [statement for statement, _ in seen["slow_log"]] == ["SELECT 1"]
+
+        statement_timing.unsubscribe(engine, metrics)
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 2"))
+        assert len(seen["metrics"]) == 1 and len(seen["slow_log"]) == 2
+    finally:
+        statement_timing.unsubscribe(engine, metrics)
+        statement_timing.unsubscribe(engine, slow_log)
+
+    # One pair of hooks while anything listens, none once the last subscriber leaves.
+    assert hooks() == baseline
+    engine.dispose()
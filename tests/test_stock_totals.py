@@ -0,0 +1,78 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.models.entities import InventoryBatch, Product, ProductStock
+from app.services import data_version, stock_totals
+
+
+def add_batch(client: TestClient, product_id: int, batch_code: str, qty: int, expiry_days: int, cost: str):
+    payload = {
+        "product_id": product_id,
+        "batch_code": batch_code,
+        "quantity": qty,
+        "unit_cost": cost,
+        "expiry_date": (date.today() + timedelta(days=expiry_days)).isoformat(),
+    }
+    assert client.post("/api/purchases/", json=payload).status_code == 201
+
+
+def test_overview_totals_follow_purchases_and_sales(client: TestClient):
+    laddoo_id = client.post("/api/products/", json={"name": "Motichur Laddoo"}).json()["id"]
+    client.post("/api/products/", json={"name": "Empty Shelf"})
+    add_batch(client, laddoo_id, "L-1", 30, 10, "100")
+    add_batch(client, laddoo_id, "L-2", 50, 40, "90")
+
+    sale = {"product_id": laddoo_id, "quantity": 35, "selling_price": "150"}
+    assert client.post("/api/sales/", json=sale).status_code == 201
+    assert client.post("/api/sales/bulk", json=[{**sale, "quantity": 5}]).status_code == 201
+    assert client.post("/api/sales/", json={**sale, "quantity": 41}).status_code == 400
+
+    overview = client.get("/api/stock/").json()
+    assert overview["total_products"] == 2
+    assert overview["total_units"] == 40
+    assert overview["total_batches"] == 2
+
+
+def test_rebuild_and_verify():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    with sessionmaker(bind=engine)() as db:
+        product = Product(name="Kaju Katli")
+        db.add(product)
+        db.flush()
+        for code, qty, days in (("K-1", 0, 5), ("K-2", 12, 20), ("K-3", 8, 15)):
+            db.add(
+                InventoryBatch(
+                    product_id=product.id,
+                    batch_code=code,
+                    quantity_initial=20,
+                    quantity_remaining=qty,
+                    unit_cost=Decimal("2.50"),
+                    expiry_date=date.today() + timedelta(days=days),
+                )
+            )
+        db.commit()
+
+        assert stock_totals.verify(db) == [{"product_id": product.id, "missing": True}]
+        (batches_version,) = data_version.current(db, (data_version.BATCHES,))
+        assert stock_totals.rebuild(db) == 1
+        # Cached stock responses are keyed on this counter.
+        assert data_version.current(db, (data_version.BATCHES,)) == (batches_version + 1,)
+        assert stock_totals.verify(db) == []
+
+        row = db.get(ProductStock, product.id)
+        assert (row.units_on_hand, row.open_batches) == (20, 2)
+        assert row.earliest_expiry == date.today() + timedelta(days=15)
+        assert row.stock_value == Decimal("50.00")
+
+        db.execute(update(ProductStock).values(units_on_hand=999))
+        db.commit()
+        mismatch = stock_totals.verify(db)[0]
+        assert mismatch["units_on_hand"] == {"stored": 999, "expected": 20}
+    engine.dispose()